@@ -0,0 +1,210 @@
+# archive_loaders.py
+import os
+import shutil
+import tarfile
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from utils import is_supported_image_format
+
+# Archives inside archives are opened up to this many levels deep
+MAX_NESTING_DEPTH = 3
+# Nested archives that need random access (e.g. a ZIP inside a TAR) are buffered in memory up to this size
+NESTED_ARCHIVE_MEMORY_LIMIT = 64 * 1024 * 1024
+
+# Registered loaders: (lowercase name suffix, loader, needs random access)
+_ARCHIVE_LOADERS = []
+
+def register_archive_loader(suffixes, loader, seekable=False):
+    """
+    Registers loader for archive file names ending in one of suffixes (e.g. ".tar.gz").
+
+    loader(fileobj) receives a binary file object and yields (member name, size,
+    member file object) for every regular file, in archive order. Each member is
+    read completely before the next one is requested, so loaders can read their
+    archive in a single sequential pass. With seekable=True the loader gets a
+    seekable file object (nested members are buffered first).
+    """
+    for suffix in suffixes:
+        _ARCHIVE_LOADERS.append((suffix.lower(), loader, seekable))
+
+def find_archive_loader(name):
+    """
+    Returns (suffix, loader, seekable) for an archive file name, or None if no loader
+    handles it. The longest matching suffix wins (".tar.gz" over ".gz").
+    """
+    lower_name = str(name).lower()
+    matches = [entry for entry in _ARCHIVE_LOADERS if lower_name.endswith(entry[0])]
+    return max(matches, key=lambda entry: len(entry[0]), default=None)
+
+def is_archive(path) -> bool:
+    """Checks if a path has the name of a registered archive type."""
+    return find_archive_loader(Path(path).name) is not None
+
+def archive_stem(name) -> str:
+    """Returns an archive's file name without its archive suffix ("shots.tar.gz" -> "shots")."""
+    name = Path(name).name
+    entry = find_archive_loader(name)
+    return name[:-len(entry[0])] if entry and len(name) > len(entry[0]) else Path(name).stem
+
+def archive_file_patterns() -> str:
+    """Returns the registered suffixes as file dialog patterns ("*.zip *.tar ...")."""
+    return " ".join(f"*{suffix}" for suffix, _, _ in _ARCHIVE_LOADERS)
+
+def _iter_zip_members(fileobj):
+    with zipfile.ZipFile(fileobj) as archive:
+        for member in archive.infolist():
+            if not member.is_dir():
+                with archive.open(member) as source:
+                    yield member.filename, member.file_size, source
+
+def _iter_tar_members(fileobj):
+    # "r|*" reads the (optionally gzip/bz2/xz compressed) stream front to back without seeking
+    with tarfile.open(fileobj=fileobj, mode="r|*") as archive:
+        for member in archive:
+            if member.isfile():
+                yield member.name, member.size, archive.extractfile(member)
+
+register_archive_loader([".zip"], _iter_zip_members, seekable=True)
+register_archive_loader([".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz"], _iter_tar_members)
+
+def extract_archive_images(source, extract_dir, store=None, name=None, depth=0, max_workers=1,
+                           progress=None, cancel=None):
+    """
+    Extracts the supported images of an archive into extract_dir (flattened by file
+    name). Archives found inside are extracted into a subfolder named after them,
+    up to MAX_NESTING_DEPTH levels.
+
+    source is a path or a binary file object (then name gives the archive's file
+    name). With a SpooledInputStore, small members are kept in memory under their
+    paths and only large ones are written to disk. ZIP files given as a path are
+    extracted by max_workers threads, each with its own archive handle (inflating
+    releases the GIL, so this scales with cores); other archives are read in one pass.
+
+    progress(done, total) is called after each member (total is None for streamed
+    archives; it may be called from worker threads). Setting the threading.Event
+    cancel stops the extraction after the members in progress.
+    Returns the extracted paths and (member name, exception) for members that failed.
+    Raises ValueError for unknown archive types and the loader's error (e.g.
+    zipfile.BadZipFile, tarfile.ReadError) if the archive itself cannot be read.
+    """
+    name = name or Path(source).name
+    entry = find_archive_loader(name)
+    if entry is None:
+        raise ValueError(f"Unsupported archive type: '{name}'")
+    if isinstance(source, (str, os.PathLike)):
+        if entry[1] is _iter_zip_members and max_workers > 1:
+            return _extract_zip_parallel(source, Path(extract_dir), store, depth, max_workers, progress, cancel)
+        with open(source, "rb") as f:
+            return _extract_members(entry, f, Path(extract_dir), store, depth, progress, cancel)
+    return _extract_members(entry, source, Path(extract_dir), store, depth, progress, cancel)
+
+def _extract_members(entry, fileobj, extract_dir, store, depth, progress=None, cancel=None):
+    """Extracts the members of an archive in the loader's order."""
+    _, loader, _ = entry
+    if store is None:
+        os.makedirs(extract_dir, exist_ok=True)
+    extracted = []
+    errors = []
+    for done, (member_name, size, member_file) in enumerate(loader(fileobj), 1):
+        if cancel is not None and cancel.is_set():
+            break
+        member_paths, member_errors = _extract_member(member_name, size, member_file, extract_dir, store, depth, cancel)
+        extracted.extend(member_paths)
+        errors.extend(member_errors)
+        if progress is not None:
+            progress(done, None)
+    return extracted, errors
+
+def _extract_zip_parallel(zip_path, extract_dir, store, depth, max_workers, progress=None, cancel=None):
+    """Extracts the members of a ZIP file on a thread pool, one archive handle per thread."""
+    with zipfile.ZipFile(zip_path) as archive:
+        members = {}
+        for member in archive.infolist():
+            member_path = Path(member.filename)
+            if member.is_dir():
+                continue
+            if is_supported_image_format(member_path):
+                target = extract_dir / member_path.name
+            elif find_archive_loader(member_path.name) is not None:
+                target = member.filename # Nested archives are extracted into their own folders
+            else:
+                continue
+            # Members flattened onto the same path are not written concurrently; the last one wins
+            members.pop(target, None)
+            members[target] = member
+    if store is None:
+        os.makedirs(extract_dir, exist_ok=True)
+
+    total = len(members)
+    done = [0]
+    lock = threading.Lock()
+    local = threading.local()
+    handles = []
+
+    def extract(member):
+        if cancel is not None and cancel.is_set():
+            return [], []
+        handle = getattr(local, "archive", None)
+        if handle is None:
+            handle = local.archive = zipfile.ZipFile(zip_path)
+            with lock:
+                handles.append(handle)
+        try:
+            with handle.open(member) as source:
+                result = _extract_member(member.filename, member.file_size, source, extract_dir, store, depth, cancel)
+        except Exception as e:
+            print(f"Error extracting '{member.filename}' from archive: {e}")
+            result = ([], [(member.filename, e)])
+        with lock:
+            done[0] += 1
+            count = done[0]
+        if progress is not None:
+            progress(count, total)
+        return result
+
+    extracted = []
+    errors = []
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for member_paths, member_errors in pool.map(extract, sorted(members.values(), key=lambda m: m.header_offset)):
+                extracted.extend(member_paths)
+                errors.extend(member_errors)
+    finally:
+        for handle in handles:
+            handle.close()
+    return extracted, errors
+
+def _extract_member(member_name, size, member_file, extract_dir, store, depth, cancel=None):
+    """Extracts one member: stores it if it is an image, or extracts it if it is a nested archive."""
+    member_path = Path(member_name)
+    nested_entry = find_archive_loader(member_path.name)
+    try:
+        if is_supported_image_format(member_path):
+            extracted_file_path = extract_dir / member_path.name
+            if store is not None:
+                store.add(extracted_file_path, member_file, size)
+            else:
+                with open(extracted_file_path, "wb") as outfile:
+                    shutil.copyfileobj(member_file, outfile)
+            return [extracted_file_path], []
+        if nested_entry is not None and depth < MAX_NESTING_DEPTH:
+            nested_dir = extract_dir / archive_stem(member_path.name)
+            if nested_entry[2]: # Needs random access: buffer it (in memory if it is small enough)
+                os.makedirs(extract_dir, exist_ok=True)
+                with tempfile.SpooledTemporaryFile(max_size=NESTED_ARCHIVE_MEMORY_LIMIT, dir=extract_dir) as buffer:
+                    shutil.copyfileobj(member_file, buffer)
+                    buffer.seek(0)
+                    nested_paths, nested_errors = _extract_members(nested_entry, buffer, nested_dir, store, depth + 1,
+                                                                   cancel=cancel)
+            else:
+                nested_paths, nested_errors = _extract_members(nested_entry, member_file, nested_dir, store, depth + 1,
+                                                               cancel=cancel)
+            return nested_paths, [(f"{member_name}/{nested_name}", e) for nested_name, e in nested_errors]
+    except Exception as e:
+        print(f"Error extracting '{member_name}' from archive: {e}")
+        return [], [(member_name, e)]
+    return [], []
@@ -0,0 +1,154 @@
+# batch_resize_engine.py
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+
+try:
+    import numpy as np
+except ImportError: # NumPy is optional; the batch engine is simply unavailable without it
+    np = None
+
+from image_processing_logic import compute_crop_box, compute_output_size, target_dimensions
+from spooled_inputs import input_source
+
+# Only small images are batched; large ones gain nothing and would use a lot of memory
+MAX_BATCH_IMAGE_SIDE = 512
+# Same-size groups smaller than this are processed one by one as usual
+MIN_GROUP_SIZE = 8
+# Formats batched when the catalog reports a single frame (PNG and WebP can be animated)
+BATCH_SOURCE_FORMATS = {"PNG", "JPEG", "BMP", "TGA", "WEBP"}
+
+LANCZOS_SUPPORT = 3
+
+def is_available() -> bool:
+    """Returns True if NumPy is installed and the batch engine can be used."""
+    return np is not None
+
+def is_batch_candidate(record) -> bool:
+    """Checks whether a catalog record describes an image the batch engine can handle."""
+    return (record is not None and record.get("format") in BATCH_SOURCE_FORMATS
+            and record.get("frames") == 1 # Animations keep all their frames on the frame-aware Pillow path
+            and record.get("width") and record.get("height")
+            and max(record["width"], record["height"]) <= MAX_BATCH_IMAGE_SIDE)
+
+def lanczos_weights(in_size, out_size, start=0.0, end=None):
+    """
+    Returns the (out_size, in_size) Lanczos-3 resampling matrix used for one axis,
+    sampling the source span from start to end (the whole axis by default). Like
+    Pillow's resize(box=...), the span may have fractional edges, and the filter
+    support is widened by the scale factor when downsampling.
+    """
+    if end is None:
+        end = in_size
+    scale = (end - start) / out_size
+    filter_scale = max(scale, 1.0)
+    centers = start + (np.arange(out_size, dtype=np.float64) + 0.5) * scale
+    x = (np.arange(in_size, dtype=np.float64)[None, :] + 0.5 - centers[:, None]) / filter_scale
+    weights = np.sinc(x) * np.sinc(x / LANCZOS_SUPPORT)
+    weights[np.abs(x) >= LANCZOS_SUPPORT] = 0.0
+    weights /= weights.sum(axis=1, keepdims=True)
+    return weights.astype(np.float32)
+
+def resize_batch(batch, out_width, out_height, box=None):
+    """
+    Resizes a stacked uint8 batch of shape (N, H, W, C) to (N, out_height, out_width, C)
+    with batched matrix products over the whole batch. box optionally selects the
+    (left, top, right, bottom) source region. As in Pillow, columns are resampled
+    before rows, each only if it changes, with 8-bit rounding after each pass.
+    """
+    _, in_height, in_width, _ = batch.shape
+    left, top, right, bottom = box if box is not None else (0, 0, in_width, in_height)
+    resize_columns = out_width != in_width or (left, right) != (0, in_width)
+    resize_rows = out_height != in_height or (top, bottom) != (0, in_height)
+    if not resize_columns and not resize_rows:
+        return batch
+    data = batch.transpose(0, 3, 1, 2).astype(np.float32) # (N, C, H, W), so each channel plane is a matrix
+    if resize_columns:
+        data = np.clip(np.rint(np.matmul(data, lanczos_weights(in_width, out_width, left, right).T)), 0, 255)
+    if resize_rows:
+        data = np.clip(np.rint(np.matmul(lanczos_weights(in_height, out_height, top, bottom), data)), 0, 255)
+    return data.astype(np.uint8).transpose(0, 2, 3, 1)
+
+def batch_geometry(width, height, target_size, resize_mode, never_upscale=False):
+    """
+    Returns ((resize_width, resize_height), crop_box or None) for the selected resize
+    mode, matching the single-image path in image_processing_logic. The crop box is
+    in source pixels, unrounded, and is sampled by the resize like Pillow's
+    resize(box=...). Smart crop is not supported here, since its box depends on
+    each image's content.
+    """
+    if resize_mode == "crop":
+        return target_dimensions(target_size), compute_crop_box(width, height, target_size)
+    return compute_output_size(width, height, target_size, resize_mode, never_upscale), None
+
+class BatchResizeEngine:
+    """
+    Resizes groups of same-size small images as stacked NumPy arrays.
+
+    Inputs are grouped by their (width, height) from the image catalog. When the
+    processing loop asks for an image, take() decodes the next chunk of its group
+    on a thread pool, crops and resizes the whole chunk at once and hands back
+    the resized frames one by one, so memory stays bounded to one chunk per group.
+    take() is meant to be called from the processing workers; while one of them
+    loads a chunk, workers asking for images of the same group wait for it.
+    """
+    def __init__(self, image_sizes, target_size, resize_mode, never_upscale=False, chunk_size=256, max_workers=None):
+        self.target_size = target_size
+        self.resize_mode = resize_mode
+        self.never_upscale = never_upscale
+        self.chunk_size = max(1, chunk_size)
+        self.max_workers = max_workers
+
+        groups = {}
+        for path, size in image_sizes.items():
+            groups.setdefault(tuple(size), []).append(path)
+        self._pending = {size: deque(paths) for size, paths in groups.items() if len(paths) >= MIN_GROUP_SIZE}
+        self._group_of = {path: size for size, paths in self._pending.items() for path in paths}
+        self._ready = {} # path -> resized RGB frame (uint8 array)
+        self._lock = threading.Lock()
+        self._group_locks = {size: threading.Lock() for size in self._pending} # One chunk of a group loads at a time
+
+    def take(self, path):
+        """
+        Returns the resized frame of a batched image as a PIL image, or None if it
+        could not be batched (e.g. its real size did not match the catalog) and has to
+        be processed normally.
+        """
+        with self._lock:
+            size = self._group_of.pop(path, None)
+        if size is None:
+            return None
+        with self._group_locks[size]:
+            while path not in self._ready and self._pending[size]:
+                self._load_chunk(size)
+            frame = self._ready.pop(path, None)
+        return Image.fromarray(frame) if frame is not None else None
+
+    def _load_chunk(self, size):
+        """Decodes and resizes the next chunk of a same-size group."""
+        pending = self._pending[size]
+        chunk = [pending.popleft() for _ in range(min(self.chunk_size, len(pending)))]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            arrays = list(pool.map(self._decode, chunk))
+
+        loaded = [(path, array) for path, array in zip(chunk, arrays)
+                  if array is not None and array.shape[:2] == (size[1], size[0])]
+        if not loaded:
+            return
+        batch = np.stack([array for _, array in loaded])
+        (resize_width, resize_height), crop_box = batch_geometry(size[0], size[1], self.target_size,
+                                                                 self.resize_mode, self.never_upscale)
+        resized = resize_batch(batch, resize_width, resize_height, crop_box)
+        for index, (path, _) in enumerate(loaded):
+            self._ready[path] = resized[index]
+
+    @staticmethod
+    def _decode(path):
+        """Decodes an image to an RGB array, returning None on failure."""
+        try:
+            with Image.open(input_source(path)) as img:
+                return np.asarray(img.convert("RGB"))
+        except Exception as e:
+            print(f"Could not batch-decode {path}: {e}")
+            return None
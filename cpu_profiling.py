@@ -0,0 +1,98 @@
+# cpu_profiling.py
+import contextlib
+import cProfile
+import io
+import pstats
+import threading
+from pathlib import Path
+
+# Base name of the files written next to the outputs
+PROFILE_BASE_NAME = "processing_profile"
+
+class CpuProfiler:
+    """
+    cProfile hook for batch runs.
+
+    Every processing thread gets its own cProfile.Profile, which is only enabled
+    while one of the sampled images (every sample_every-th image) is processed.
+    save() merges the thread profiles into one stats file and a sorted text summary.
+    """
+    def __init__(self, sample_every=1):
+        self.sample_every = max(1, sample_every)
+        self.profiled_count = 0
+        self.skipped_count = 0 # Sampled images that could not be profiled (another profiler was active)
+        self._profiles = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _thread_profile(self):
+        """Returns the profile of the calling thread, creating it on first use."""
+        profile = getattr(self._local, "profile", None)
+        if profile is None:
+            profile = self._local.profile = cProfile.Profile()
+            with self._lock:
+                self._profiles.append(profile)
+        return profile
+
+    @contextlib.contextmanager
+    def image(self, index):
+        """Profiles the with block if the image at this batch index is part of the sample."""
+        if index % self.sample_every:
+            yield
+            return
+        profile = self._thread_profile()
+        try:
+            profile.enable()
+        except ValueError: # Python 3.12+ allows only one active profiler at a time
+            with self._lock:
+                self.skipped_count += 1
+            yield
+            return
+        try:
+            yield
+        finally:
+            profile.disable()
+            with self._lock:
+                self.profiled_count += 1
+
+    def stats(self):
+        """Returns the merged pstats.Stats of all threads, or None if nothing was profiled."""
+        with self._lock:
+            profiles = list(self._profiles)
+        stats = None
+        for profile in profiles:
+            profile.create_stats()
+            if not profile.stats:
+                continue
+            if stats is None:
+                stats = pstats.Stats(profile)
+            else:
+                stats.add(profile)
+        return stats
+
+    def save(self, output_folder, limit=60):
+        """
+        Writes the merged profile as '<base>.prof' (loadable with pstats or snakeviz)
+        and a text summary sorted by cumulative and by own time as '<base>.txt' in
+        output_folder. Returns the two paths, or None if nothing was profiled.
+        """
+        stats = self.stats()
+        if stats is None:
+            return None
+        output_folder = Path(output_folder)
+        stats_path = output_folder / f"{PROFILE_BASE_NAME}.prof"
+        summary_path = output_folder / f"{PROFILE_BASE_NAME}.txt"
+        stats.dump_stats(stats_path)
+
+        summary = io.StringIO()
+        sampling = f" (1 in {self.sample_every})" if self.sample_every > 1 else ""
+        summary.write(f"Profiled images: {self.profiled_count}{sampling}\n")
+        if self.skipped_count:
+            summary.write(f"Not profiled (another profiler was active): {self.skipped_count}\n")
+        stats.stream = summary
+        for sort_key in ("cumulative", "tottime"):
+            summary.write(f"\n===== Sorted by {sort_key} =====\n")
+            stats.sort_stats(sort_key).print_stats(limit)
+        with open(summary_path, "w") as f:
+            f.write(summary.getvalue())
+        return stats_path, summary_path
@@ -0,0 +1,299 @@
+# dry_run_planner.py
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from image_processing_logic import describe_image_outputs, iter_image_outputs, OperationGraph
+from job_scheduler import schedule_jobs
+from output_writer import ARCHIVE_FORMATS
+from spooled_inputs import input_stat
+from utils import generate_unique_filename
+
+# Number of images fully processed to calibrate the output size and runtime estimates
+CALIBRATION_SAMPLES = 3
+# Working memory of a job per source pixel: the decoded frame plus its RGB(A) conversion
+DECODE_BYTES_PER_PIXEL = 8
+# Working memory of a job per output pixel: the resized frame (RGBA at most)
+OUTPUT_BYTES_PER_PIXEL = 4
+
+def _plan_settings(settings) -> dict:
+    """Returns settings as they are stored in a plan (JSON types, so tuples become lists)."""
+    return json.loads(json.dumps(settings))
+
+def _input_version(path):
+    """Returns the (size, mtime) of an input, or (None, None) if it cannot be stat'ed."""
+    try:
+        stat = input_stat(path)
+    except OSError:
+        return None, None
+    return stat.st_size, stat.st_mtime
+
+def _probe_input(path, settings, operations):
+    """
+    Describes the outputs of one input from its header. Returns (outputs, (size, mtime), error);
+    the file is stat'ed first, so a change while it is probed makes the plan stale.
+    """
+    version = _input_version(path)
+    try:
+        outputs = describe_image_outputs(path, settings['target_size'], settings['resize_mode'],
+                                         settings['output_format'], settings['frame_mode'],
+                                         settings['max_file_size'], settings['never_upscale'],
+                                         settings['passthrough_mode'] != "off", operations)
+        return outputs, version, None
+    except Exception as e:
+        return [], version, str(e)
+
+def calibrate(entries, settings, operations, samples=CALIBRATION_SAMPLES) -> dict | None:
+    """
+    Processes up to `samples` images (spread from the cheapest to the most expensive
+    of entries that are re-encoded) with the batch's settings, in memory, and returns
+    the measured seconds per megapixel of job cost and encoded bytes per output
+    pixel. Returns None if no image could be processed.
+    """
+    candidates = sorted((entry for entry in entries if not entry['error']
+                         and not all(output['passthrough'] for output in entry['outputs'])),
+                        key=lambda entry: entry['cost'])
+    if not candidates or samples <= 0:
+        return None
+    if len(candidates) <= samples:
+        chosen = candidates
+    else:
+        chosen = [candidates[round(index * (len(candidates) - 1) / max(1, samples - 1))] for index in range(samples)]
+
+    seconds = cost = output_bytes = output_pixels = 0
+    sampled = []
+    for entry in chosen:
+        path = entry['path']
+        try:
+            start = time.perf_counter()
+            encoded = [encode()[0] for _, _, encode in iter_image_outputs(
+                path, settings['target_size'], settings['resize_mode'], settings['output_format'],
+                settings['quality'], settings['frame_mode'], settings['max_file_size'], settings['quality_probes'],
+                settings['encoder_options'], settings['never_upscale'], False, operations)]
+            elapsed = time.perf_counter() - start
+        except Exception as e:
+            print(f"Dry run calibration failed for {path.name}: {e}")
+            continue
+        seconds += elapsed
+        cost += entry['cost']
+        output_bytes += sum(len(data) for data in encoded)
+        output_pixels += sum(output['width'] * output['height'] * output['frames'] for output in entry['outputs'])
+        sampled.append(str(path))
+    if not sampled or cost <= 0 or output_pixels <= 0:
+        return None
+    return {"images": sampled,
+            "seconds": round(seconds, 3),
+            "seconds_per_megapixel": seconds / (cost / 1e6),
+            "bytes_per_output_pixel": output_bytes / output_pixels}
+
+def build_dry_run_plan(image_paths, settings, records=None, parallel_jobs=1, write_queue_size=16,
+                       calibration_samples=CALIBRATION_SAMPLES, max_workers=None, progress=None) -> dict:
+    """
+    Plans a batch without writing anything and returns the plan as a JSON-ready dict.
+
+    Every input's header is probed in parallel (no pixels are decoded) to get its
+    outputs: the final dimensions after resize and edits, pages and frames, and
+    whether it would be copied unchanged. Inputs are ordered like the real run
+    (job_scheduler, with costs multiplied by the frames processed) and named in
+    that order with the prefix/suffix and "If file exists" rules, so collisions
+    with existing files and between outputs of the batch are listed up front. In
+    the real run parallel jobs name their outputs as they reach them, so which of
+    several colliding inputs gets a numbered name may differ.
+
+    Output bytes and runtime are extrapolated from a few images processed for
+    calibration (see calibrate()); peak memory is the working memory of the
+    parallel_jobs largest jobs plus a full write queue. records are catalog records
+    keyed by path. progress(done, total) is called while headers are probed.
+
+    settings holds the batch settings (target_size, resize_mode, output_format,
+    quality, prefix, suffix, overwrite_mode, frame_mode, max_file_size,
+    quality_probes, encoder_options, passthrough_mode, never_upscale, operations,
+    output_folder, output_target, archive_name, schedule_order). The plan can be
+    handed back to planned_schedule() so the real run reuses its probe results.
+    """
+    records = records or {}
+    operations = OperationGraph(settings['operations'])
+    total = len(image_paths)
+    probes = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {path: pool.submit(_probe_input, path, settings, operations) for path in image_paths}
+        for done, (path, future) in enumerate(futures.items(), 1):
+            probes[path] = future.result()
+            if progress is not None:
+                progress(done, total)
+
+    frame_counts = {path: sum(output[3] for output in probes[path][0]) or 1 for path in image_paths}
+    ordered_paths, costs = schedule_jobs(image_paths, records, settings['schedule_order'], frame_counts)
+
+    writing_to_archive = settings['output_target'] in ARCHIVE_FORMATS
+    output_folder = Path(settings['output_folder'])
+    output_root = Path() if writing_to_archive else output_folder
+    reserved_paths = set()
+    entries = []
+    for path in ordered_paths:
+        outputs, (input_bytes, input_mtime), error = probes[path]
+        record = records.get(path) or {}
+        output_filename = f"{settings['prefix']}{path.stem}{settings['suffix']}"
+        planned_outputs = []
+        for name_suffix, extension, (width, height), frames, passthrough in outputs:
+            output_path = output_root / f"{output_filename}{name_suffix}.{extension}"
+            collision = None
+            if output_path in reserved_paths or (not writing_to_archive and output_path.exists()):
+                collision = "renamed" if settings['overwrite_mode'] == "unique" else settings['overwrite_mode']
+                if collision == "renamed":
+                    output_path = generate_unique_filename(output_path, reserved_paths, check_disk=not writing_to_archive)
+            reserved_paths.add(output_path)
+            planned_outputs.append({"output": output_path.as_posix(), "width": width, "height": height,
+                                    "frames": frames, "passthrough": passthrough, "collision": collision})
+        entries.append({"path": path, "input": str(path), "format": record.get('format'),
+                        "width": record.get('width'), "height": record.get('height'),
+                        "input_bytes": input_bytes or 0, "input_mtime": input_mtime,
+                        "cost": costs[path], "outputs": planned_outputs, "error": error})
+
+    calibration = calibrate(entries, settings, operations, calibration_samples)
+    max_file_size = settings['max_file_size'] if settings['output_format'] == "JPG" else 0
+    job_memory = []
+    for entry in entries:
+        entry_bytes = 0
+        for output in entry['outputs']:
+            if output['passthrough']:
+                output['estimated_bytes'] = entry['input_bytes']
+            elif calibration is not None:
+                output['estimated_bytes'] = round(output['width'] * output['height'] * output['frames']
+                                                  * calibration['bytes_per_output_pixel'])
+                if max_file_size > 0:
+                    output['estimated_bytes'] = min(output['estimated_bytes'], max_file_size)
+            else:
+                output['estimated_bytes'] = None
+            entry_bytes += output['estimated_bytes'] or 0
+        reencoded = [output for output in entry['outputs'] if not output['passthrough']]
+        if calibration is None or not reencoded:
+            entry['estimated_seconds'] = 0.0 if entry['outputs'] and not reencoded else None
+        else:
+            entry['estimated_seconds'] = round(entry['cost'] / 1e6 * calibration['seconds_per_megapixel'], 4)
+        if reencoded:
+            source_pixels = (entry['width'] or 0) * (entry['height'] or 0)
+            output_pixels = max(output['width'] * output['height'] for output in reencoded)
+            job_memory.append(source_pixels * DECODE_BYTES_PER_PIXEL + output_pixels * OUTPUT_BYTES_PER_PIXEL
+                              + entry_bytes)
+
+    outputs = [output for entry in entries for output in entry['outputs']]
+    parallel_jobs = max(1, parallel_jobs)
+    job_seconds = [entry['estimated_seconds'] for entry in entries if not entry['error']]
+    estimated_bytes = [output['estimated_bytes'] for output in outputs if output['estimated_bytes'] is not None]
+    average_output_bytes = sum(estimated_bytes) / len(estimated_bytes) if estimated_bytes else 0
+    totals = {
+        "images": total,
+        "outputs": len(outputs),
+        "passthrough_outputs": sum(1 for output in outputs if output['passthrough']),
+        "collisions": sum(1 for output in outputs if output['collision']),
+        "errors": sum(1 for entry in entries if entry['error']),
+        "input_bytes": sum(entry['input_bytes'] for entry in entries),
+        "estimated_output_bytes": round(sum(estimated_bytes)) if len(estimated_bytes) == len(outputs) else None,
+        # Jobs run side by side on at most one core each, and the batch lasts at least as long as its largest job
+        "estimated_seconds": (round(max(sum(job_seconds) / min(parallel_jobs, os.cpu_count() or 1), max(job_seconds)), 1)
+                              if job_seconds and None not in job_seconds else None),
+        "estimated_peak_memory_bytes": round(sum(sorted(job_memory, reverse=True)[:parallel_jobs])
+                                             + min(write_queue_size, len(outputs)) * average_output_bytes),
+    }
+    archive_path = output_folder / f"{settings['archive_name']}.{settings['output_target']}" if writing_to_archive else None
+    for entry in entries:
+        del entry['path']
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "settings": _plan_settings(settings),
+        "archive": str(archive_path) if archive_path is not None else None,
+        "archive_exists": archive_path.exists() if archive_path is not None else False,
+        "parallel_jobs": parallel_jobs,
+        "calibration": calibration,
+        "totals": totals,
+        "images": entries,
+    }
+
+def planned_schedule(plan, image_paths, settings):
+    """
+    Returns the (ordered_paths, costs) of a plan for the real run, or None if the
+    plan was made for other inputs or settings, or an input's size or modification
+    time changed since (its costs and frame counts would be stale). The paths are
+    the ones in image_paths, in the plan's order.
+    """
+    if plan is None or plan['settings'] != _plan_settings(settings):
+        return None
+    paths = {str(path): path for path in image_paths}
+    if len(paths) != len(plan['images']) or any(entry['input'] not in paths for entry in plan['images']):
+        return None
+    for entry in plan['images']:
+        size, mtime = _input_version(paths[entry['input']])
+        if (size or 0, mtime) != (entry['input_bytes'], entry['input_mtime']):
+            return None
+    ordered_paths = [paths[entry['input']] for entry in plan['images']]
+    return ordered_paths, {paths[entry['input']]: entry['cost'] for entry in plan['images']}
+
+def save_plan(plan, path):
+    """Saves a plan as JSON."""
+    with open(path, "w") as f:
+        json.dump(plan, f, indent=4)
+
+def _format_bytes(value) -> str:
+    if value is None:
+        return "unknown"
+    for unit in ("bytes", "KB", "MB", "GB"):
+        if value < 1024 or unit == "GB":
+            return f"{value:.0f} {unit}" if unit == "bytes" else f"{value:.1f} {unit}"
+        value /= 1024
+
+def _format_seconds(value) -> str:
+    if value is None:
+        return "unknown"
+    minutes, seconds = divmod(round(value), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}"
+
+def format_plan_summary(plan, max_listed=20) -> str:
+    """Formats a plan as text for the UI: totals, estimates, then collisions, errors and the first outputs."""
+    totals = plan['totals']
+    settings = plan['settings']
+    target = plan['archive'] or settings['output_folder']
+    lines = [f"{totals['images']} images -> {totals['outputs']} outputs"
+             f" ({totals['passthrough_outputs']} copied unchanged)",
+             f"Output: {target}" + (" (exists)" if plan['archive_exists'] else ""),
+             f"Input size: {_format_bytes(totals['input_bytes'])}",
+             f"Estimated output size: {_format_bytes(totals['estimated_output_bytes'])}",
+             f"Estimated runtime: {_format_seconds(totals['estimated_seconds'])} with {plan['parallel_jobs']} parallel jobs",
+             f"Estimated peak memory: {_format_bytes(totals['estimated_peak_memory_bytes'])}"]
+    calibration = plan['calibration']
+    if calibration is not None:
+        lines.append(f"Calibrated on {len(calibration['images'])} images: "
+                     f"{calibration['seconds_per_megapixel'] * 1000:.1f} ms per megapixel, "
+                     f"{calibration['bytes_per_output_pixel']:.2f} bytes per output pixel")
+    elif totals['estimated_output_bytes'] is None:
+        lines.append("No image could be calibrated; output size and runtime are unknown.")
+    lines.append(f"Name collisions: {totals['collisions']}, unreadable images: {totals['errors']}")
+
+    collisions = [(entry, output) for entry in plan['images'] for output in entry['outputs'] if output['collision']]
+    if collisions:
+        lines += ["", "Collisions:"]
+        lines += [f"  {Path(entry['input']).name} -> {output['output']} ({output['collision']})"
+                  for entry, output in collisions[:max_listed]]
+        if len(collisions) > max_listed:
+            lines.append(f"  ... and {len(collisions) - max_listed} more")
+    errors = [entry for entry in plan['images'] if entry['error']]
+    if errors:
+        lines += ["", "Unreadable images:"]
+        lines += [f"  {Path(entry['input']).name}: {entry['error']}" for entry in errors[:max_listed]]
+        if len(errors) > max_listed:
+            lines.append(f"  ... and {len(errors) - max_listed} more")
+    lines += ["", "Outputs (in processing order):"]
+    listed = 0
+    for entry in plan['images']:
+        for output in entry['outputs']:
+            if listed == max_listed:
+                lines.append(f"  ... and {totals['outputs'] - max_listed} more")
+                return "\n".join(lines)
+            lines.append(f"  {Path(entry['input']).name} -> {output['output']} ({output['width']}x{output['height']}"
+                         f"{', copied' if output['passthrough'] else ''}, {_format_bytes(output['estimated_bytes'])})")
+            listed += 1
+    return "\n".join(lines)
@@ -0,0 +1,163 @@
+# image_catalog.py
+import hashlib
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from PIL import Image
+
+from spooled_inputs import input_source, input_stat, open_input
+
+# Columns stored for every cataloged image (besides the path itself)
+CATALOG_FIELDS = ("size", "mtime", "format", "width", "height", "mode", "frames", "content_hash", "error")
+
+# Largest number of paths bound into a single "IN (...)" query
+_QUERY_CHUNK_SIZE = 500
+
+def _catalog_key(path) -> str:
+    """Normalizes a path into the key used by the catalog."""
+    return os.path.abspath(str(path))
+
+def compute_file_hash(path, chunk_size=1024 * 1024) -> str:
+    """Returns the BLAKE2b hex digest of a file's content."""
+    digest = hashlib.blake2b(digest_size=20)
+    with open_input(path) as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def probe_image_header(path, compute_hash=False) -> dict:
+    """
+    Reads an image's format, dimensions, mode and frame count from its header without
+    decoding pixels.
+    Returns a catalog record; unreadable images get their message in the 'error' field.
+    """
+    stat = input_stat(path)
+    record = {"path": _catalog_key(path), "size": stat.st_size, "mtime": stat.st_mtime,
+              "format": None, "width": None, "height": None, "mode": None, "frames": None,
+              "content_hash": None, "error": None}
+    try:
+        with Image.open(input_source(path)) as img: # Image.open only parses the header
+            record.update(format=img.format, width=img.width, height=img.height, mode=img.mode,
+                          frames=getattr(img, "n_frames", 1)) # Animated PNG/WebP and multi-page TIFF report more than one
+        if compute_hash:
+            record["content_hash"] = compute_file_hash(path)
+    except Exception as e:
+        record["error"] = str(e)
+    return record
+
+class ImageCatalog:
+    """
+    Local SQLite catalog of image metadata (size, mtime, format, dimensions, mode,
+    frame count and optionally a content hash), keyed by absolute path.
+
+    scan() only stats files whose record is still current and re-probes new or
+    changed files in parallel, so rescanning a folder is cheap.
+    """
+    def __init__(self, db_path):
+        self.db_path = str(db_path)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS images ("
+                " path TEXT PRIMARY KEY, size INTEGER, mtime REAL, format TEXT,"
+                " width INTEGER, height INTEGER, mode TEXT, frames INTEGER, content_hash TEXT, error TEXT)"
+            )
+            columns = {row["name"] for row in self._connection.execute("PRAGMA table_info(images)")}
+            if "frames" not in columns: # Catalogs created before frame counts were stored
+                self._connection.execute("ALTER TABLE images ADD COLUMN frames INTEGER")
+
+    def close(self):
+        """Closes the database connection."""
+        with self._lock:
+            self._connection.close()
+
+    def get(self, path) -> dict | None:
+        """Returns the stored record for a path, or None if it is not cataloged."""
+        return self.get_many([path]).get(path)
+
+    def get_many(self, paths) -> dict:
+        """Returns the stored records for the given paths, keyed by the paths as passed in."""
+        keys = {_catalog_key(path): path for path in paths}
+        key_list = list(keys)
+        records = {}
+        with self._lock:
+            for start in range(0, len(key_list), _QUERY_CHUNK_SIZE):
+                chunk = key_list[start:start + _QUERY_CHUNK_SIZE]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._connection.execute(
+                    f"SELECT * FROM images WHERE path IN ({placeholders})", chunk).fetchall()
+                for row in rows:
+                    records[keys[row["path"]]] = dict(row)
+        return records
+
+    def scan(self, paths, compute_hash=False, max_workers=None, store=True) -> dict:
+        """
+        Brings the catalog up to date for the given paths and returns their records,
+        keyed by the paths as passed in. Unchanged files (same size and mtime) are
+        only stat'ed; new or changed files are probed in parallel. Missing files are skipped.
+        With store=False the files are probed but nothing is read from or written to
+        the catalog (for temporary files whose paths never recur).
+        """
+        records = self.get_many(paths) if store else {}
+        to_probe = []
+        for path in paths:
+            try:
+                stat = input_stat(path)
+            except OSError:
+                records.pop(path, None)
+                continue
+            record = records.get(path)
+            if (record is None or record["size"] != stat.st_size or record["mtime"] != stat.st_mtime
+                    or (record["frames"] is None and not record["error"])
+                    or (compute_hash and not record["content_hash"] and not record["error"])):
+                to_probe.append(path)
+
+        if to_probe:
+            probed = []
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                results = pool.map(partial(self._probe_or_none, compute_hash=compute_hash), to_probe)
+                for path, record in zip(to_probe, results):
+                    if record is None:
+                        records.pop(path, None)
+                    else:
+                        records[path] = record
+                        probed.append(record)
+            if store:
+                self._upsert(probed)
+        return records
+
+    def remove(self, paths):
+        """Removes the records for the given paths."""
+        with self._lock, self._connection:
+            self._connection.executemany("DELETE FROM images WHERE path = ?",
+                                         [(_catalog_key(path),) for path in paths])
+
+    @staticmethod
+    def _probe_or_none(path, compute_hash=False):
+        """Probes a file, returning None if it disappeared in the meantime."""
+        try:
+            return probe_image_header(path, compute_hash)
+        except OSError:
+            return None
+
+    def _upsert(self, records):
+        """Inserts or replaces the given records."""
+        columns = ("path",) + CATALOG_FIELDS
+        placeholders = ",".join("?" * len(columns))
+        with self._lock, self._connection:
+            self._connection.executemany(
+                f"INSERT OR REPLACE INTO images ({','.join(columns)}) VALUES ({placeholders})",
+                [tuple(record[column] for column in columns) for record in records])
+
+def open_catalog(db_path) -> ImageCatalog:
+    """Opens the catalog at db_path, falling back to an in-memory catalog if that fails."""
+    try:
+        return ImageCatalog(Path(db_path))
+    except sqlite3.Error as e:
+        print(f"Could not open image catalog '{db_path}': {e}. Using an in-memory catalog.")
+        return ImageCatalog(":memory:")
@@ -1,66 +1,692 @@
 # image_processing_logic.py
-from PIL import Image
+import contextlib
+import io
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from PIL import Image, ExifTags, GifImagePlugin, ImageColor, ImageDraw, ImageEnhance, ImageFilter, ImageFont
+
+from spooled_inputs import input_source, input_stat, is_in_memory, read_input
+
+# Pillow format names for each output format offered by the app
+PIL_OUTPUT_FORMATS = {"JPG": "JPEG", "PNG": "PNG", "TGA": "TGA", "WEBP": "WEBP"}
+
+# How inputs that need no resize or re-encode are handled:
+#   "off"  - always decode and re-encode
+#   "copy" - copy the source file unchanged
+#   "link" - hardlink the source file (falls back to a copy across devices)
+PASSTHROUGH_MODES = ("off", "copy", "link")
+
+# Output formats whose encoder takes a 1-100 quality setting
+QUALITY_OUTPUT_FORMATS = ("JPG", "WEBP")
+
+# How multi-frame inputs (animated GIF, multi-page TIFF) are processed:
+#   "all"   - animated GIFs stay animated, every other multi-frame image yields one output per page
+#   "first" - only the first frame is processed
+FRAME_MODES = ("all", "first")
+
+# Resize modes:
+#   "fit"        - scale to fit inside the target, keeping the aspect ratio
+#   "crop"       - fill the target and cut off the excess around the center
+#   "smart_crop" - fill the target and keep the region with the most detail
+#   "stretch"    - scale to exactly the target size, distorting the aspect ratio
+RESIZE_MODES = ("fit", "crop", "smart_crop", "stretch")
+CROP_MODES = ("crop", "smart_crop")
+
+# Longest side of the downscaled proxy the smart crop analyses
+SMART_CROP_PROXY_SIZE = 256
+# How much smart crop prefers central windows over equally detailed ones near the edge (0 = no preference)
+SMART_CROP_CENTER_BIAS = 0.1
+
+# JPEG chroma subsampling choices (label -> Pillow "subsampling" value)
+JPEG_SUBSAMPLING = {"4:4:4": 0, "4:2:2": 1, "4:2:0": 2}
+
+# Encoder options used when none are given (matches the app's historical JPEG output).
+# webp_method is the WebP encoder effort: 0 is fastest, 6 gives the smallest files.
+DEFAULT_ENCODER_OPTIONS = {"optimize": True, "progressive": False, "subsampling": "4:2:0",
+                           "webp_lossless": False, "webp_method": 4}
+
+# Per-thread stage observer (see set_stage_observer); unset means stages are not observed
+_thread_state = threading.local()
+_NO_STAGE = contextlib.nullcontext()
+
+def set_stage_observer(observer):
+    """
+    Installs observer for the processing stages ("decode", "resize", "encode") run on
+    the calling thread. observer(stage_name) must return a context manager wrapping
+    the stage. Pass None to remove it. Without an observer a stage costs one attribute lookup.
+    """
+    _thread_state.observer = observer
+
+def _stage(name):
+    """Returns the context manager that wraps a processing stage on this thread."""
+    observer = getattr(_thread_state, "observer", None)
+    return observer(name) if observer is not None else _NO_STAGE
 
 # Translated function names
 def process_image_file(input_path, output_path, target_size, resize_mode, output_format, quality):
     """
     Processes a single image file (resize, convert format, apply quality).
     """
-    img = Image.open(input_path)
-    img = img.convert("RGB") # Ensure consistent mode for resizing and saving
+    img = _load_and_resize(input_path, target_size, resize_mode)
+    _save_image(img, output_path, output_format, quality)
 
-    original_width, original_height = img.size
+def iter_image_outputs(input_path, target_size, resize_mode, output_format, quality, frame_mode="all",
+                       max_file_size=0, quality_probes=1, encoder_options=None, never_upscale=False,
+                       passthrough=False, operations=None, source=None):
+    """
+    Yields one (name_suffix, extension, encode) tuple per output file of an input image.
+
+    encode() processes the frame(s) of that output and returns (data, details), where
+    details is a dict of per-output facts worth reporting (e.g. the JPEG quality chosen
+    for a max_file_size limit, see encode_jpeg_to_size). It is only called for outputs
+    that are actually written, so skipped outputs cost nothing. Frames are decoded,
+    resized and encoded one at a time, which keeps memory bounded to a few frames for
+    long animations and large multi-page TIFFs.
+
+    With passthrough=True, a single-frame source that is already in the output format
+    and would keep its dimensions is not decoded at all: encode() returns the source
+    Path instead of bytes, and the output writer copies or links the file (inputs
+    held in memory, see spooled_inputs, and a given source are returned as their
+    bytes instead).
+
+    operations is an optional OperationGraph applied to every frame after the resize
+    (which also rules out passthrough). source optionally gives the input's content
+    (e.g. read ahead by an InputPrefetcher), which is then decoded instead of the file.
+    """
+    with Image.open(io.BytesIO(source) if source is not None else input_source(input_path)) as img:
+        if img.format == "ICO":
+            _select_ico_size(img, target_size)
+        n_frames = getattr(img, "n_frames", 1) if frame_mode == "all" else 1
+
+        if passthrough and not operations and _can_pass_through(img, input_path, target_size, resize_mode, output_format,
+                                             max_file_size, never_upscale):
+            yield "", output_format.lower(), lambda: (source if source is not None # Already read: no second read
+                                                      else read_input(input_path) if is_in_memory(input_path)
+                                                      else Path(input_path), {"passthrough": True})
+        elif n_frames > 1 and img.format == "GIF":
+            yield "", "gif", partial(_encode_animated_gif, img, target_size, resize_mode, never_upscale, operations)
+        elif n_frames > 1:
+            for index in range(n_frames):
+                yield (f"_page{index + 1}", output_format.lower(),
+                       partial(_encode_frame, img, index, target_size, resize_mode, output_format, quality,
+                               max_file_size, quality_probes, encoder_options, never_upscale, operations))
+        else:
+            yield "", output_format.lower(), partial(_encode_frame, img, 0, target_size, resize_mode, output_format,
+                                                     quality, max_file_size, quality_probes, encoder_options,
+                                                     never_upscale, operations)
+
+def can_pass_through(record, target_size, resize_mode, output_format, max_file_size=0, never_upscale=False, frames=1):
+    """
+    Checks from header facts alone whether a source can be used unchanged. record
+    has the "format", "mode", "width", "height" and "size" (file bytes) of an image
+    catalog record. The source must be a single RGB frame in the output format (what
+    encoding would produce, so e.g. CMYK JPEGs and PNGs with alpha are re-encoded),
+    keep its dimensions and respect max_file_size.
+    """
+    if record.get("format") != PIL_OUTPUT_FORMATS.get(output_format) or frames > 1:
+        return False
+    if record.get("mode") != "RGB" or not record.get("width") or not record.get("height"):
+        return False
+    if max_file_size > 0 and (record.get("size") is None or record["size"] > max_file_size):
+        return False
+    size = (record["width"], record["height"])
+    return compute_output_size(*size, target_size, resize_mode, never_upscale) == size
+
+def _can_pass_through(img, input_path, target_size, resize_mode, output_format, max_file_size, never_upscale):
+    """can_pass_through() for an opened image; the file is only stat'ed for a max_file_size limit."""
+    record = {"format": img.format, "mode": img.mode, "width": img.width, "height": img.height,
+              "size": input_stat(input_path).st_size if max_file_size > 0 else None}
+    return can_pass_through(record, target_size, resize_mode, output_format, max_file_size, never_upscale,
+                            getattr(img, "n_frames", 1))
+
+def describe_image_outputs(input_path, target_size, resize_mode, output_format, frame_mode="all",
+                           max_file_size=0, never_upscale=False, passthrough=False, operations=None):
+    """
+    Returns the outputs iter_image_outputs() would produce for an input without
+    decoding any pixels, as (name_suffix, extension, (width, height), frames,
+    passthrough) tuples. frames is the number of source frames an output is made
+    of (more than one for animated GIF output). Used by the dry-run planner.
+    """
+    with Image.open(input_source(input_path)) as img:
+        if img.format == "ICO":
+            _select_ico_size(img, target_size)
+        n_frames = getattr(img, "n_frames", 1) if frame_mode == "all" else 1
+
+        if passthrough and not operations and _can_pass_through(img, input_path, target_size, resize_mode, output_format,
+                                                                 max_file_size, never_upscale):
+            return [("", output_format.lower(), img.size, 1, True)]
 
+        def output_size(size):
+            size = compute_output_size(*size, target_size, resize_mode, never_upscale)
+            return operations.output_size(size) if operations else size
+
+        if n_frames > 1 and img.format == "GIF":
+            return [("", "gif", output_size(img.size), n_frames, False)]
+        if n_frames > 1:
+            outputs = []
+            for index in range(n_frames): # Pages can differ in size; seeking only reads their headers
+                img.seek(index)
+                outputs.append((f"_page{index + 1}", output_format.lower(), output_size(img.size), 1, False))
+            return outputs
+        return [("", output_format.lower(), output_size(img.size), 1, False)]
+
+def target_dimensions(target_size):
+    """
+    Returns the target as (width, height). target_size is either one number (the
+    longest side for "fit", a square for the other modes) or a (width, height) pair.
+    """
+    if isinstance(target_size, (tuple, list)):
+        return (int(target_size[0]), int(target_size[1]))
+    return (target_size, target_size)
+
+def parse_target_size(text):
+    """
+    Parses a target size entered as "2048" or "1920x1080" into an int or a
+    (width, height) tuple. Raises ValueError if it is not a positive size.
+    """
+    parts = text.strip().lower().replace("\u00d7", "x").split("x")
+    if len(parts) not in (1, 2) or not all(part.strip().isdigit() for part in parts):
+        raise ValueError(f"Invalid target size: '{text}'")
+    sizes = [int(part) for part in parts]
+    if min(sizes) <= 0:
+        raise ValueError("Target size must be a positive number.")
+    return sizes[0] if len(sizes) == 1 else tuple(sizes)
+
+def compute_output_size(width, height, target_size, resize_mode, never_upscale=False):
+    """
+    Returns the (width, height) an image of the given size will have after the
+    selected resize mode, without touching any pixels.
+    """
+    target_width, target_height = target_dimensions(target_size)
     if resize_mode == "fit":
-        if original_width > original_height:
-            new_width = target_size
-            new_height = int(original_height * (target_size / original_width))
+        if never_upscale and width <= target_width and height <= target_height:
+            return (width, height)
+        if width * target_height > height * target_width: # Wider than the target: width is the limit
+            return (target_width, int(height * (target_width / width)))
+        return (int(width * (target_height / height)), target_height)
+    if resize_mode in CROP_MODES or resize_mode == "stretch":
+        return (target_width, target_height)
+    return (width, height)
+
+def compute_crop_box(width, height, target_size):
+    """
+    Returns the centered (left, top, right, bottom) source region with the aspect
+    ratio of the target, i.e. what "crop" keeps before scaling to the target size.
+    """
+    target_width, target_height = target_dimensions(target_size)
+    if width * target_height > height * target_width: # Wider than the target: cut off the sides
+        crop_width = height * target_width / target_height
+        left = (width - crop_width) / 2
+        return (left, 0, left + crop_width, height)
+    crop_height = width * target_height / target_width
+    top = (height - crop_height) / 2
+    return (0, top, width, top + crop_height)
+
+def find_smart_crop_box(img, target_size):
+    """
+    Returns the source region with the aspect ratio of the target that holds the
+    most detail. Edge energy is measured on a proxy downscaled to
+    SMART_CROP_PROXY_SIZE, so the analysis costs about the same for any image
+    size; only the returned box is used on the full-resolution image.
+    """
+    left, top, right, bottom = compute_crop_box(img.width, img.height, target_size)
+    crop_width, crop_height = right - left, bottom - top
+    if crop_width >= img.width and crop_height >= img.height:
+        return (left, top, right, bottom)
+
+    scale = min(1.0, SMART_CROP_PROXY_SIZE / max(img.size))
+    proxy_size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+    proxy = img.resize(proxy_size, Image.Resampling.BOX, reducing_gap=2.0).convert("L")
+    energy = proxy.filter(ImageFilter.FIND_EDGES)
+    ImageDraw.Draw(energy).rectangle((0, 0, proxy_size[0] - 1, proxy_size[1] - 1), outline=0) # Image borders are not edges
+    energy = energy.convert("F")
+
+    if crop_width < img.width: # Slide the window horizontally over the column energy
+        profile = list(energy.resize((proxy_size[0], 1), Image.Resampling.BOX).getdata())
+        start = _best_window(profile, round(crop_width * proxy_size[0] / img.width))
+        left = min(max(0, start * img.width / proxy_size[0]), img.width - crop_width)
+        return (left, 0, left + crop_width, img.height)
+    profile = list(energy.resize((1, proxy_size[1]), Image.Resampling.BOX).getdata())
+    start = _best_window(profile, round(crop_height * proxy_size[1] / img.height))
+    top = min(max(0, start * img.height / proxy_size[1]), img.height - crop_height)
+    return (0, top, img.width, top + crop_height)
+
+def _best_window(profile, window):
+    """
+    Returns the start of the window of the given length with the highest total
+    energy in profile, slightly favoring central windows (SMART_CROP_CENTER_BIAS).
+    Ties, including an image without detail, go to the most central window.
+    """
+    window = min(len(profile), max(1, window))
+    last_start = len(profile) - window
+    if last_start <= 0:
+        return 0
+    center = last_start / 2
+    sums = [0.0]
+    for value in profile:
+        sums.append(sums[-1] + value)
+
+    def score(start):
+        distance = abs(start - center) / center
+        return ((sums[start + window] - sums[start]) * (1 - SMART_CROP_CENTER_BIAS * distance), -distance)
+
+    return max(range(last_start + 1), key=score)
+
+# Extra edit operations (see OperationGraph) and the order their kinds run in after the resize:
+# per-pixel filters first (on the downscaled image), then canvas steps that add pixels, then overlays.
+OPERATION_KINDS = {"color": "pixel", "sharpen": "pixel", "pad": "canvas", "watermark": "overlay"}
+_OPERATION_KIND_ORDER = ("pixel", "canvas", "overlay")
+
+WATERMARK_POSITIONS = ("bottom-right", "bottom-left", "top-right", "top-left", "center")
+
+def _padded_size(size, step):
+    """Returns the size of an image after a pad step."""
+    width, height = size
+    if step.get("square", True):
+        width = height = max(width, height)
+    border = max(0, int(step.get("border", 0)))
+    return (width + border * 2, height + border * 2)
+
+class OperationGraph:
+    """
+    A chain of edit operations applied to one in-memory image after the resize.
+
+    Operations are given as dicts with a "type" from OPERATION_KINDS plus parameters:
+      {"type": "pad", "square": True, "border": 0, "color": "#FFFFFF"}
+      {"type": "sharpen", "radius": 2.0, "percent": 150, "threshold": 3}
+      {"type": "color", "brightness": 1.0, "contrast": 1.0, "saturation": 1.0}
+      {"type": "watermark", "text": "...", "image": "logo.png", "opacity": 0.5,
+       "position": "bottom-right", "scale": 0.05}
+
+    The graph always runs after the resize, and its steps are reordered by kind
+    (keeping the listed order within a kind): per-pixel filters first, so they work
+    on the downscaled image and never on padding; then padding, which is only a
+    paste; then overlays, so watermarks are placed on the final canvas.
+    Brightness and contrast are fused into a single lookup table pass, and
+    watermarks are rendered once per size and reused for every image.
+    """
+    def __init__(self, operations=()):
+        self.steps = []
+        for operation in operations:
+            kind = OPERATION_KINDS.get(operation.get("type"))
+            if kind is None:
+                raise ValueError(f"Unknown operation: {operation.get('type')}")
+            self.steps.append(dict(operation))
+        self.steps.sort(key=lambda step: _OPERATION_KIND_ORDER.index(OPERATION_KINDS[step["type"]]))
+        self._watermarks = {} # (width, height) -> rendered RGBA watermark
+        self._lock = threading.Lock()
+
+    def __bool__(self):
+        return bool(self.steps)
+
+    def output_size(self, size):
+        """Returns the image size after the geometry steps, without touching pixels."""
+        for step in self.steps:
+            if step["type"] == "pad":
+                size = _padded_size(size, step)
+        return size
+
+    def apply(self, img):
+        """Runs every step on an RGB or RGBA image and returns the result."""
+        for step in self.steps:
+            img = getattr(self, f"_apply_{step['type']}")(img, step)
+        return img
+
+    def _apply_pad(self, img, step):
+        width, height = _padded_size(img.size, step)
+        if (width, height) == img.size:
+            return img
+        color = ImageColor.getcolor(step.get("color", "#FFFFFF"), img.mode)
+        padded = Image.new(img.mode, (width, height), color)
+        padded.paste(img, ((width - img.width) // 2, (height - img.height) // 2))
+        return padded
+
+    def _apply_sharpen(self, img, step):
+        return img.filter(ImageFilter.UnsharpMask(radius=float(step.get("radius", 2.0)),
+                                                  percent=int(step.get("percent", 150)),
+                                                  threshold=int(step.get("threshold", 3))))
+
+    def _apply_color(self, img, step):
+        brightness = float(step.get("brightness", 1.0))
+        contrast = float(step.get("contrast", 1.0))
+        saturation = float(step.get("saturation", 1.0))
+        if brightness != 1.0 or contrast != 1.0:
+            # One lookup table for both: scale by brightness, then stretch around mid-gray
+            table = [max(0, min(255, round((value * brightness - 128) * contrast + 128))) for value in range(256)]
+            if img.mode == "RGBA":
+                img = img.point(table * 3 + list(range(256))) # Leave alpha untouched
+            else:
+                img = img.point(table * len(img.getbands()))
+        if saturation != 1.0:
+            img = ImageEnhance.Color(img).enhance(saturation)
+        return img
+
+    def _apply_watermark(self, img, step):
+        watermark = self._get_watermark(step, img.size)
+        if watermark is None or watermark.width > img.width or watermark.height > img.height:
+            return img
+        margin = max(1, min(img.size) // 50)
+        position = step.get("position", "bottom-right")
+        x = {"left": margin, "right": img.width - watermark.width - margin}.get(
+            position.split("-")[-1], (img.width - watermark.width) // 2)
+        y = {"top": margin, "bottom": img.height - watermark.height - margin}.get(
+            position.split("-")[0], (img.height - watermark.height) // 2)
+        img = img.copy()
+        if img.mode == "RGBA":
+            img.alpha_composite(watermark, (max(0, x), max(0, y)))
         else:
-            new_height = target_size
-            new_width = int(original_width * (target_size / original_height))
-        img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-    elif resize_mode == "crop":
-        target_aspect = target_size / target_size # Assuming square for simplicity, adjust if target_size means width, height different
-        image_aspect = original_width / original_height
-
-        if image_aspect > target_aspect:
-            new_height = target_size
-            new_width = int(original_width * (target_size / original_height))
-            img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-            left = (new_width - target_size) / 2
-            top = 0
-            right = (new_width + target_size) / 2
-            bottom = target_size
-            img = img.crop((left, top, right, bottom))
+            img.paste(watermark, (x, y), watermark)
+        return img
+
+    def _get_watermark(self, step, size):
+        """
+        Returns the watermark for an image size. Its size only depends on the image's
+        shorter side, so it is rendered once per step and watermark size and then reused.
+        """
+        scale = float(step.get("scale", 0.05))
+        opacity = max(0.0, min(1.0, float(step.get("opacity", 0.5))))
+        watermark_size = max(8, int(min(size) * scale))
+        key = (id(step), watermark_size)
+        with self._lock:
+            if key in self._watermarks:
+                return self._watermarks[key]
+        if step.get("image"):
+            with Image.open(step["image"]) as logo:
+                watermark = logo.convert("RGBA")
+            max_width = watermark_size * 4
+            if watermark.width > max_width:
+                watermark = watermark.resize((max_width, max(1, round(watermark.height * max_width / watermark.width))),
+                                             Image.Resampling.LANCZOS)
+        elif step.get("text"):
+            font = ImageFont.load_default(size=watermark_size)
+            left, top, right, bottom = font.getbbox(step["text"])
+            watermark = Image.new("RGBA", (right - left + 2, bottom - top + 2), (0, 0, 0, 0))
+            draw = ImageDraw.Draw(watermark)
+            draw.text((1 - left, 1 - top), step["text"], font=font, fill=(0, 0, 0, 255)) # Shadow
+            draw.text((-left, -top), step["text"], font=font, fill=(255, 255, 255, 255))
+        else:
+            watermark = None
+        if watermark is not None and opacity < 1.0:
+            watermark.putalpha(watermark.getchannel("A").point(lambda alpha: round(alpha * opacity)))
+        with self._lock:
+            self._watermarks[key] = watermark
+        return watermark
+
+def _encode_frame(img, index, target_size, resize_mode, output_format, quality, max_file_size=0, quality_probes=1,
+                  encoder_options=None, never_upscale=False, operations=None):
+    """
+    Resizes a single frame of an open image and returns (data, details) with the frame
+    encoded in the output format.
+    """
+    with _stage("decode"):
+        if index:
+            img.seek(index)
+        frame = img.convert("RGB")
+    with _stage("resize"):
+        frame = _resize_image(frame, target_size, resize_mode, never_upscale)
+    return encode_resized_frame(frame, output_format, quality, max_file_size, quality_probes, encoder_options,
+                                operations)
+
+def encode_resized_frame(frame, output_format, quality, max_file_size=0, quality_probes=1, encoder_options=None,
+                         operations=None):
+    """
+    Applies the optional OperationGraph to an already resized RGB frame, encodes it in the
+    output format and returns (data, details).
+    Used directly by callers that resize outside this module (e.g. the batch resize engine).
+    """
+    if operations:
+        with _stage("operations"):
+            frame = operations.apply(frame)
+    with _stage("encode"):
+        if output_format == "JPG" and max_file_size > 0:
+            data, chosen_quality, fits = encode_jpeg_to_size(frame, max_file_size, max_quality=quality,
+                                                             parallel_probes=quality_probes,
+                                                             encoder_options=encoder_options)
+            return data, {"quality": chosen_quality, "fits": fits}
+        buffer = io.BytesIO()
+        _save_image(frame, buffer, output_format, quality, encoder_options)
+        return buffer.getvalue(), {}
+
+def encode_jpeg_to_size(img, max_bytes, max_quality=95, min_quality=1, parallel_probes=1, encoder_options=None):
+    """
+    Finds the highest JPEG quality between min_quality and max_quality whose encode
+    fits in max_bytes. All probes are encoded in memory and only the winning encode
+    is kept.
+
+    With parallel_probes > 1 every search round encodes that many evenly spaced
+    qualities on a thread pool (Pillow releases the GIL while encoding) instead of
+    a single midpoint, so fewer sequential rounds are needed.
+
+    Returns (data, quality, fits). If even min_quality is too large, its encode is
+    returned with fits=False.
+    """
+    def encode(probe_quality, source=img):
+        buffer = io.BytesIO()
+        _save_image(source, buffer, "JPG", probe_quality, encoder_options)
+        return buffer.getvalue()
+
+    data = encode(max_quality)
+    if len(data) <= max_bytes:
+        return data, max_quality, True
+
+    best_data, best_quality = None, None
+    low, high = min_quality, max_quality - 1
+    executor = ThreadPoolExecutor(max_workers=parallel_probes) if parallel_probes > 1 else None
+    # Image.save() stores per-call state on the image, so concurrent probes each need their own copy
+    sources = [img.copy() for _ in range(parallel_probes)] if executor is not None else [img]
+    try:
+        while low <= high:
+            span = high - low + 1
+            candidates = sorted({min(high, low + span * (step + 1) // (parallel_probes + 1))
+                                 for step in range(max(1, parallel_probes))})
+            if executor is not None and len(candidates) > 1:
+                encodes = list(executor.map(encode, candidates, sources))
+            else:
+                encodes = [encode(candidate) for candidate in candidates]
+
+            fitting = [index for index, encoded in enumerate(encodes) if len(encoded) <= max_bytes]
+            if fitting:
+                index = fitting[-1]
+                best_data, best_quality = encodes[index], candidates[index]
+                low = candidates[index] + 1
+                if index + 1 < len(candidates):
+                    high = candidates[index + 1] - 1
+            else:
+                high = candidates[0] - 1
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    if best_data is None:
+        return encode(min_quality), min_quality, False
+    return best_data, best_quality, True
+
+def _encode_animated_gif(img, target_size, resize_mode, never_upscale=False, operations=None):
+    """
+    Resizes every frame of an animated GIF and returns the encoded animation,
+    keeping the original frame durations and loop count. Frames are written to
+    the output one by one instead of being collected first.
+    Returns (data, details) like _encode_frame.
+    """
+    buffer = io.BytesIO()
+    for index in range(img.n_frames):
+        with _stage("decode"):
+            img.seek(index)
+            duration = img.info.get("duration", 100)
+            frame = img.convert("RGBA")
+        with _stage("resize"):
+            frame = _resize_image(frame, target_size, resize_mode, never_upscale)
+        if operations:
+            with _stage("operations"):
+                frame = operations.apply(frame)
+        with _stage("encode"):
+            paletted, transparency = _quantize_gif_frame(frame)
+            if index == 0:
+                header_info = {"loop": img.info["loop"]} if "loop" in img.info else {}
+                header, _ = GifImagePlugin.getheader(paletted, info=header_info)
+                buffer.write(b"".join(header))
+            # Every frame is a complete composite, so it carries its own palette and replaces the previous one
+            params = {"duration": duration, "include_color_table": True, "disposal": 2 if transparency is not None else 1}
+            if transparency is not None:
+                params["transparency"] = transparency
+            buffer.write(b"".join(GifImagePlugin.getdata(paletted, **params)))
+    buffer.write(b";") # GIF trailer
+    return buffer.getvalue(), {}
+
+def _quantize_gif_frame(frame):
+    """
+    Converts an RGBA frame to a 256-color palette image. Returns the paletted frame
+    and its transparency index (None if the frame is fully opaque).
+    """
+    alpha = frame.getchannel("A")
+    paletted = frame.convert("RGB").quantize(colors=255)
+    if alpha.getextrema()[0] >= 128:
+        return paletted, None
+    transparent_index = 255 # Left free by quantizing to 255 colors
+    paletted.paste(transparent_index, mask=alpha.point(lambda a: 255 if a < 128 else 0))
+    return paletted, transparent_index
+
+def _select_ico_size(img, target_size):
+    """
+    Selects the embedded ICO size closest to the target size (the smallest one that
+    is at least as large, or the largest available) so larger ones are not decoded.
+    """
+    sizes = sorted(img.info.get("sizes", ()), key=lambda size: max(size))
+    if not sizes:
+        return
+    target_side = max(target_dimensions(target_size))
+    large_enough = [size for size in sizes if max(size) >= target_side]
+    img.size = large_enough[0] if large_enough else sizes[-1]
+
+def _load_and_resize(input_path, target_size, resize_mode):
+    """
+    Opens an image and applies the selected resize mode.
+    """
+    img = Image.open(input_source(input_path))
+    if img.format == "ICO":
+        _select_ico_size(img, target_size)
+    return _resize_image(img.convert("RGB"), target_size, resize_mode) # Ensure consistent mode for resizing and saving
+
+def _resize_image(img, target_size, resize_mode, never_upscale=False):
+    """
+    Applies the selected resize mode to an image.
+    With never_upscale, "fit" leaves images that are already small enough untouched.
+    The crop modes cut the source region first and scale only that region, so no
+    pixels are resampled just to be thrown away.
+    """
+    original_width, original_height = img.size
+
+    if resize_mode == "fit":
+        new_size = compute_output_size(original_width, original_height, target_size, resize_mode, never_upscale)
+        if new_size != img.size:
+            img = img.resize(new_size, Image.Resampling.LANCZOS)
+    elif resize_mode in CROP_MODES:
+        if resize_mode == "smart_crop":
+            box = find_smart_crop_box(img, target_size)
         else:
-            new_width = target_size
-            new_height = int(original_height * (target_size / original_width))
-            img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-            # Crop
-            left = 0
-            top = (new_height - target_size) / 2
-            right = target_size
-            bottom = (new_height + target_size) / 2
-            img = img.crop((left, top, right, bottom))
+            box = compute_crop_box(original_width, original_height, target_size)
+        img = img.resize(target_dimensions(target_size), Image.Resampling.LANCZOS, box=box)
     elif resize_mode == "stretch":
-        img = img.resize((target_size, target_size), Image.Resampling.LANCZOS)
+        img = img.resize(target_dimensions(target_size), Image.Resampling.LANCZOS)
 
+    return img
+
+def _save_image(img, fp, output_format, quality, encoder_options=None):
+    """
+    Encodes an image to a path or file object in the selected output format.
+    encoder_options may override DEFAULT_ENCODER_OPTIONS (JPEG optimize, progressive, subsampling;
+    WebP lossless and method).
+    """
+    options = {**DEFAULT_ENCODER_OPTIONS, **(encoder_options or {})}
+    pil_format = PIL_OUTPUT_FORMATS.get(output_format)
     if output_format == "JPG":
-        img.save(output_path, quality=quality, optimize=True)
+        img.save(fp, format=pil_format, quality=quality, optimize=options["optimize"],
+                 progressive=options["progressive"], subsampling=JPEG_SUBSAMPLING[options["subsampling"]])
     elif output_format == "PNG":
-        img.save(output_path, compress_level=9) # PNG quality is compress_level (0-9)
+        img.save(fp, format=pil_format, compress_level=9) # PNG quality is compress_level (0-9)
     elif output_format == "TGA":
-        img.save(output_path) # TGA usually doesn't have a 'quality' parameter in PIL
+        img.save(fp, format=pil_format) # TGA usually doesn't have a 'quality' parameter in PIL
+    elif output_format == "WEBP":
+        # For lossless WebP, quality sets the compression effort instead of the fidelity
+        img.save(fp, format=pil_format, quality=quality, lossless=options["webp_lossless"],
+                 method=options["webp_method"])
 
-def get_image_thumbnail(image_path, size=(100, 100)):
+def benchmark_jpeg_encoder_options(img, quality, repeats=3):
+    """
+    Encodes an image with every combination of the JPEG encoder options and returns
+    a list of {"optimize", "progressive", "subsampling", "seconds", "bytes"} dicts,
+    sorted from fastest to slowest. "seconds" is the best of `repeats` encodes.
+    """
+    img = img.convert("RGB")
+    img.load()
+    results = []
+    for optimize, progressive, subsampling in itertools.product((False, True), (False, True), JPEG_SUBSAMPLING):
+        options = {"optimize": optimize, "progressive": progressive, "subsampling": subsampling}
+        best_time = None
+        for _ in range(max(1, repeats)):
+            buffer = io.BytesIO()
+            start = time.perf_counter()
+            _save_image(img, buffer, "JPG", quality, options)
+            elapsed = time.perf_counter() - start
+            best_time = elapsed if best_time is None else min(best_time, elapsed)
+        results.append({**options, "seconds": best_time, "bytes": buffer.tell()})
+    results.sort(key=lambda result: result["seconds"])
+    return results
+
+# Thumbnail quality levels, from fastest to best looking
+THUMBNAIL_QUALITIES = ("fast", "balanced", "high")
+
+def get_image_thumbnail(image_path, size=(100, 100), quality="balanced"):
     """
     Generates a thumbnail for a given image path.
     Returns a PIL Image object.
+
+    Uses reduced decoding where the format supports it (DCT-scaled draft decoding
+    for JPEG) and, in "fast" quality, the embedded EXIF thumbnail when it is large
+    enough. Errors are raised to the caller so failures can be cached.
     """
+    img = Image.open(input_source(image_path))
+    if quality == "fast":
+        exif_thumbnail = _load_exif_thumbnail(img, size)
+        if exif_thumbnail is not None:
+            img = exif_thumbnail
+
+    if quality == "high":
+        # Decode at twice the tile size so the final LANCZOS pass has detail to work with
+        img.draft("RGB", (size[0] * 2, size[1] * 2))
+        img.thumbnail(size, Image.Resampling.LANCZOS, reducing_gap=3.0)
+    elif quality == "fast":
+        img.draft("RGB", size)
+        img.thumbnail(size, Image.Resampling.BILINEAR, reducing_gap=1.0)
+    else:
+        img.draft("RGB", size)
+        img.thumbnail(size, Image.Resampling.BICUBIC, reducing_gap=2.0)
+    return img
+
+def _load_exif_thumbnail(img, size):
+    """
+    Returns the JPEG thumbnail embedded in the image's EXIF data if it covers the
+    requested size in both dimensions, otherwise None.
+    """
+    exif_bytes = img.info.get("exif")
+    if not exif_bytes:
+        return None
     try:
-        img = Image.open(image_path)
-        img.thumbnail(size)
-        return img
-    except Exception as e:
-        print(f"Error creating thumbnail for {image_path}: {e}")
-        return Image.new("RGB", size, (200, 200, 200)) 
\ No newline at end of file
+        ifd1 = img.getexif().get_ifd(ExifTags.IFD.IFD1)
+        offset = ifd1.get(0x0201) # JPEGInterchangeFormat
+        length = ifd1.get(0x0202) # JPEGInterchangeFormatLength
+        if not offset or not length:
+            return None
+        # Offsets are relative to the TIFF header, which follows the "Exif\0\0" marker
+        header = 6 if exif_bytes.startswith(b"Exif") else 0
+        thumbnail = Image.open(io.BytesIO(exif_bytes[header + offset:header + offset + length]))
+        if thumbnail.width < size[0] or thumbnail.height < size[1]: # Would be shown upscaled and blurry
+            return None
+        thumbnail.load()
+        return thumbnail
+    except Exception:
+        return None # A broken embedded thumbnail is not an error; decode the image instead
@@ -2,21 +2,58 @@ import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 import os
 import threading
+import contextlib
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from pathlib import Path
+import tarfile
+import tempfile
 import zipfile
 import shutil
-from PIL import ImageTk, Image
+from PIL import ImageTk, Image, ImageColor
 import json
 
+try:
+    from tkinterdnd2 import DND_FILES, TkinterDnD
+except ImportError: # tkinterdnd2 is optional; drag and drop is simply unavailable without it
+    DND_FILES = TkinterDnD = None
+
 # Assuming image_processing_logic and utils are available and correctly implement their functions
-from image_processing_logic import process_image_file, get_image_thumbnail
+from functools import partial
+from image_processing_logic import (iter_image_outputs, encode_resized_frame, can_pass_through,
+                                    get_image_thumbnail, benchmark_jpeg_encoder_options,
+                                    THUMBNAIL_QUALITIES, FRAME_MODES, JPEG_SUBSAMPLING, DEFAULT_ENCODER_OPTIONS,
+                                    QUALITY_OUTPUT_FORMATS, PASSTHROUGH_MODES, OPERATION_KINDS, WATERMARK_POSITIONS,
+                                    OperationGraph, set_stage_observer, parse_target_size)
+from image_catalog import open_catalog
+from memory_profiling import MemoryProfiler
+from cpu_profiling import CpuProfiler
+from thumbnail_atlas import ThumbnailAtlas
+from ingest_queue import IngestQueue
+from spooled_inputs import (SpooledInputStore, input_source, input_stat, is_in_memory, DEFAULT_MEMORY_THRESHOLD,
+                            DEFAULT_MEMORY_LIMIT)
+from throughput_monitor import ThroughputMonitor, METRICS_LOG_NAME
+from input_prefetcher import InputPrefetcher, DEFAULT_READ_AHEAD_MEMORY, DEFAULT_READ_AHEAD_THREADS
+from memory_cache import LRUMemoryCache, pil_image_bytes, photo_image_bytes
+from job_scheduler import schedule_jobs, SCHEDULE_ORDERS
+from dry_run_planner import build_dry_run_plan, planned_schedule, format_plan_summary, save_plan
+from worker_autotuner import WorkerAutotuner, WORKER_MODES, default_max_workers
+import batch_resize_engine
+from batch_resize_engine import BatchResizeEngine
+from output_writer import AsyncOutputWriter, ArchiveOutputWriter, DURABILITY_MODES, ARCHIVE_FORMATS
 from utils import get_image_files_in_folder, is_supported_image_format, generate_unique_filename
+from archive_loaders import extract_archive_images, is_archive, archive_stem, archive_file_patterns
 
 class ImageProcessorApp:
     """
     Main application class that handles the user interface
     and orchestration of image processing.
     """
+    # How often (ms) batches from the drag-and-drop ingest queue are added to the grid
+    INGEST_POLL_MS = 200
+    # Sort options for the loaded images list (display name -> key)
+    SORT_KEYS = {"Order added": "added", "Name": "name", "Largest first": "largest", "Smallest first": "smallest"}
+
     def __init__(self, master):
         self.master = master
         self.master.title("Image Processor")
@@ -70,6 +107,11 @@ class ImageProcessorApp:
                               background=[("active", self.pastel_accent_btn)],
                               foreground=[("active", self.text_color)]) # Text changes on hover
 
+        self.master.style.configure("TCheckbutton", background=self.pastel_frame_bg, foreground=self.text_color)
+        self.master.style.map("TCheckbutton",
+                              background=[("active", self.pastel_accent_btn)],
+                              foreground=[("active", self.text_color)])
+
         # Entry (text input) fields
         self.master.style.configure("TEntry", fieldbackground="white", foreground=self.text_color, borderwidth=1, relief="solid", bordercolor=self.pastel_accent_btn)
         
@@ -109,16 +151,32 @@ class ImageProcessorApp:
             print(f"Error al establecer el icono: {e}")
         # --------------------------------------------------
 
-        self.temp_extract_dir = Path.cwd() / ".temp_extracted_images"
-
         self.image_paths = []
-        self.image_thumbnails = {}
+        self.atlas = None # ThumbnailAtlas geometry of the current grid
+        self.atlas_paths = [] # Paths shown in the grid, in tile order
+        self.thumbnail_errors = {} # path -> error message, so failing files are not re-decoded on every redraw
+        self.image_records = {} # path -> catalog record (format, dimensions, ...) for loaded images
         # Increase thumbnail size to give more space for names
         self.thumbnail_display_size = (150, 112) # Width, Height - Adjust if necessary
 
         self.output_folder = Path.home() / "ProcessedImages"
         self.config_file = Path.home() / ".image_processor_config.json"
         self._load_config()
+        # Archive members are extracted below the configured temp directory (e.g. a tmpfs like /dev/shm);
+        # small members are kept in memory and never touch it
+        self.temp_extract_dir = Path(self.initial_temp_directory or Path.cwd()) / ".temp_extracted_images"
+        self.input_store = SpooledInputStore(self.initial_archive_memory_threshold_kb * 1024,
+                                             self.initial_archive_memory_limit_mb * 1024 * 1024)
+        self.archive_extract_threads = self.initial_archive_extract_threads
+        self.archive_extraction = None # threading.Event that cancels the running archive extraction
+        self.last_plan = None # Latest dry-run plan; a run with the same images and settings reuses its probe results
+        # Thumbnail memory is split between the two caches below. Evicted entries are regenerated when they
+        # scroll back into view; evicting a page also removes its canvas items.
+        thumbnail_cache_bytes = self.initial_thumbnail_cache_mb * 1024 * 1024
+        self.image_thumbnails = LRUMemoryCache(thumbnail_cache_bytes // 2, pil_image_bytes) # path -> PIL thumbnail, composed into atlas pages when drawn
+        self.atlas_pages = LRUMemoryCache(thumbnail_cache_bytes // 2, photo_image_bytes, # page index -> PhotoImage of a drawn atlas page
+                                          on_evict=lambda page_index, _: self.files_canvas.delete(f"page{page_index}"))
+        self.catalog = open_catalog(Path.home() / ".image_processor_catalog.sqlite")
 
         # Create main_frame as the parent for all major UI sections
         self.main_frame = ttk.Frame(self.master, padding=(10, 10))
@@ -130,6 +188,12 @@ class ImageProcessorApp:
         self._setup_layout()
         self._bind_events()
         self._update_file_count()
+
+        # Dropped files, folders and archives are expanded, deduplicated and cataloged in the background
+        self.ingest_queue = IngestQueue(self._expand_dropped_path, self._scan_ingest_batch)
+        self.ingest_compute_hashes = False
+        self._ingest_polling = False
+        self._register_drop_targets()
         
         os.makedirs(self.temp_extract_dir, exist_ok=True)
         self._toggle_quality_slider()
@@ -179,6 +243,156 @@ class ImageProcessorApp:
                         self.initial_overwrite_mode = config['overwrite_mode']
                     else:
                         self.initial_overwrite_mode = "ask"
+                    if config.get('write_durability') in DURABILITY_MODES:
+                        self.initial_write_durability = config['write_durability']
+                    else:
+                        self.initial_write_durability = "batch"
+                    if 'writer_threads' in config:
+                        self.initial_writer_threads = int(config['writer_threads'])
+                    else:
+                        self.initial_writer_threads = 2
+                    if 'write_queue_size' in config:
+                        self.initial_write_queue_size = int(config['write_queue_size'])
+                    else:
+                        self.initial_write_queue_size = 16
+                    if config.get('output_target') in ("folder",) + ARCHIVE_FORMATS:
+                        self.initial_output_target = config['output_target']
+                    else:
+                        self.initial_output_target = "folder"
+                    if config.get('archive_name'):
+                        self.initial_archive_name = config['archive_name']
+                    else:
+                        self.initial_archive_name = "ProcessedImages"
+                    if config.get('thumbnail_quality') in THUMBNAIL_QUALITIES:
+                        self.initial_thumbnail_quality = config['thumbnail_quality']
+                    else:
+                        self.initial_thumbnail_quality = "balanced"
+                    if 'catalog_hashes' in config:
+                        self.initial_catalog_hashes = bool(config['catalog_hashes'])
+                    else:
+                        self.initial_catalog_hashes = False
+                    if config.get('frame_mode') in FRAME_MODES:
+                        self.initial_frame_mode = config['frame_mode']
+                    else:
+                        self.initial_frame_mode = "all"
+                    if 'max_file_size_kb' in config:
+                        self.initial_max_file_size_kb = int(config['max_file_size_kb'])
+                    else:
+                        self.initial_max_file_size_kb = 0
+                    if 'quality_probes' in config:
+                        self.initial_quality_probes = int(config['quality_probes'])
+                    else:
+                        self.initial_quality_probes = 1
+                    if 'jpeg_optimize' in config:
+                        self.initial_jpeg_optimize = bool(config['jpeg_optimize'])
+                    else:
+                        self.initial_jpeg_optimize = DEFAULT_ENCODER_OPTIONS['optimize']
+                    if 'jpeg_progressive' in config:
+                        self.initial_jpeg_progressive = bool(config['jpeg_progressive'])
+                    else:
+                        self.initial_jpeg_progressive = DEFAULT_ENCODER_OPTIONS['progressive']
+                    if config.get('jpeg_subsampling') in JPEG_SUBSAMPLING:
+                        self.initial_jpeg_subsampling = config['jpeg_subsampling']
+                    else:
+                        self.initial_jpeg_subsampling = DEFAULT_ENCODER_OPTIONS['subsampling']
+                    if 'webp_lossless' in config:
+                        self.initial_webp_lossless = bool(config['webp_lossless'])
+                    else:
+                        self.initial_webp_lossless = DEFAULT_ENCODER_OPTIONS['webp_lossless']
+                    if 'webp_method' in config:
+                        self.initial_webp_method = min(6, max(0, int(config['webp_method'])))
+                    else:
+                        self.initial_webp_method = DEFAULT_ENCODER_OPTIONS['webp_method']
+                    if config.get('passthrough_mode') in PASSTHROUGH_MODES:
+                        self.initial_passthrough_mode = config['passthrough_mode']
+                    else:
+                        self.initial_passthrough_mode = "off"
+                    if 'never_upscale' in config:
+                        self.initial_never_upscale = bool(config['never_upscale'])
+                    else:
+                        self.initial_never_upscale = False
+                    if 'batch_engine' in config:
+                        self.initial_batch_engine = bool(config['batch_engine'])
+                    else:
+                        self.initial_batch_engine = False
+                    if 'memory_profiling' in config:
+                        self.initial_memory_profiling = bool(config['memory_profiling'])
+                    else:
+                        self.initial_memory_profiling = False
+                    if 'cpu_profiling' in config:
+                        self.initial_cpu_profiling = bool(config['cpu_profiling'])
+                    else:
+                        self.initial_cpu_profiling = False
+                    if isinstance(config.get('cpu_profile_sample_every'), int) and config['cpu_profile_sample_every'] > 0:
+                        self.initial_cpu_profile_sample_every = config['cpu_profile_sample_every']
+                    else:
+                        self.initial_cpu_profile_sample_every = 1
+                    if config.get('worker_mode') in WORKER_MODES:
+                        self.initial_worker_mode = config['worker_mode']
+                    else:
+                        self.initial_worker_mode = "auto"
+                    if isinstance(config.get('processing_workers'), int) and config['processing_workers'] > 0:
+                        self.initial_processing_workers = config['processing_workers']
+                    else:
+                        self.initial_processing_workers = 2
+                    if isinstance(config.get('worker_memory_limit_mb'), int) and config['worker_memory_limit_mb'] >= 0:
+                        self.initial_worker_memory_limit_mb = config['worker_memory_limit_mb']
+                    else:
+                        self.initial_worker_memory_limit_mb = 0
+                    if isinstance(config.get('autotuned_workers'), dict):
+                        self.autotuned_workers = {folder: workers for folder, workers in config['autotuned_workers'].items()
+                                                  if isinstance(workers, int) and workers > 0}
+                    else:
+                        self.autotuned_workers = {}
+                    if config.get('schedule_order') in SCHEDULE_ORDERS:
+                        self.initial_schedule_order = config['schedule_order']
+                    else:
+                        self.initial_schedule_order = "largest_first"
+                    if isinstance(config.get('operations'), list):
+                        self.initial_operations = [operation for operation in config['operations']
+                                                   if isinstance(operation, dict) and operation.get('type') in OPERATION_KINDS]
+                    else:
+                        self.initial_operations = []
+                    if isinstance(config.get('archive_memory_threshold_kb'), int) and config['archive_memory_threshold_kb'] >= 0:
+                        self.initial_archive_memory_threshold_kb = config['archive_memory_threshold_kb']
+                    else:
+                        self.initial_archive_memory_threshold_kb = DEFAULT_MEMORY_THRESHOLD // 1024
+                    if isinstance(config.get('archive_memory_limit_mb'), int) and config['archive_memory_limit_mb'] >= 0:
+                        self.initial_archive_memory_limit_mb = config['archive_memory_limit_mb']
+                    else:
+                        self.initial_archive_memory_limit_mb = DEFAULT_MEMORY_LIMIT // (1024 * 1024)
+                    if isinstance(config.get('temp_directory'), str):
+                        self.initial_temp_directory = config['temp_directory']
+                    else:
+                        self.initial_temp_directory = ""
+                    if isinstance(config.get('archive_extract_threads'), int) and config['archive_extract_threads'] > 0:
+                        self.initial_archive_extract_threads = config['archive_extract_threads']
+                    else:
+                        self.initial_archive_extract_threads = min(8, os.cpu_count() or 1)
+                    if 'metrics_log' in config:
+                        self.initial_metrics_log = bool(config['metrics_log'])
+                    else:
+                        self.initial_metrics_log = False
+                    if isinstance(config.get('metrics_interval'), (int, float)) and config['metrics_interval'] > 0:
+                        self.initial_metrics_interval = config['metrics_interval']
+                    else:
+                        self.initial_metrics_interval = 1.0
+                    if isinstance(config.get('thumbnail_cache_mb'), int) and config['thumbnail_cache_mb'] > 0:
+                        self.initial_thumbnail_cache_mb = config['thumbnail_cache_mb']
+                    else:
+                        self.initial_thumbnail_cache_mb = 128
+                    if 'read_ahead' in config:
+                        self.initial_read_ahead = bool(config['read_ahead'])
+                    else:
+                        self.initial_read_ahead = True
+                    if isinstance(config.get('read_ahead_memory_mb'), int) and config['read_ahead_memory_mb'] > 0:
+                        self.initial_read_ahead_memory_mb = config['read_ahead_memory_mb']
+                    else:
+                        self.initial_read_ahead_memory_mb = DEFAULT_READ_AHEAD_MEMORY // (1024 * 1024)
+                    if isinstance(config.get('read_ahead_threads'), int) and config['read_ahead_threads'] > 0:
+                        self.initial_read_ahead_threads = config['read_ahead_threads']
+                    else:
+                        self.initial_read_ahead_threads = DEFAULT_READ_AHEAD_THREADS
 
             except json.JSONDecodeError:
                 print("Error reading config file. Using default values.")
@@ -198,18 +412,95 @@ class ImageProcessorApp:
         self.initial_prefix = ""
         self.initial_suffix = ""
         self.initial_overwrite_mode = "ask"
+        self.initial_write_durability = "batch"
+        self.initial_writer_threads = 2
+        self.initial_write_queue_size = 16
+        self.initial_output_target = "folder"
+        self.initial_archive_name = "ProcessedImages"
+        self.initial_thumbnail_quality = "balanced"
+        self.initial_catalog_hashes = False
+        self.initial_frame_mode = "all"
+        self.initial_max_file_size_kb = 0
+        self.initial_quality_probes = 1
+        self.initial_jpeg_optimize = DEFAULT_ENCODER_OPTIONS['optimize']
+        self.initial_jpeg_progressive = DEFAULT_ENCODER_OPTIONS['progressive']
+        self.initial_jpeg_subsampling = DEFAULT_ENCODER_OPTIONS['subsampling']
+        self.initial_webp_lossless = DEFAULT_ENCODER_OPTIONS['webp_lossless']
+        self.initial_webp_method = DEFAULT_ENCODER_OPTIONS['webp_method']
+        self.initial_passthrough_mode = "off"
+        self.initial_never_upscale = False
+        self.initial_batch_engine = False
+        self.initial_memory_profiling = False
+        self.initial_cpu_profiling = False
+        self.initial_cpu_profile_sample_every = 1
+        self.initial_worker_mode = "auto"
+        self.initial_processing_workers = 2
+        self.initial_worker_memory_limit_mb = 0
+        self.autotuned_workers = {} # output folder -> worker count chosen by the autotuner
+        self.initial_schedule_order = "largest_first"
+        self.initial_operations = []
+        self.initial_archive_memory_threshold_kb = DEFAULT_MEMORY_THRESHOLD // 1024
+        self.initial_archive_memory_limit_mb = DEFAULT_MEMORY_LIMIT // (1024 * 1024)
+        self.initial_temp_directory = "" # Empty: the current working directory
+        self.initial_archive_extract_threads = min(8, os.cpu_count() or 1)
+        self.initial_metrics_log = False
+        self.initial_metrics_interval = 1.0
+        self.initial_thumbnail_cache_mb = 128
+        self.initial_read_ahead = True
+        self.initial_read_ahead_memory_mb = DEFAULT_READ_AHEAD_MEMORY // (1024 * 1024)
+        self.initial_read_ahead_threads = DEFAULT_READ_AHEAD_THREADS
 
     def _save_config(self):
         """Saves the current user configuration to a JSON file."""
         config = {
             'output_folder': str(self.output_folder),
-            'target_size': int(self.size_entry.get()) if self.size_entry.get().isdigit() else 2048,
+            'target_size': self._get_target_size_setting(),
             'output_format': self.output_format_var.get(),
             'quality': int(self.quality_slider.get()),
             'resize_mode': self.resize_mode_var.get(),
             'prefix': self.prefix_entry.get(),
             'suffix': self.suffix_entry.get(),
             'overwrite_mode': self.overwrite_var.get(),
+            'write_durability': self.write_durability_var.get(),
+            'writer_threads': self.writer_threads_var.get(),
+            'write_queue_size': self.write_queue_size_var.get(),
+            'output_target': self.output_target_var.get(),
+            'archive_name': self.archive_name_var.get(),
+            'thumbnail_quality': self.thumbnail_quality_var.get(),
+            'catalog_hashes': self.catalog_hashes_var.get(),
+            'frame_mode': self.frame_mode_var.get(),
+            'max_file_size_kb': self._get_int_option(self.max_file_size_kb_var, 0, minimum=0),
+            'quality_probes': self._get_int_option(self.quality_probes_var, 1),
+            'jpeg_optimize': self.jpeg_optimize_var.get(),
+            'jpeg_progressive': self.jpeg_progressive_var.get(),
+            'jpeg_subsampling': self.jpeg_subsampling_var.get(),
+            'webp_lossless': self.webp_lossless_var.get(),
+            'webp_method': self._get_webp_method(),
+            'passthrough_mode': self.passthrough_mode_var.get(),
+            'never_upscale': self.never_upscale_var.get(),
+            'batch_engine': self.batch_engine_var.get(),
+            'memory_profiling': self.memory_profiling_var.get(),
+            'cpu_profiling': self.cpu_profiling_var.get(),
+            'cpu_profile_sample_every': self._get_int_option(self.cpu_profile_sample_every_var, 1),
+            'worker_mode': self.worker_mode_var.get(),
+            'processing_workers': self._get_int_option(self.processing_workers_var, 2),
+            'worker_memory_limit_mb': self._get_int_option(self.worker_memory_limit_mb_var, 0, minimum=0),
+            'autotuned_workers': self.autotuned_workers,
+            'schedule_order': self.schedule_order_var.get(),
+            'operations': self._get_operations(),
+            'archive_memory_threshold_kb': self._get_int_option(self.archive_memory_threshold_kb_var,
+                                                                DEFAULT_MEMORY_THRESHOLD // 1024, minimum=0),
+            'archive_memory_limit_mb': self._get_int_option(self.archive_memory_limit_mb_var,
+                                                            DEFAULT_MEMORY_LIMIT // (1024 * 1024), minimum=0),
+            'temp_directory': self.temp_directory_var.get().strip(),
+            'archive_extract_threads': self._get_int_option(self.archive_extract_threads_var, min(8, os.cpu_count() or 1)),
+            'metrics_log': self.metrics_log_var.get(),
+            'metrics_interval': self._get_float_option(self.metrics_interval_var, 1.0, minimum=0.1),
+            'thumbnail_cache_mb': self._get_int_option(self.thumbnail_cache_mb_var, 128),
+            'read_ahead': self.read_ahead_var.get(),
+            'read_ahead_memory_mb': self._get_int_option(self.read_ahead_memory_mb_var,
+                                                         DEFAULT_READ_AHEAD_MEMORY // (1024 * 1024)),
+            'read_ahead_threads': self._get_int_option(self.read_ahead_threads_var, DEFAULT_READ_AHEAD_THREADS),
         }
         try:
             with open(self.config_file, 'w') as f:
@@ -220,11 +511,22 @@ class ImageProcessorApp:
     def on_closing(self):
         """Handles window closing event to clean up temporary files."""
         self._save_config()
+        self.ingest_queue.close()
         self._cleanup_temp_dir()
+        self.catalog.close()
         self.master.destroy()
 
     def _cleanup_temp_dir(self):
-        """Deletes the temporary ZIP extraction directory."""
+        """
+        Deletes the temporary ZIP extraction directory and frees the members held in memory.
+        A running extraction is cancelled; it extracts into its own directory, which it
+        removes (with its store entries) when it finishes.
+        """
+        if self.archive_extraction is not None: # Its members would be deleted underneath it
+            self.archive_extraction.set()
+            self.archive_extraction = None
+            self.btn_load_zip.config(text="Load Archive", command=self._load_zip)
+        self.input_store.clear()
         if self.temp_extract_dir.exists():
             try:
                 shutil.rmtree(self.temp_extract_dir)
@@ -239,7 +541,7 @@ class ImageProcessorApp:
         self.input_frame = ttk.Frame(self.main_frame, padding=(10, 10))
         self.btn_select_folder = ttk.Button(self.input_frame, text="Add Folder", command=self._select_folder)
         self.btn_select_files = ttk.Button(self.input_frame, text="Add Files", command=self._select_files)
-        self.btn_load_zip = ttk.Button(self.input_frame, text="Load ZIP", command=self._load_zip)
+        self.btn_load_zip = ttk.Button(self.input_frame, text="Load Archive", command=self._load_zip)
         
         # --- Loaded Files List with Thumbnails ---
         # Changed parent from self.master to self.main_frame
@@ -247,14 +549,18 @@ class ImageProcessorApp:
         # Set canvas background directly for tk.Canvas
         self.files_canvas = tk.Canvas(self.files_frame, bg=self.pastel_bg_main, borderwidth=1, relief="sunken")
         self.files_scrollbar_y = ttk.Scrollbar(self.files_frame, orient="vertical", command=self.files_canvas.yview)
-        self.files_canvas.configure(yscrollcommand=self.files_scrollbar_y.set)
-        
-        self.files_inner_frame = ttk.Frame(self.files_canvas)
-        self.canvas_window_id = self.files_canvas.create_window((0, 0), window=self.files_inner_frame, anchor="nw")
-
-        self.files_inner_frame.bind("<Configure>", self._on_inner_frame_configure)
+        self.files_canvas.configure(yscrollcommand=self._on_files_scrolled)
 
         self.btn_clear_all_images = ttk.Button(self.files_frame, text="Clear All", command=self._clear_loaded_images)
+
+        # Sorting and filtering by the dimensions stored in the image catalog
+        self.files_toolbar = ttk.Frame(self.files_frame, style="ImageItem.TFrame")
+        self.sort_label = ttk.Label(self.files_toolbar, text="Sort:")
+        self.sort_var = tk.StringVar(value="Order added")
+        self.sort_combobox = ttk.Combobox(self.files_toolbar, textvariable=self.sort_var, state="readonly", width=14,
+                                          values=list(self.SORT_KEYS))
+        self.min_side_label = ttk.Label(self.files_toolbar, text="Min. longest side (px):")
+        self.min_side_entry = ttk.Entry(self.files_toolbar, width=7)
         # Ensure label background is set
         self.file_count_label = ttk.Label(self.files_frame, text="0 files selected", font=("Arial", 9, "bold"), background=self.pastel_frame_bg)
 
@@ -263,29 +569,33 @@ class ImageProcessorApp:
         self.config_frame = ttk.LabelFrame(self.main_frame, text="Processing Configuration", padding=(10, 10))
         
         # Size
-        self.size_label = ttk.Label(self.config_frame, text="Target Size (px, longest side):")
+        self.size_label = ttk.Label(self.config_frame, text="Target Size (px, longest side or WxH):")
         self.size_entry = ttk.Entry(self.config_frame)
         self.size_entry.insert(0, self.initial_target_size)
 
         self.preset_1k_btn = ttk.Button(self.config_frame, text="1024 px", command=lambda: self.size_entry.delete(0, tk.END) or self.size_entry.insert(0, "1024"))
         self.preset_2k_btn = ttk.Button(self.config_frame, text="2048 px", command=lambda: self.size_entry.delete(0, tk.END) or self.size_entry.insert(0, "2048"))
         self.preset_4k_btn = ttk.Button(self.config_frame, text="4096 px", command=lambda: self.size_entry.delete(0, tk.END) or self.size_entry.insert(0, "4096"))
+        self.preset_banner_btn = ttk.Button(self.config_frame, text="1920x1080", command=lambda: self.size_entry.delete(0, tk.END) or self.size_entry.insert(0, "1920x1080"))
 
         # Resize Modes
         self.resize_mode_label = ttk.Label(self.config_frame, text="Resize Mode:")
         self.resize_mode_var = tk.StringVar(value=self.initial_resize_mode)
         self.radio_fit = ttk.Radiobutton(self.config_frame, text="Fit (Maintain Aspect)", variable=self.resize_mode_var, value="fit")
         self.radio_crop = ttk.Radiobutton(self.config_frame, text="Crop (Fill, Clip)", variable=self.resize_mode_var, value="crop")
+        self.radio_smart_crop = ttk.Radiobutton(self.config_frame, text="Smart Crop (Content-aware)", variable=self.resize_mode_var, value="smart_crop")
         self.radio_stretch = ttk.Radiobutton(self.config_frame, text="Stretch (Distort)", variable=self.resize_mode_var, value="stretch")
         
         # Output Format and Quality
         self.output_format_label = ttk.Label(self.config_frame, text="Output Format:")
         self.output_format_var = tk.StringVar(value=self.initial_output_format)
-        self.radio_jpg = ttk.Radiobutton(self.config_frame, text="JPG", variable=self.output_format_var, value="JPG", command=self._toggle_quality_slider)
-        self.radio_png = ttk.Radiobutton(self.config_frame, text="PNG", variable=self.output_format_var, value="PNG", command=self._toggle_quality_slider)
-        self.radio_tga = ttk.Radiobutton(self.config_frame, text="TGA", variable=self.output_format_var, value="TGA", command=self._toggle_quality_slider)
+        self.output_format_frame = ttk.Frame(self.config_frame, style="ImageItem.TFrame")
+        self.radio_jpg = ttk.Radiobutton(self.output_format_frame, text="JPG", variable=self.output_format_var, value="JPG", command=self._toggle_quality_slider)
+        self.radio_png = ttk.Radiobutton(self.output_format_frame, text="PNG", variable=self.output_format_var, value="PNG", command=self._toggle_quality_slider)
+        self.radio_tga = ttk.Radiobutton(self.output_format_frame, text="TGA", variable=self.output_format_var, value="TGA", command=self._toggle_quality_slider)
+        self.radio_webp = ttk.Radiobutton(self.output_format_frame, text="WebP", variable=self.output_format_var, value="WEBP", command=self._toggle_quality_slider)
 
-        self.quality_label = ttk.Label(self.config_frame, text="JPG Quality (1-100):")
+        self.quality_label = ttk.Label(self.config_frame, text="Quality (1-100):")
         self.quality_value_label = ttk.Label(self.config_frame, text=str(self.initial_quality))
         self.quality_slider = ttk.Scale(self.config_frame, from_=1, to=100, orient="horizontal", command=self._update_quality_label_value)
         self.quality_slider.set(self.initial_quality)
@@ -308,14 +618,74 @@ class ImageProcessorApp:
         # Output Folder
         self.output_folder_frame = ttk.Frame(self.config_frame, padding=(5,5))
         self.btn_select_output = ttk.Button(self.output_folder_frame, text="Choose Output Folder", command=self._select_output_folder)
+        self.btn_advanced_options = ttk.Button(self.output_folder_frame, text="Advanced Options...", command=self._open_advanced_options)
         # Ensure label background is set
         self.output_folder_label = ttk.Label(self.output_folder_frame, text=f"Output: {self.output_folder.name}", wraplength=250, font=("Arial", 9), background=self.pastel_frame_bg)
 
+        # Advanced options (edited in a separate window, see _open_advanced_options)
+        self.advanced_window = None
+        self.write_durability_var = tk.StringVar(value=self.initial_write_durability)
+        self.writer_threads_var = tk.IntVar(value=self.initial_writer_threads)
+        self.write_queue_size_var = tk.IntVar(value=self.initial_write_queue_size)
+        self.output_target_var = tk.StringVar(value=self.initial_output_target)
+        self.archive_name_var = tk.StringVar(value=self.initial_archive_name)
+        self.thumbnail_quality_var = tk.StringVar(value=self.initial_thumbnail_quality)
+        self.catalog_hashes_var = tk.BooleanVar(value=self.initial_catalog_hashes)
+        self.frame_mode_var = tk.StringVar(value=self.initial_frame_mode)
+        self.max_file_size_kb_var = tk.IntVar(value=self.initial_max_file_size_kb)
+        self.quality_probes_var = tk.IntVar(value=self.initial_quality_probes)
+        self.jpeg_optimize_var = tk.BooleanVar(value=self.initial_jpeg_optimize)
+        self.jpeg_progressive_var = tk.BooleanVar(value=self.initial_jpeg_progressive)
+        self.jpeg_subsampling_var = tk.StringVar(value=self.initial_jpeg_subsampling)
+        self.webp_lossless_var = tk.BooleanVar(value=self.initial_webp_lossless)
+        self.webp_method_var = tk.IntVar(value=self.initial_webp_method)
+        self.passthrough_mode_var = tk.StringVar(value=self.initial_passthrough_mode)
+        self.never_upscale_var = tk.BooleanVar(value=self.initial_never_upscale)
+        self.batch_engine_var = tk.BooleanVar(value=self.initial_batch_engine)
+        self.memory_profiling_var = tk.BooleanVar(value=self.initial_memory_profiling)
+        self.cpu_profiling_var = tk.BooleanVar(value=self.initial_cpu_profiling)
+        self.cpu_profile_sample_every_var = tk.IntVar(value=self.initial_cpu_profile_sample_every)
+        self.worker_mode_var = tk.StringVar(value=self.initial_worker_mode)
+        self.processing_workers_var = tk.IntVar(value=self.initial_processing_workers)
+        self.worker_memory_limit_mb_var = tk.IntVar(value=self.initial_worker_memory_limit_mb)
+        self.schedule_order_var = tk.StringVar(value=self.initial_schedule_order)
+        self.archive_memory_threshold_kb_var = tk.IntVar(value=self.initial_archive_memory_threshold_kb)
+        self.archive_memory_limit_mb_var = tk.IntVar(value=self.initial_archive_memory_limit_mb)
+        self.temp_directory_var = tk.StringVar(value=self.initial_temp_directory)
+        self.archive_extract_threads_var = tk.IntVar(value=self.initial_archive_extract_threads)
+        self.metrics_log_var = tk.BooleanVar(value=self.initial_metrics_log)
+        self.metrics_interval_var = tk.DoubleVar(value=self.initial_metrics_interval)
+        self.thumbnail_cache_mb_var = tk.IntVar(value=self.initial_thumbnail_cache_mb)
+        self.read_ahead_var = tk.BooleanVar(value=self.initial_read_ahead)
+        self.read_ahead_memory_mb_var = tk.IntVar(value=self.initial_read_ahead_memory_mb)
+        self.read_ahead_threads_var = tk.IntVar(value=self.initial_read_ahead_threads)
+        # Edit operations; parameters without a widget (e.g. a watermark image) are kept from the config
+        self.operation_settings = {operation['type']: dict(operation) for operation in self.initial_operations}
+        color = self.operation_settings.get('color', {})
+        sharpen = self.operation_settings.get('sharpen', {})
+        pad = self.operation_settings.get('pad', {})
+        watermark = self.operation_settings.get('watermark', {})
+        self.brightness_var = tk.DoubleVar(value=color.get('brightness', 1.0))
+        self.contrast_var = tk.DoubleVar(value=color.get('contrast', 1.0))
+        self.saturation_var = tk.DoubleVar(value=color.get('saturation', 1.0))
+        self.sharpen_var = tk.BooleanVar(value='sharpen' in self.operation_settings)
+        self.sharpen_percent_var = tk.IntVar(value=sharpen.get('percent', 150))
+        self.pad_var = tk.BooleanVar(value='pad' in self.operation_settings)
+        self.pad_border_var = tk.IntVar(value=pad.get('border', 0))
+        self.pad_color_var = tk.StringVar(value=pad.get('color', "#FFFFFF"))
+        self.watermark_text_var = tk.StringVar(value=watermark.get('text', ""))
+        self.watermark_opacity_var = tk.DoubleVar(value=watermark.get('opacity', 0.5))
+        self.watermark_position_var = tk.StringVar(value=watermark.get('position', "bottom-right"))
+
         # --- Processing Controls ---
         # Changed parent from self.master to self.main_frame
         self.controls_frame = ttk.Frame(self.main_frame, padding=(10, 5))
-        self.process_button = ttk.Button(self.controls_frame, text="Start Processing", command=self._start_processing, style="Accent.TButton")
+        self.run_buttons_frame = ttk.Frame(self.controls_frame)
+        self.process_button = ttk.Button(self.run_buttons_frame, text="Start Processing", command=self._start_processing, style="Accent.TButton")
+        self.dry_run_button = ttk.Button(self.run_buttons_frame, text="Dry Run...", command=self._start_dry_run)
         self.progress_bar = ttk.Progressbar(self.controls_frame, orient="horizontal", mode="determinate")
+        # Live throughput of the running batch (see ThroughputMonitor)
+        self.metrics_label = ttk.Label(self.controls_frame, text="", font=("Arial", 9), background=self.pastel_bg_main)
         # Ensure label background is set
         self.status_label = ttk.Label(self.controls_frame, text="Ready.", font=("Arial", 10, "italic"), background=self.pastel_bg_main)
 
@@ -344,6 +714,11 @@ class ImageProcessorApp:
 
         self.btn_clear_all_images.grid(row=0, column=0, padx=5, pady=5, sticky="ne") # Top right
         self.file_count_label.grid(row=0, column=0, padx=5, pady=5, sticky="nw") # Top left
+        self.files_toolbar.grid(row=0, column=0, padx=5, pady=5, sticky="n") # Top center
+        self.sort_label.pack(side="left", padx=(0, 2))
+        self.sort_combobox.pack(side="left", padx=(0, 10))
+        self.min_side_label.pack(side="left", padx=(0, 2))
+        self.min_side_entry.pack(side="left")
 
         self.files_canvas.grid(row=1, column=0, padx=5, pady=5, sticky="nsew")
         self.files_scrollbar_y.grid(row=1, column=1, sticky="ns")
@@ -366,18 +741,22 @@ class ImageProcessorApp:
         self.preset_1k_btn.grid(row=0, column=2, padx=2, pady=5, sticky="ew")
         self.preset_2k_btn.grid(row=0, column=3, padx=2, pady=5, sticky="ew")
         self.preset_4k_btn.grid(row=0, column=4, padx=2, pady=5, sticky="ew")
+        self.preset_banner_btn.grid(row=0, column=5, padx=2, pady=5, sticky="w")
 
         # Resize Modes row
         self.resize_mode_label.grid(row=1, column=0, padx=5, pady=5, sticky="w")
-        self.radio_fit.grid(row=1, column=1, columnspan=2, padx=5, pady=2, sticky="w")
-        self.radio_crop.grid(row=1, column=3, columnspan=2, padx=5, pady=2, sticky="w")
-        self.radio_stretch.grid(row=1, column=5, columnspan=2, padx=5, pady=2, sticky="w")
+        self.radio_fit.grid(row=1, column=1, padx=5, pady=2, sticky="w")
+        self.radio_crop.grid(row=1, column=2, padx=5, pady=2, sticky="w")
+        self.radio_smart_crop.grid(row=1, column=3, padx=5, pady=2, sticky="w")
+        self.radio_stretch.grid(row=1, column=4, columnspan=2, padx=5, pady=2, sticky="w")
         
         # Output Format and Quality row
         self.output_format_label.grid(row=2, column=0, padx=5, pady=5, sticky="w")
-        self.radio_jpg.grid(row=2, column=1, padx=5, pady=5, sticky="w")
-        self.radio_png.grid(row=2, column=2, padx=5, pady=5, sticky="w")
-        self.radio_tga.grid(row=2, column=3, padx=5, pady=5, sticky="w")
+        self.output_format_frame.grid(row=2, column=1, columnspan=3, sticky="w")
+        self.radio_jpg.grid(row=0, column=0, padx=5, pady=5, sticky="w")
+        self.radio_png.grid(row=0, column=1, padx=5, pady=5, sticky="w")
+        self.radio_tga.grid(row=0, column=2, padx=5, pady=5, sticky="w")
+        self.radio_webp.grid(row=0, column=3, padx=5, pady=5, sticky="w")
         self.quality_label.grid(row=2, column=4, padx=5, pady=5, sticky="w")
         self.quality_slider.grid(row=2, column=5, padx=5, pady=5, sticky="ew")
         self.quality_value_label.grid(row=2, column=6, padx=5, pady=5, sticky="w")
@@ -401,17 +780,77 @@ class ImageProcessorApp:
         self.output_folder_frame.grid_columnconfigure(1, weight=1) # Label should expand
         self.btn_select_output.grid(row=0, column=0, padx=5, pady=5, sticky="w")
         self.output_folder_label.grid(row=0, column=1, padx=5, pady=5, sticky="ew")
+        self.btn_advanced_options.grid(row=0, column=2, padx=5, pady=5, sticky="e")
 
 
         self.controls_frame.grid(row=3, column=0, padx=10, pady=10, sticky="ew")
         self.controls_frame.grid_columnconfigure(0, weight=1) # Allow button/progress to center/fill
-        self.process_button.pack(pady=5) # Using pack here for simplicity of single item
+        self.run_buttons_frame.pack(pady=5)
+        self.process_button.pack(side="left", padx=5)
+        self.dry_run_button.pack(side="left", padx=5)
         self.progress_bar.pack(fill="x", pady=5)
+        self.metrics_label.pack(fill="x", pady=(0, 5))
         self.status_label.pack(side="left", anchor="w", pady=5) # Align status to left
 
     def _bind_events(self):
         """Configures additional UI events."""
-        pass
+        self.sort_combobox.bind("<<ComboboxSelected>>", self._on_sort_filter_changed)
+        self.min_side_entry.bind("<Return>", self._on_sort_filter_changed)
+        self.min_side_entry.bind("<FocusOut>", self._on_sort_filter_changed)
+
+    def _on_sort_filter_changed(self, event=None):
+        """Redraws the grid after the sort order or dimension filter changed."""
+        self._update_file_list_with_thumbnails()
+        self._update_file_count()
+
+    def _get_visible_paths(self):
+        """
+        Returns the loaded paths after applying the dimension filter and sort order.
+        Uses the catalog records, so no image has to be opened.
+        """
+        paths = self.image_paths
+        min_side = self.min_side_entry.get().strip()
+        if min_side.isdigit() and int(min_side) > 0:
+            min_side = int(min_side)
+            paths = [path for path in paths
+                     if max(self._get_image_dimensions(path)) >= min_side]
+
+        sort_key = self.SORT_KEYS.get(self.sort_var.get())
+        if sort_key == "name":
+            paths = sorted(paths, key=lambda path: path.name.lower())
+        elif sort_key in ("largest", "smallest"):
+            paths = sorted(paths, key=lambda path: self._get_pixel_count(path), reverse=sort_key == "largest")
+        return list(paths)
+
+    def _get_image_dimensions(self, path):
+        """Returns (width, height) from the catalog record of a loaded image, or (0, 0) if unknown."""
+        record = self.image_records.get(path)
+        if record is None or record["width"] is None:
+            return (0, 0)
+        return (record["width"], record["height"])
+
+    def _get_pixel_count(self, path):
+        """Returns the pixel count of a loaded image from its catalog record (0 if unknown)."""
+        width, height = self._get_image_dimensions(path)
+        return width * height
+
+    def _catalog_paths(self, paths):
+        """Updates the catalog for newly added paths and keeps their records in memory."""
+        self.image_records.update(self._scan_catalog(paths, self.catalog_hashes_var.get()))
+
+    def _scan_catalog(self, paths, compute_hash=False):
+        """
+        Catalogs paths and returns their records. Archive members (in memory or in the
+        temporary extraction directory) are probed but not stored, since their paths
+        are gone after the next clear and would only grow the catalog.
+        """
+        temporary = [path for path in paths if Path(path).is_relative_to(self.temp_extract_dir)]
+        if not temporary:
+            return self.catalog.scan(paths, compute_hash=compute_hash)
+        temporary_set = set(temporary)
+        records = self.catalog.scan([path for path in paths if path not in temporary_set], compute_hash=compute_hash)
+        records.update(self.catalog.scan(temporary, compute_hash=compute_hash, store=False))
+        return records
 
     def _on_mousewheel(self, event):
         """Handles mouse wheel scrolling for the canvas."""
@@ -422,12 +861,92 @@ class ImageProcessorApp:
         elif event.num == 5: # Linux scroll down
             self.files_canvas.yview_scroll(1, "units")
 
-    def _add_image_path(self, path):
-        """Adds a single image path to the list and updates the UI with thumbnail."""
-        if path not in self.image_paths:
-            self.image_paths.append(path)
-            self._update_file_list_with_thumbnails()
-            self._update_file_count()
+    def _add_image_paths(self, paths, records=None):
+        """
+        Adds image paths in bulk, skipping already loaded ones, with a single grid update.
+        records may hold catalog records already scanned for the paths. Returns the number added.
+        """
+        loaded = set(self.image_paths)
+        new_paths = []
+        for path in paths:
+            if path not in loaded:
+                loaded.add(path)
+                new_paths.append(path)
+        if not new_paths:
+            return 0
+        self.image_paths.extend(new_paths)
+        if records is None:
+            self._catalog_paths(new_paths)
+        else:
+            self.image_records.update({path: records[path] for path in new_paths if path in records})
+        self._update_file_list_with_thumbnails()
+        self._update_file_count()
+        return len(new_paths)
+
+    def _register_drop_targets(self):
+        """Accepts files, folders and archives dropped on the window (needs tkinterdnd2 and a TkinterDnD root)."""
+        if DND_FILES is None:
+            return
+        for widget in (self.master, self.files_canvas):
+            try:
+                widget.drop_target_register(DND_FILES)
+                widget.dnd_bind("<<Drop>>", self._on_drop)
+            except (AttributeError, tk.TclError) as e: # Plain tk.Tk root without the tkdnd package
+                print(f"Drag and drop is not available: {e}")
+                return
+
+    def _on_drop(self, event):
+        """Queues dropped paths for background ingestion."""
+        raw_paths = self.master.tk.splitlist(event.data)
+        self.ingest_compute_hashes = self.catalog_hashes_var.get()
+        self._apply_archive_settings()
+        self.ingest_queue.submit(raw_paths, self.image_paths)
+        self.status_label.config(text=f"Adding {len(raw_paths)} dropped item(s)...", foreground="blue")
+        if not self._ingest_polling:
+            self._ingest_polling = True
+            self.master.after(self.INGEST_POLL_MS, self._poll_ingest_queue)
+        return event.action
+
+    def _expand_dropped_path(self, path):
+        """
+        Runs on the ingest thread: returns the supported images of a dropped file,
+        folder or archive (extracted to the input store and the temporary directory).
+        """
+        if path.is_dir():
+            return get_image_files_in_folder(path)
+        if is_archive(path):
+            extracted_paths, _ = extract_archive_images(path, self._new_extract_dir(path.name), self.input_store,
+                                                        max_workers=self.archive_extract_threads)
+            return extracted_paths
+        if path.is_file() and is_supported_image_format(path):
+            return [path]
+        return []
+
+    def _scan_ingest_batch(self, paths):
+        """Runs on the ingest thread: catalogs a batch of dropped images."""
+        return self._scan_catalog(paths, self.ingest_compute_hashes)
+
+    def _poll_ingest_queue(self):
+        """Adds all batches ingested since the last poll with a single grid update."""
+        pending = self.ingest_queue.pending # Read first: batches are queued before a drop counts as done
+        batches = self.ingest_queue.poll()
+        if batches:
+            paths = []
+            records = {}
+            error_count = 0
+            for batch_paths, batch_records, errors in batches:
+                paths.extend(batch_paths)
+                records.update(batch_records or {})
+                error_count += len(errors)
+            added_count = self._add_image_paths(paths, records)
+            status_text = f"Added {added_count} dropped images. Total: {len(self.image_paths)}."
+            if error_count:
+                status_text += f" {error_count} item(s) could not be added."
+            self.status_label.config(text=status_text, foreground="red" if error_count else "green")
+        if pending:
+            self.master.after(self.INGEST_POLL_MS, self._poll_ingest_queue)
+        else:
+            self._ingest_polling = False
 
     def _add_images_from_path(self, folder_path):
         """Adds all supported images from a folder."""
@@ -436,93 +955,131 @@ class ImageProcessorApp:
             messagebox.showinfo("Information", f"No supported images found in '{folder_path}'.")
             return
         
-        for img_path in found_images:
-            if img_path not in self.image_paths:
-                self.image_paths.append(img_path)
-        
-        self._update_file_list_with_thumbnails()
-        self._update_file_count()
+        self._add_image_paths(found_images)
 
     def _update_file_list_with_thumbnails(self):
-        """Updates the list of loaded files with thumbnails in a grid layout."""
-        for widget in self.files_inner_frame.winfo_children():
-            widget.destroy()
-        self.image_thumbnails.clear() # Clear references to allow garbage collection
+        """
+        Lays out the loaded files as a grid of tiles. Tiles are drawn from shared
+        thumbnail atlas pages, and pages are only composed once they scroll into view.
+        """
+        self.files_canvas.delete("tile")
+        self.atlas_pages.clear() # Clear references to allow garbage collection
+        thumbnail_cache_bytes = self._get_int_option(self.thumbnail_cache_mb_var, 128) * 1024 * 1024
+        self.image_thumbnails.max_bytes = self.atlas_pages.max_bytes = thumbnail_cache_bytes // 2
+        self.image_thumbnails.trim()
 
         self.files_canvas.update_idletasks() # Ensure canvas has rendered to get correct width
         canvas_width = self.files_canvas.winfo_width()
-        if canvas_width == 0:
+        if canvas_width <= 1:
             canvas_width = self.files_canvas.winfo_reqwidth() or 600
-        
-        thumbnail_area_width = self.thumbnail_display_size[0]
-        padding = 10 # Padding around each item frame
-        
-        item_total_width = thumbnail_area_width + (padding * 2) + 20 # 20 for some extra buffer
 
-        num_columns = max(1, int(canvas_width / item_total_width))
-        
-        for i in range(num_columns):
-            self.files_inner_frame.grid_columnconfigure(i, weight=1)
-
-        row, col = 0, 0
-        for i, path in enumerate(self.image_paths):
-            item_frame = ttk.Frame(self.files_inner_frame, relief="ridge", borderwidth=1, style="ImageItem.TFrame")
-            item_frame.grid(row=row, column=col, padx=padding, pady=padding, sticky="nsew")
-            
-            try:
-                thumbnail_pil = get_image_thumbnail(path, self.thumbnail_display_size)
-                thumbnail_tk = ImageTk.PhotoImage(thumbnail_pil)
-                self.image_thumbnails[path] = thumbnail_tk # Keep strong reference
+        self.atlas_paths = self._get_visible_paths()
+        num_columns = ThumbnailAtlas.columns_for_width(canvas_width, self.thumbnail_display_size)
+        self.atlas = ThumbnailAtlas(self.thumbnail_display_size, num_columns)
+        self.files_canvas.config(scrollregion=(0, 0, canvas_width, self.atlas.total_height(len(self.atlas_paths))))
+        self._render_visible_pages()
 
-                img_label = ttk.Label(item_frame, image=thumbnail_tk)
-                img_label.pack(side="top", pady=(5,0)) # Padding at top only for image
-            except Exception as e:
-                print(f"Could not generate thumbnail for {path.name}: {e}")
-                error_label = ttk.Label(item_frame, text="[Thumbnail Error]",
-                                        width=int(self.thumbnail_display_size[0] / 8), # Approx char width
-                                        anchor="center", background=self.pastel_frame_bg) # Set background
-                error_label.pack(side="top", pady=(5,0), fill="x", expand=True)
-
-            file_name_label = ttk.Label(item_frame, text=path.name,
-                                        wraplength=self.thumbnail_display_size[0] + 10, # Give a bit more space than image width
-                                        justify="center", # Center text if wrapped
-                                        anchor="n", background=self.pastel_frame_bg) # Set background
-            file_name_label.pack(side="top", fill="x", expand=True, padx=2, pady=2)
-
-            remove_button = ttk.Button(item_frame, text="X", command=lambda p=path: self._remove_image_from_list(p), width=3)
-            remove_button.pack(side="bottom", pady=2)
-
-            col += 1
-            if col >= num_columns:
-                col = 0
-                row += 1
-        
-        self.files_inner_frame.update_idletasks() 
-        self.files_canvas.config(scrollregion=self.files_canvas.bbox("all"))
+    def _render_visible_pages(self):
+        """
+        Composes and draws the atlas pages in the visible part of the canvas that are
+        not drawn yet. Off-screen pages beyond the memory budget are evicted.
+        """
+        if self.atlas is None or not self.atlas_paths:
+            return
+        top = self.files_canvas.canvasy(0)
+        bottom = top + max(self.files_canvas.winfo_height(), 1)
+        visible_pages = self.atlas.visible_pages(top, bottom, len(self.atlas_paths))
+        self.atlas_pages.touch(visible_pages)
+        for page_index in visible_pages:
+            if page_index not in self.atlas_pages:
+                self._draw_atlas_page(page_index, keep=visible_pages)
+
+    def _draw_atlas_page(self, page_index, keep=()):
+        """
+        Draws one atlas page as a single canvas image plus the text items of its
+        tiles, all tagged "page<index>" so an evicted page can be removed.
+        Pages in keep are not evicted to make room for it.
+        """
+        tile_indexes = self.atlas.page_range(page_index, len(self.atlas_paths))
+        paths = [self.atlas_paths[tile_index] for tile_index in tile_indexes]
+        thumbnails = [self._get_thumbnail(path) for path in paths]
+        page = self.atlas.compose_page(page_index, thumbnails, self.pastel_bg_main, self.pastel_frame_bg, "#90A4AE")
+        page_tk = ImageTk.PhotoImage(page)
+        page_tag = f"page{page_index}"
+        self.atlas_pages.put(page_index, page_tk, keep) # Keep strong reference
+        self.files_canvas.create_image(*self.atlas.page_origin(page_index), image=page_tk, anchor="nw", tags=("tile", page_tag))
+
+        thumbnail_width, thumbnail_height = self.thumbnail_display_size
+        for tile_index, path, thumbnail in zip(tile_indexes, paths, thumbnails):
+            left, top, right, bottom = self.atlas.tile_box(tile_index)
+            center_x = (left + right) // 2
+            text_top = top + self.atlas.padding // 2 + thumbnail_height + 4
+            if thumbnail is None:
+                self.files_canvas.create_text(center_x, top + self.atlas.padding // 2 + thumbnail_height // 2,
+                                              text="[Thumbnail Error]", fill="red", tags=("tile", page_tag))
+
+            width, height = self._get_image_dimensions(path)
+            file_name = path.name if len(path.name) <= 40 else f"{path.name[:18]}...{path.name[-18:]}"
+            file_name_text = f"{file_name}\n{width} x {height}" if width else file_name
+            self.files_canvas.create_text(center_x, text_top, text=file_name_text, anchor="n", justify="center",
+                                          width=thumbnail_width + 10, tags=("tile", page_tag))
+
+            remove_item = self.files_canvas.create_text(right - 8, top + 8, text="X", anchor="ne",
+                                                        fill=self.pastel_dark_blue_text, font=("Arial", 9, "bold"),
+                                                        tags=("tile", page_tag))
+            self.files_canvas.tag_bind(remove_item, "<Button-1>", lambda event, p=path: self._remove_image_from_list(p))
+
+    def _get_thumbnail(self, path):
+        """
+        Returns the cached PIL thumbnail of a path, generating it on first use or after
+        it was evicted from the cache. None if it cannot be generated.
+        """
+        thumbnail = self.image_thumbnails.get(path)
+        if thumbnail is not None:
+            return thumbnail
+        if path in self.thumbnail_errors:
+            return None
+        try:
+            thumbnail = get_image_thumbnail(path, self.thumbnail_display_size, self.thumbnail_quality_var.get())
+        except Exception as e:
+            print(f"Could not generate thumbnail for {path.name}: {e}")
+            self.thumbnail_errors[path] = str(e)
+            return None
+        self.image_thumbnails.put(path, thumbnail)
+        return thumbnail
 
+    def _on_files_scrolled(self, first, last):
+        """Keeps the scrollbar in sync and draws atlas pages that scrolled into view."""
+        self.files_scrollbar_y.set(first, last)
+        self._render_visible_pages()
 
     def _on_canvas_resize(self, event=None):
-        """Called when the canvas is resized to re-render thumbnails."""
-        self.files_canvas.itemconfig(self.canvas_window_id, width=event.width)
-        self._update_file_list_with_thumbnails()
-
-    def _on_inner_frame_configure(self, event=None):
-        """Called when the inner frame changes size (e.g., content added/removed)."""
-        self.files_canvas.configure(scrollregion=self.files_canvas.bbox("all"))
+        """Called when the canvas is resized; relays out the grid only if the column count changed."""
+        num_columns = ThumbnailAtlas.columns_for_width(event.width, self.thumbnail_display_size)
+        if self.atlas is None or num_columns != self.atlas.columns:
+            self._update_file_list_with_thumbnails()
+        else:
+            self._render_visible_pages()
 
 
     def _remove_image_from_list(self, path_to_remove: Path):
         """Removes a file from the list and its thumbnail."""
         if path_to_remove in self.image_paths:
             self.image_paths.remove(path_to_remove)
-            if path_to_remove in self.image_thumbnails:
-                del self.image_thumbnails[path_to_remove]
+            self.image_thumbnails.pop(path_to_remove)
+            self.thumbnail_errors.pop(path_to_remove, None)
+            self.image_records.pop(path_to_remove, None)
+            self.input_store.discard([path_to_remove])
             self._update_file_list_with_thumbnails()
             self._update_file_count()
 
     def _update_file_count(self):
         """Updates the label with the number of selected files."""
-        self.file_count_label.config(text=f"{len(self.image_paths)} images loaded")
+        count_text = f"{len(self.image_paths)} images loaded"
+        visible_count = len(self._get_visible_paths())
+        if visible_count != len(self.image_paths):
+            count_text += f" ({visible_count} shown)"
+        self.file_count_label.config(text=count_text)
 
     def _select_folder(self):
         """Opens a dialog to select a folder and loads its images."""
@@ -544,25 +1101,24 @@ class ImageProcessorApp:
             initialdir=initial_dir_str
         )
         if file_paths:
-            added_count = 0
+            supported_paths = []
             for f_path in file_paths:
                 path_obj = Path(f_path)
                 if is_supported_image_format(path_obj):
-                    if path_obj not in self.image_paths: # Prevent duplicates if adding files multiple times
-                        self._add_image_path(path_obj)
-                        added_count += 1
+                    supported_paths.append(path_obj)
                 else:
                     self.status_label.config(text=f"Ignoring unsupported file: {path_obj.name}", foreground="orange")
+            added_count = self._add_image_paths(supported_paths) # Duplicates are skipped if adding files multiple times
             self.status_label.config(text=f"Added {added_count} new images. Total: {len(self.image_paths)}.")
             if not self.image_paths:
                 self.status_label.config(text="No valid images selected.", foreground="orange")
 
 
     def _load_zip(self):
-        """Opens a dialog to load a ZIP file and extracts its images."""
+        """Opens a dialog to load a ZIP or TAR archive and extracts its images."""
         initial_dir_str = str(self.output_folder.parent) if self.output_folder.parent.exists() else str(Path.home())
         zip_path = filedialog.askopenfilename(
-            filetypes=[("ZIP Files", "*.zip"), ("All Files", "*.*")],
+            filetypes=[("Archives", archive_file_patterns()), ("All Files", "*.*")],
             initialdir=initial_dir_str
         )
         if zip_path:
@@ -570,57 +1126,100 @@ class ImageProcessorApp:
             self._load_zip_from_path(Path(zip_path))
 
     def _load_zip_from_path(self, zip_file_path):
-        """Extracts images from a ZIP file and adds them to the list."""
+        """
+        Extracts images from an archive (including archives nested inside it) on a
+        background thread and adds them to the list when done. While it runs, the
+        Load Archive button cancels the extraction.
+        """
         self._cleanup_temp_dir() 
         self._clear_loaded_images() 
 
         self.loaded_zip_path = zip_file_path
-        zip_extract_dir = self.temp_extract_dir / zip_file_path.stem
+        zip_extract_dir = self._new_extract_dir(zip_file_path.name)
+        self._apply_archive_settings()
+
+        cancel = threading.Event()
+        self.archive_extraction = cancel
+        self.btn_load_zip.config(text="Cancel Extraction", command=cancel.set)
+        self.status_label.config(text=f"Extracting '{zip_file_path.name}'...", foreground="blue")
+        threading.Thread(target=self._extract_archive_thread,
+                         args=(zip_file_path, zip_extract_dir, self.archive_extract_threads,
+                               self.catalog_hashes_var.get(), cancel),
+                         daemon=True).start()
+
+    def _new_extract_dir(self, archive_name):
+        """
+        Creates a directory of its own for extracting one archive, so cleaning up after a
+        cancelled or stale extraction never removes the files of a later load.
+        """
+        self.temp_extract_dir.mkdir(parents=True, exist_ok=True)
+        return Path(tempfile.mkdtemp(prefix=f"{archive_stem(archive_name)}_", dir=self.temp_extract_dir))
 
-        os.makedirs(zip_extract_dir, exist_ok=True)
-        
-        try:
-            with zipfile.ZipFile(zip_file_path, 'r') as zip_ref:
-                extract_count = 0
-                for member_name in zip_ref.namelist():
-                    member_path = Path(member_name)
-                    if is_supported_image_format(member_path) and not member_path.is_dir():
-                        try:
-                            extracted_file_path = zip_extract_dir / member_path.name
-                            with open(extracted_file_path, "wb") as outfile:
-                                outfile.write(zip_ref.read(member_name))
-                            self._add_image_path(extracted_file_path) 
-                            extract_count += 1
-                        except Exception as e:
-                            print(f"Error extracting '{member_name}' from ZIP: {e}")
-                            self.status_label.config(text=f"Error extracting: {member_name}", foreground="red")
-            
-            self.status_label.config(text=f"Images extracted from '{zip_file_path.name}'. Found: {extract_count}")
-            if not self.image_paths:
-                messagebox.showinfo("Information", f"No valid images found inside ZIP '{zip_file_path.name}'.")
+    def _extract_archive_thread(self, zip_file_path, zip_extract_dir, max_workers, compute_hashes, cancel):
+        """Runs on a background thread: extracts and catalogs an archive's images, then hands them to the UI thread."""
+        last_update = [0.0]
 
-        except zipfile.BadZipFile:
-            messagebox.showerror("ZIP Error", "The ZIP file is invalid or corrupted.")
-            self.status_label.config(text="Error: Invalid ZIP file.", foreground="red")
-            self._clear_loaded_images()
-        except Exception as e:
-            messagebox.showerror("ZIP Extraction Error", f"An error occurred while extracting the ZIP: {e}")
-            self.status_label.config(text=f"Error extracting ZIP: {e}", foreground="red")
-            self._clear_loaded_images()
-        finally:
-            if not self.image_paths and zip_extract_dir.exists():
-                try:
-                    shutil.rmtree(zip_extract_dir)
-                except Exception as e:
-                    print(f"Could not clean up empty temporary directory {zip_extract_dir}: {e}")
+        def report_progress(done, total):
+            now = time.perf_counter()
+            if now - last_update[0] < 0.1 and done != total: # At most ten UI updates per second
+                return
+            last_update[0] = now
+            count_text = f"{done}/{total}" if total else f"{done}"
+            self.master.after(0, self.status_label.config,
+                              {"text": f"Extracting '{zip_file_path.name}': {count_text} members", "foreground": "blue"})
 
+        extracted_paths, extract_errors, records, error = [], [], None, None
+        try:
+            extracted_paths, extract_errors = extract_archive_images(zip_file_path, zip_extract_dir, self.input_store,
+                                                                     max_workers=max_workers, progress=report_progress,
+                                                                     cancel=cancel)
+            if extracted_paths and not cancel.is_set():
+                records = self._scan_catalog(extracted_paths, compute_hashes)
+        except Exception as e:
+            error = e
+        self.master.after(0, self._finish_archive_load, zip_file_path, zip_extract_dir, extracted_paths,
+                          extract_errors, records, error, cancel)
+
+    def _finish_archive_load(self, zip_file_path, zip_extract_dir, extracted_paths, extract_errors, records, error, cancel):
+        """Adds the images of an extracted archive to the list, or reports why they could not be loaded."""
+        current = self.archive_extraction is cancel # Stale once cancelled by a new load or a clear
+        if current:
+            self.archive_extraction = None
+            self.btn_load_zip.config(text="Load Archive", command=self._load_zip)
+        if cancel.is_set():
+            self.input_store.discard(extracted_paths)
+            if current:
+                self.status_label.config(text=f"Extraction of '{zip_file_path.name}' cancelled.", foreground="orange")
+        elif isinstance(error, (zipfile.BadZipFile, tarfile.TarError)):
+            messagebox.showerror("Archive Error", "The archive is invalid or corrupted.")
+            self.status_label.config(text="Error: Invalid archive.", foreground="red")
+        elif error is not None:
+            messagebox.showerror("Archive Extraction Error", f"An error occurred while extracting the archive: {error}")
+            self.status_label.config(text=f"Error extracting archive: {error}", foreground="red")
+        else:
+            self._add_image_paths(extracted_paths, records)
+            self.status_label.config(text=f"Images extracted from '{zip_file_path.name}'. Found: {len(extracted_paths)}",
+                                     foreground="black")
+            for member_name, _ in extract_errors:
+                self.status_label.config(text=f"Error extracting: {member_name}", foreground="red")
+            if not extracted_paths:
+                messagebox.showinfo("Information", f"No valid images found inside archive '{zip_file_path.name}'.")
+
+        if (cancel.is_set() or error is not None or not extracted_paths) and zip_extract_dir.exists():
+            try:
+                shutil.rmtree(zip_extract_dir)
+            except Exception as e:
+                print(f"Could not clean up temporary directory {zip_extract_dir}: {e}")
 
     def _clear_loaded_images(self):
         """Clears the list of loaded images and their thumbnails."""
         self.image_paths = []
         self.image_thumbnails.clear()
-        for widget in self.files_inner_frame.winfo_children():
-            widget.destroy()
+        self.thumbnail_errors.clear()
+        self.image_records.clear()
+        self.files_canvas.delete("tile")
+        self.atlas_pages.clear()
+        self.atlas_paths = []
         self._update_file_count()
         self.files_canvas.config(scrollregion=(0,0,0,0)) # Reset scroll region
         self._cleanup_temp_dir() # Also clean up temp extraction dir when clearing all
@@ -634,10 +1233,259 @@ class ImageProcessorApp:
             self.output_folder_label.config(text=f"Output: {self.output_folder.name}")
             self.status_label.config(text=f"Output folder set to: '{self.output_folder.name}'.", foreground="black")
 
+    def _open_advanced_options(self):
+        """Opens (or focuses) the window with the advanced processing options."""
+        if self.advanced_window is not None and self.advanced_window.winfo_exists():
+            self.advanced_window.lift()
+            return
+
+        self.advanced_window = tk.Toplevel(self.master)
+        self.advanced_window.title("Advanced Options")
+        self.advanced_window.configure(bg=self.pastel_bg_main)
+        self.advanced_window.transient(self.master)
+
+        # Parallel processing
+        workers_frame = ttk.LabelFrame(self.advanced_window, text="Parallel Processing", padding=(10, 5))
+        workers_frame.pack(fill="x", padx=10, pady=5)
+        ttk.Radiobutton(workers_frame, text="Auto-tune worker count", variable=self.worker_mode_var, value="auto").grid(row=0, column=0, padx=5, pady=2, sticky="w")
+        ttk.Radiobutton(workers_frame, text="Fixed workers:", variable=self.worker_mode_var, value="fixed").grid(row=0, column=1, padx=5, pady=2, sticky="w")
+        ttk.Spinbox(workers_frame, from_=1, to=default_max_workers(), width=5, textvariable=self.processing_workers_var).grid(row=0, column=2, padx=5, pady=5, sticky="w")
+        ttk.Label(workers_frame, text="Memory limit for auto-tuning (MB, 0 = none):").grid(row=1, column=0, padx=5, pady=5, sticky="w")
+        ttk.Spinbox(workers_frame, from_=0, to=1048576, increment=256, width=8, textvariable=self.worker_memory_limit_mb_var).grid(row=1, column=1, padx=5, pady=5, sticky="w")
+        ttk.Label(workers_frame, text="Processing order:").grid(row=2, column=0, padx=5, pady=5, sticky="w")
+        ttk.Radiobutton(workers_frame, text="Largest images first", variable=self.schedule_order_var, value="largest_first").grid(row=2, column=1, padx=5, pady=2, sticky="w")
+        ttk.Radiobutton(workers_frame, text="As listed", variable=self.schedule_order_var, value="as_listed").grid(row=2, column=2, padx=5, pady=2, sticky="w")
+
+        # Edit operations applied after the resize
+        edits_frame = ttk.LabelFrame(self.advanced_window, text="Edits (applied after resizing)", padding=(10, 5))
+        edits_frame.pack(fill="x", padx=10, pady=5)
+        ttk.Label(edits_frame, text="Brightness:").grid(row=0, column=0, padx=5, pady=5, sticky="w")
+        ttk.Spinbox(edits_frame, from_=0.0, to=3.0, increment=0.05, width=6, textvariable=self.brightness_var).grid(row=0, column=1, padx=5, pady=5, sticky="w")
+        ttk.Label(edits_frame, text="Contrast:").grid(row=0, column=2, padx=5, pady=5, sticky="w")
+        ttk.Spinbox(edits_frame, from_=0.0, to=3.0, increment=0.05, width=6, textvariable=self.contrast_var).grid(row=0, column=3, padx=5, pady=5, sticky="w")
+        ttk.Label(edits_frame, text="Saturation:").grid(row=0, column=4, padx=5, pady=5, sticky="w")
+        ttk.Spinbox(edits_frame, from_=0.0, to=3.0, increment=0.05, width=6, textvariable=self.saturation_var).grid(row=0, column=5, padx=5, pady=5, sticky="w")
+        ttk.Checkbutton(edits_frame, text="Sharpen, amount (%):", variable=self.sharpen_var).grid(row=1, column=0, columnspan=2, padx=5, pady=2, sticky="w")
+        ttk.Spinbox(edits_frame, from_=10, to=500, increment=10, width=6, textvariable=self.sharpen_percent_var).grid(row=1, column=2, padx=5, pady=5, sticky="w")
+        ttk.Checkbutton(edits_frame, text="Pad to square, border (px):", variable=self.pad_var).grid(row=2, column=0, columnspan=2, padx=5, pady=2, sticky="w")
+        ttk.Spinbox(edits_frame, from_=0, to=1000, width=6, textvariable=self.pad_border_var).grid(row=2, column=2, padx=5, pady=5, sticky="w")
+        ttk.Label(edits_frame, text="Color:").grid(row=2, column=3, padx=5, pady=5, sticky="w")
+        ttk.Entry(edits_frame, textvariable=self.pad_color_var, width=9).grid(row=2, column=4, padx=5, pady=5, sticky="w")
+        ttk.Label(edits_frame, text="Watermark text:").grid(row=3, column=0, padx=5, pady=5, sticky="w")
+        ttk.Entry(edits_frame, textvariable=self.watermark_text_var).grid(row=3, column=1, columnspan=2, padx=5, pady=5, sticky="ew")
+        ttk.Label(edits_frame, text="Opacity:").grid(row=3, column=3, padx=5, pady=5, sticky="w")
+        ttk.Spinbox(edits_frame, from_=0.0, to=1.0, increment=0.1, width=6, textvariable=self.watermark_opacity_var).grid(row=3, column=4, padx=5, pady=5, sticky="w")
+        ttk.Combobox(edits_frame, textvariable=self.watermark_position_var, state="readonly", width=12, values=WATERMARK_POSITIONS).grid(row=3, column=5, padx=5, pady=5, sticky="w")
+
+        # Skipping unnecessary work
+        fast_path_frame = ttk.LabelFrame(self.advanced_window, text="Resizing & Passthrough", padding=(10, 5))
+        fast_path_frame.pack(fill="x", padx=10, pady=5)
+        ttk.Checkbutton(fast_path_frame, text="Never upscale in Fit mode", variable=self.never_upscale_var).grid(row=0, column=0, columnspan=4, padx=5, pady=2, sticky="w")
+        ttk.Label(fast_path_frame, text="Files already in the output format and size:").grid(row=1, column=0, padx=5, pady=5, sticky="w")
+        ttk.Radiobutton(fast_path_frame, text="Re-encode", variable=self.passthrough_mode_var, value="off").grid(row=1, column=1, padx=5, pady=2, sticky="w")
+        ttk.Radiobutton(fast_path_frame, text="Copy unchanged", variable=self.passthrough_mode_var, value="copy").grid(row=1, column=2, padx=5, pady=2, sticky="w")
+        ttk.Radiobutton(fast_path_frame, text="Hardlink", variable=self.passthrough_mode_var, value="link").grid(row=1, column=3, padx=5, pady=2, sticky="w")
+        batch_engine_text = "Batch-resize groups of same-size small images with NumPy (icon sets, sprites)"
+        if not batch_resize_engine.is_available():
+            batch_engine_text += " - requires NumPy"
+        ttk.Checkbutton(fast_path_frame, text=batch_engine_text, variable=self.batch_engine_var,
+                        state=tk.NORMAL if batch_resize_engine.is_available() else tk.DISABLED).grid(row=2, column=0, columnspan=4, padx=5, pady=2, sticky="w")
+
+        # JPEG target file size
+        jpeg_frame = ttk.LabelFrame(self.advanced_window, text="JPG Output", padding=(10, 5))
+        jpeg_frame.pack(fill="x", padx=10, pady=5)
+        ttk.Label(jpeg_frame, text="Max file size (KB, 0 = off):").grid(row=0, column=0, padx=5, pady=5, sticky="w")
+        ttk.Spinbox(jpeg_frame, from_=0, to=100000, increment=50, width=8, textvariable=self.max_file_size_kb_var).grid(row=0, column=1, padx=5, pady=5, sticky="w")
+        ttk.Label(jpeg_frame, text="Parallel quality probes:").grid(row=0, column=2, padx=5, pady=5, sticky="w")
+        ttk.Spinbox(jpeg_frame, from_=1, to=8, width=5, textvariable=self.quality_probes_var).grid(row=0, column=3, padx=5, pady=5, sticky="w")
+        ttk.Label(jpeg_frame, text="The highest quality up to the JPG Quality slider that fits the limit is used.").grid(row=1, column=0, columnspan=4, padx=5, pady=2, sticky="w")
+        ttk.Checkbutton(jpeg_frame, text="Optimize Huffman tables (smaller, slower)", variable=self.jpeg_optimize_var).grid(row=2, column=0, columnspan=2, padx=5, pady=2, sticky="w")
+        ttk.Checkbutton(jpeg_frame, text="Progressive", variable=self.jpeg_progressive_var).grid(row=2, column=2, padx=5, pady=2, sticky="w")
+        ttk.Label(jpeg_frame, text="Chroma subsampling:").grid(row=3, column=0, padx=5, pady=5, sticky="w")
+        ttk.Combobox(jpeg_frame, textvariable=self.jpeg_subsampling_var, state="readonly", width=7, values=list(JPEG_SUBSAMPLING)).grid(row=3, column=1, padx=5, pady=5, sticky="w")
+        ttk.Button(jpeg_frame, text="Benchmark on First Image", command=self._benchmark_jpeg_options).grid(row=3, column=2, columnspan=2, padx=5, pady=5, sticky="e")
+
+        # WebP output
+        webp_frame = ttk.LabelFrame(self.advanced_window, text="WebP Output", padding=(10, 5))
+        webp_frame.pack(fill="x", padx=10, pady=5)
+        ttk.Checkbutton(webp_frame, text="Lossless", variable=self.webp_lossless_var).grid(row=0, column=0, padx=5, pady=2, sticky="w")
+        ttk.Label(webp_frame, text="Encoder effort (0 = fastest, 6 = smallest):").grid(row=0, column=1, padx=5, pady=5, sticky="w")
+        ttk.Spinbox(webp_frame, from_=0, to=6, width=5, textvariable=self.webp_method_var).grid(row=0, column=2, padx=5, pady=5, sticky="w")
+
+        # Multi-frame images
+        frames_frame = ttk.LabelFrame(self.advanced_window, text="Multi-frame Images (GIF, TIFF)", padding=(10, 5))
+        frames_frame.pack(fill="x", padx=10, pady=5)
+        ttk.Radiobutton(frames_frame, text="All frames (animated GIF output, one file per TIFF page)", variable=self.frame_mode_var, value="all").grid(row=0, column=0, padx=5, pady=2, sticky="w")
+        ttk.Radiobutton(frames_frame, text="First frame only", variable=self.frame_mode_var, value="first").grid(row=0, column=1, padx=5, pady=2, sticky="w")
+
+        # Output writing
+        writing_frame = ttk.LabelFrame(self.advanced_window, text="Output Writing", padding=(10, 5))
+        writing_frame.pack(fill="x", padx=10, pady=5)
+        ttk.Label(writing_frame, text="Durability:").grid(row=0, column=0, padx=5, pady=5, sticky="w")
+        ttk.Radiobutton(writing_frame, text="No fsync (fastest)", variable=self.write_durability_var, value="none").grid(row=0, column=1, padx=5, pady=2, sticky="w")
+        ttk.Radiobutton(writing_frame, text="Batched fsync", variable=self.write_durability_var, value="batch").grid(row=0, column=2, padx=5, pady=2, sticky="w")
+        ttk.Radiobutton(writing_frame, text="fsync every file", variable=self.write_durability_var, value="file").grid(row=0, column=3, padx=5, pady=2, sticky="w")
+        ttk.Label(writing_frame, text="Writer threads:").grid(row=1, column=0, padx=5, pady=5, sticky="w")
+        ttk.Spinbox(writing_frame, from_=1, to=16, width=5, textvariable=self.writer_threads_var).grid(row=1, column=1, padx=5, pady=5, sticky="w")
+        ttk.Label(writing_frame, text="Write queue size:").grid(row=1, column=2, padx=5, pady=5, sticky="w")
+        ttk.Spinbox(writing_frame, from_=1, to=256, width=5, textvariable=self.write_queue_size_var).grid(row=1, column=3, padx=5, pady=5, sticky="w")
+
+        # Output target (plain folder or a single archive inside the output folder)
+        target_frame = ttk.LabelFrame(self.advanced_window, text="Output Target", padding=(10, 5))
+        target_frame.pack(fill="x", padx=10, pady=5)
+        ttk.Radiobutton(target_frame, text="Output folder", variable=self.output_target_var, value="folder").grid(row=0, column=0, padx=5, pady=2, sticky="w")
+        ttk.Radiobutton(target_frame, text="ZIP archive", variable=self.output_target_var, value="zip").grid(row=0, column=1, padx=5, pady=2, sticky="w")
+        ttk.Radiobutton(target_frame, text="TAR archive", variable=self.output_target_var, value="tar").grid(row=0, column=2, padx=5, pady=2, sticky="w")
+        ttk.Label(target_frame, text="Archive name:").grid(row=1, column=0, padx=5, pady=5, sticky="w")
+        ttk.Entry(target_frame, textvariable=self.archive_name_var).grid(row=1, column=1, columnspan=2, padx=5, pady=5, sticky="ew")
+
+        # Thumbnail previews
+        thumbnails_frame = ttk.LabelFrame(self.advanced_window, text="Thumbnails", padding=(10, 5))
+        thumbnails_frame.pack(fill="x", padx=10, pady=5)
+        ttk.Label(thumbnails_frame, text="Preview quality:").grid(row=0, column=0, padx=5, pady=5, sticky="w")
+        ttk.Radiobutton(thumbnails_frame, text="Fast", variable=self.thumbnail_quality_var, value="fast").grid(row=0, column=1, padx=5, pady=2, sticky="w")
+        ttk.Radiobutton(thumbnails_frame, text="Balanced", variable=self.thumbnail_quality_var, value="balanced").grid(row=0, column=2, padx=5, pady=2, sticky="w")
+        ttk.Radiobutton(thumbnails_frame, text="High", variable=self.thumbnail_quality_var, value="high").grid(row=0, column=3, padx=5, pady=2, sticky="w")
+        ttk.Label(thumbnails_frame, text="Preview memory (MB):").grid(row=1, column=0, padx=5, pady=5, sticky="w")
+        ttk.Spinbox(thumbnails_frame, from_=16, to=65536, increment=16, width=8, textvariable=self.thumbnail_cache_mb_var).grid(row=1, column=1, padx=5, pady=5, sticky="w")
+
+        # Metadata catalog
+        catalog_frame = ttk.LabelFrame(self.advanced_window, text="Image Catalog", padding=(10, 5))
+        catalog_frame.pack(fill="x", padx=10, pady=5)
+        ttk.Checkbutton(catalog_frame, text="Store content hashes when scanning (slower)", variable=self.catalog_hashes_var).grid(row=0, column=0, padx=5, pady=2, sticky="w")
+
+        # Archive inputs (members of loaded ZIP and TAR files)
+        archive_frame = ttk.LabelFrame(self.advanced_window, text="Archive Inputs", padding=(10, 5))
+        archive_frame.pack(fill="x", padx=10, pady=5)
+        ttk.Label(archive_frame, text="Keep members up to (KB) in memory:").grid(row=0, column=0, padx=5, pady=5, sticky="w")
+        ttk.Spinbox(archive_frame, from_=0, to=1048576, increment=256, width=8, textvariable=self.archive_memory_threshold_kb_var).grid(row=0, column=1, padx=5, pady=5, sticky="w")
+        ttk.Label(archive_frame, text="Memory limit (MB):").grid(row=0, column=2, padx=5, pady=5, sticky="w")
+        ttk.Spinbox(archive_frame, from_=0, to=1048576, increment=64, width=8, textvariable=self.archive_memory_limit_mb_var).grid(row=0, column=3, padx=5, pady=5, sticky="w")
+        ttk.Label(archive_frame, text="Temp directory (after restart):").grid(row=1, column=0, padx=5, pady=5, sticky="w")
+        ttk.Entry(archive_frame, textvariable=self.temp_directory_var).grid(row=1, column=1, columnspan=2, padx=5, pady=5, sticky="ew")
+        ttk.Button(archive_frame, text="Browse...", command=self._select_temp_directory).grid(row=1, column=3, padx=5, pady=5, sticky="w")
+        ttk.Label(archive_frame, text="ZIP extraction threads:").grid(row=2, column=0, padx=5, pady=5, sticky="w")
+        ttk.Spinbox(archive_frame, from_=1, to=64, width=5, textvariable=self.archive_extract_threads_var).grid(row=2, column=1, padx=5, pady=5, sticky="w")
+
+        # Read-ahead of input files (for inputs on network shares or external disks)
+        read_ahead_frame = ttk.LabelFrame(self.advanced_window, text="Input Read-Ahead", padding=(10, 5))
+        read_ahead_frame.pack(fill="x", padx=10, pady=5)
+        ttk.Checkbutton(read_ahead_frame, text="Read upcoming input files into memory in the background", variable=self.read_ahead_var).grid(row=0, column=0, columnspan=4, padx=5, pady=2, sticky="w")
+        ttk.Label(read_ahead_frame, text="Read-ahead memory (MB):").grid(row=1, column=0, padx=5, pady=5, sticky="w")
+        ttk.Spinbox(read_ahead_frame, from_=16, to=65536, increment=16, width=8, textvariable=self.read_ahead_memory_mb_var).grid(row=1, column=1, padx=5, pady=5, sticky="w")
+        ttk.Label(read_ahead_frame, text="Reader threads:").grid(row=1, column=2, padx=5, pady=5, sticky="w")
+        ttk.Spinbox(read_ahead_frame, from_=1, to=64, width=5, textvariable=self.read_ahead_threads_var).grid(row=1, column=3, padx=5, pady=5, sticky="w")
+
+        # Diagnostics
+        diagnostics_frame = ttk.LabelFrame(self.advanced_window, text="Diagnostics", padding=(10, 5))
+        diagnostics_frame.pack(fill="x", padx=10, pady=5)
+        ttk.Checkbutton(diagnostics_frame, text="Profile memory per image (slower; added to processing_report.json)", variable=self.memory_profiling_var).grid(row=0, column=0, columnspan=3, padx=5, pady=2, sticky="w")
+        ttk.Checkbutton(diagnostics_frame, text="Profile CPU (saves processing_profile.prof/.txt)", variable=self.cpu_profiling_var).grid(row=1, column=0, padx=5, pady=2, sticky="w")
+        ttk.Label(diagnostics_frame, text="Profile every Nth image:").grid(row=1, column=1, padx=5, pady=5, sticky="w")
+        ttk.Spinbox(diagnostics_frame, from_=1, to=1000, width=5, textvariable=self.cpu_profile_sample_every_var).grid(row=1, column=2, padx=5, pady=5, sticky="w")
+        ttk.Checkbutton(diagnostics_frame, text=f"Log live metrics ({METRICS_LOG_NAME})", variable=self.metrics_log_var).grid(row=2, column=0, padx=5, pady=2, sticky="w")
+        ttk.Label(diagnostics_frame, text="Metrics update every (s):").grid(row=2, column=1, padx=5, pady=5, sticky="w")
+        ttk.Spinbox(diagnostics_frame, from_=0.1, to=60, increment=0.5, width=5, textvariable=self.metrics_interval_var).grid(row=2, column=2, padx=5, pady=5, sticky="w")
+
+        ttk.Button(self.advanced_window, text="Close", command=self.advanced_window.destroy).pack(pady=10)
+
+    def _select_temp_directory(self):
+        """Opens a dialog to select the directory large archive members are extracted to."""
+        folder_selected = filedialog.askdirectory(initialdir=self.temp_directory_var.get() or str(Path.cwd()),
+                                                  parent=self.advanced_window)
+        if folder_selected:
+            self.temp_directory_var.set(folder_selected)
+
+    def _apply_archive_settings(self):
+        """Applies the archive extraction settings from the advanced options (memory limits, thread count)."""
+        self.input_store.memory_threshold = self._get_int_option(self.archive_memory_threshold_kb_var,
+                                                                 DEFAULT_MEMORY_THRESHOLD // 1024, minimum=0) * 1024
+        self.input_store.memory_limit = self._get_int_option(self.archive_memory_limit_mb_var,
+                                                             DEFAULT_MEMORY_LIMIT // (1024 * 1024), minimum=0) * 1024 * 1024
+        self.archive_extract_threads = self._get_int_option(self.archive_extract_threads_var, min(8, os.cpu_count() or 1))
+
+    def _get_encoder_options(self):
+        """Returns the JPEG and WebP encoder options selected in the advanced options."""
+        return {
+            'optimize': self.jpeg_optimize_var.get(),
+            'progressive': self.jpeg_progressive_var.get(),
+            'subsampling': self.jpeg_subsampling_var.get(),
+            'webp_lossless': self.webp_lossless_var.get(),
+            'webp_method': self._get_webp_method(),
+        }
+
+    def _get_webp_method(self):
+        """Returns the WebP encoder effort (0-6) from the advanced options."""
+        return min(6, self._get_int_option(self.webp_method_var, DEFAULT_ENCODER_OPTIONS['webp_method'], minimum=0))
+
+    def _benchmark_jpeg_options(self):
+        """Benchmarks every JPEG encoder option combination on the first loaded image in a background thread."""
+        if not self.image_paths:
+            messagebox.showwarning("Warning", "Add at least one image to benchmark.")
+            return
+        image_path = self.image_paths[0]
+        quality = int(self.quality_slider.get())
+        self.status_label.config(text=f"Benchmarking JPG encoder options on {image_path.name}...", foreground="blue")
+
+        def run_benchmark():
+            try:
+                with Image.open(input_source(image_path)) as img:
+                    results = benchmark_jpeg_encoder_options(img, quality)
+            except Exception as e:
+                self.master.after(0, messagebox.showerror, "Benchmark Error", f"Could not benchmark '{image_path.name}': {e}")
+                self.master.after(0, self.status_label.config, {"text": "Benchmark failed.", "foreground": "red"})
+                return
+            lines = [f"{image_path.name}, quality {quality} (fastest first):", ""]
+            for result in results:
+                lines.append(f"{'optimize' if result['optimize'] else 'no optimize'}, "
+                             f"{'progressive' if result['progressive'] else 'baseline'}, {result['subsampling']}: "
+                             f"{result['seconds'] * 1000:.1f} ms, {result['bytes'] / 1024:.0f} KB")
+            self.master.after(0, messagebox.showinfo, "JPG Encoder Benchmark", "\n".join(lines))
+            self.master.after(0, self.status_label.config, {"text": "Benchmark finished.", "foreground": "green"})
+
+        threading.Thread(target=run_benchmark, daemon=True).start()
+
+    def _get_operations(self):
+        """Returns the edit operations selected in the advanced options as a list of operation dicts."""
+        operations = []
+        color = {'brightness': self._get_float_option(self.brightness_var, 1.0),
+                 'contrast': self._get_float_option(self.contrast_var, 1.0),
+                 'saturation': self._get_float_option(self.saturation_var, 1.0)}
+        if any(value != 1.0 for value in color.values()):
+            operations.append({**self.operation_settings.get('color', {}), 'type': "color", **color})
+        if self.sharpen_var.get():
+            operations.append({**self.operation_settings.get('sharpen', {}), 'type': "sharpen",
+                               'percent': self._get_int_option(self.sharpen_percent_var, 150)})
+        if self.pad_var.get():
+            operations.append({**self.operation_settings.get('pad', {}), 'type': "pad",
+                               'border': self._get_int_option(self.pad_border_var, 0, minimum=0),
+                               'color': self.pad_color_var.get().strip() or "#FFFFFF"})
+        watermark = {**self.operation_settings.get('watermark', {}), 'type': "watermark",
+                     'text': self.watermark_text_var.get(),
+                     'opacity': min(1.0, self._get_float_option(self.watermark_opacity_var, 0.5)),
+                     'position': self.watermark_position_var.get()}
+        if watermark['text'] or watermark.get('image'):
+            operations.append(watermark)
+        return operations
+
+    def _get_float_option(self, var, default, minimum=0.0):
+        """Reads a float option from a Tk variable, falling back to a default on invalid input."""
+        try:
+            return max(minimum, float(var.get()))
+        except (tk.TclError, ValueError):
+            return default
+
+    def _get_int_option(self, var, default, minimum=1):
+        """Reads an integer option from a Tk variable, falling back to a default on invalid input."""
+        try:
+            return max(minimum, int(var.get()))
+        except (tk.TclError, ValueError):
+            return default
+
     def _toggle_quality_slider(self):
         """Enables/disables the quality slider based on the output format."""
         if hasattr(self, 'quality_label') and hasattr(self, 'quality_slider') and hasattr(self, 'quality_value_label'):
-            if self.output_format_var.get() == "JPG":
+            if self.output_format_var.get() in QUALITY_OUTPUT_FORMATS:
                 self.quality_label.config(state=tk.NORMAL)
                 self.quality_slider.config(state=tk.NORMAL)
                 self.quality_value_label.config(state=tk.NORMAL)
@@ -656,21 +1504,21 @@ class ImageProcessorApp:
         if not self.image_paths:
             messagebox.showwarning("Warning", "No images to process. Please add images first.")
             return
-
-        try:
-            target_size = int(self.size_entry.get())
-            if target_size <= 0:
-                raise ValueError("Target size must be a positive number.")
-        except ValueError:
-            messagebox.showerror("Input Error", "Please enter a valid numeric target size (e.g., 2048).")
+        image_paths = self._get_visible_paths()
+        if not image_paths:
+            messagebox.showwarning("Warning", "No images match the current filter.")
             return
 
-        resize_mode = self.resize_mode_var.get()
-        output_format = self.output_format_var.get()
-        quality = int(self.quality_slider.get()) if output_format == "JPG" else 0
-        prefix = self.prefix_entry.get()
-        suffix = self.suffix_entry.get()
-        overwrite_mode = self.overwrite_var.get()
+        settings = self._read_processing_settings()
+        if settings is None:
+            return
+        target_size = settings['target_size']
+        resize_mode = settings['resize_mode']
+        output_format = settings['output_format']
+        quality = settings['quality']
+        prefix = settings['prefix']
+        suffix = settings['suffix']
+        overwrite_mode = settings['overwrite_mode']
 
         if not self.output_folder.exists():
             try:
@@ -680,6 +1528,7 @@ class ImageProcessorApp:
                 return
 
         self.process_button.config(state=tk.DISABLED)
+        self.dry_run_button.config(state=tk.DISABLED)
         self.btn_select_folder.config(state=tk.DISABLED)
         self.btn_select_files.config(state=tk.DISABLED)
         self.btn_load_zip.config(state=tk.DISABLED)
@@ -687,96 +1536,532 @@ class ImageProcessorApp:
         self._toggle_config_widgets_state(tk.DISABLED)
 
         self.progress_bar["value"] = 0
+        self.metrics_label.config(text="")
         self.status_label.config(text="Processing images...", foreground="blue")
 
+        options = {
+            'write_durability': self.write_durability_var.get(),
+            'writer_threads': self._get_int_option(self.writer_threads_var, 2),
+            'write_queue_size': self._get_int_option(self.write_queue_size_var, 16),
+            'output_target': settings['output_target'],
+            'archive_name': settings['archive_name'],
+            'frame_mode': settings['frame_mode'],
+            'max_file_size': settings['max_file_size'],
+            'quality_probes': settings['quality_probes'],
+            'encoder_options': settings['encoder_options'],
+            'passthrough_mode': settings['passthrough_mode'],
+            'never_upscale': settings['never_upscale'],
+            'memory_profiling': self.memory_profiling_var.get(),
+            'cpu_profiling': self.cpu_profiling_var.get(),
+            'cpu_profile_sample_every': self._get_int_option(self.cpu_profile_sample_every_var, 1),
+            'metrics_log': self.metrics_log_var.get(),
+            'metrics_interval': self._get_float_option(self.metrics_interval_var, 1.0, minimum=0.1),
+            'read_ahead': self.read_ahead_var.get(),
+            'read_ahead_memory': self._get_int_option(self.read_ahead_memory_mb_var,
+                                                      DEFAULT_READ_AHEAD_MEMORY // (1024 * 1024)) * 1024 * 1024,
+            'read_ahead_threads': self._get_int_option(self.read_ahead_threads_var, DEFAULT_READ_AHEAD_THREADS),
+            'worker_mode': self.worker_mode_var.get(),
+            'processing_workers': self._get_int_option(self.processing_workers_var, 2),
+            'worker_memory_limit': self._get_int_option(self.worker_memory_limit_mb_var, 0, minimum=0) * 1024 * 1024,
+            'output_key': settings['output_folder'],
+        }
+        options['operations'] = OperationGraph(settings['operations'])
+        # The autotuner starts from the worker count it settled on last time for this output folder
+        options['initial_workers'] = self.autotuned_workers.get(options['output_key'], 2)
+        # Expensive images are started first (estimated from the catalog) and progress is weighted by cost.
+        # A dry run of the same images and settings has already probed every header and counted the frames.
+        schedule = planned_schedule(self.last_plan, image_paths, settings)
+        if schedule is None:
+            schedule = schedule_jobs(image_paths, self.image_records, settings['schedule_order'])
+        image_paths, options['job_costs'] = schedule
+        options['batch_sizes'] = self._get_batch_engine_sizes(image_paths, target_size, resize_mode, output_format, options)
+
         processing_thread = threading.Thread(
             target=self._process_images_thread,
-            args=(self.image_paths.copy(), target_size, resize_mode, output_format,
-                  quality, prefix, suffix, overwrite_mode, self.output_folder)
+            args=(image_paths, target_size, resize_mode, output_format,
+                  quality, prefix, suffix, overwrite_mode, self.output_folder, options)
         )
         processing_thread.start()
 
+    def _read_processing_settings(self):
+        """
+        Reads and validates the settings that decide what a batch produces (used by
+        the real run and the dry run). Shows an error and returns None if one is invalid.
+        """
+        try:
+            target_size = parse_target_size(self.size_entry.get())
+        except ValueError:
+            messagebox.showerror("Input Error", "Please enter a valid target size (e.g., 2048 or 1920x1080).")
+            return None
+
+        try:
+            operations = self._get_operations()
+            OperationGraph(operations)
+            if self.pad_var.get():
+                ImageColor.getrgb(self.pad_color_var.get().strip() or "#FFFFFF")
+        except ValueError as e:
+            messagebox.showerror("Input Error", f"Invalid edit settings: {e}")
+            return None
+
+        output_format = self.output_format_var.get()
+        return {
+            'target_size': target_size,
+            'resize_mode': self.resize_mode_var.get(),
+            'output_format': output_format,
+            'quality': int(self.quality_slider.get()) if output_format in QUALITY_OUTPUT_FORMATS else 0,
+            'prefix': self.prefix_entry.get(),
+            'suffix': self.suffix_entry.get(),
+            'overwrite_mode': self.overwrite_var.get(),
+            'frame_mode': self.frame_mode_var.get(),
+            'max_file_size': self._get_int_option(self.max_file_size_kb_var, 0, minimum=0) * 1024,
+            'quality_probes': self._get_int_option(self.quality_probes_var, 1),
+            'encoder_options': self._get_encoder_options(),
+            # Edited images always have to be re-encoded
+            'passthrough_mode': "off" if operations else self.passthrough_mode_var.get(),
+            'never_upscale': self.never_upscale_var.get(),
+            'operations': operations,
+            'output_folder': str(self.output_folder.resolve()),
+            'output_target': self.output_target_var.get(),
+            'archive_name': self.archive_name_var.get().strip() or "ProcessedImages",
+            'schedule_order': self.schedule_order_var.get(),
+        }
+
+    def _start_dry_run(self):
+        """
+        Plans the batch without processing or writing anything (see dry_run_planner)
+        on a background thread and shows the planned outputs and estimates.
+        """
+        image_paths = self._get_visible_paths()
+        if not image_paths:
+            messagebox.showwarning("Warning", "No images to plan. Please add images first.")
+            return
+        settings = self._read_processing_settings()
+        if settings is None:
+            return
+        if self.worker_mode_var.get() == "auto":
+            parallel_jobs = os.cpu_count() or 1 # The autotuner usually settles around the number of cores
+        else:
+            parallel_jobs = self._get_int_option(self.processing_workers_var, 2)
+        records = {path: self.image_records.get(path) for path in image_paths}
+
+        self.process_button.config(state=tk.DISABLED)
+        self.dry_run_button.config(state=tk.DISABLED)
+        self.status_label.config(text="Dry run: probing image headers...", foreground="blue")
+        threading.Thread(target=self._dry_run_thread,
+                         args=(image_paths, settings, records, parallel_jobs,
+                               self._get_int_option(self.write_queue_size_var, 16)),
+                         daemon=True).start()
+
+    def _dry_run_thread(self, image_paths, settings, records, parallel_jobs, write_queue_size):
+        """Runs on a background thread: builds the dry-run plan, then hands it to the UI thread."""
+        last_update = [0.0]
+
+        def report_progress(done, total):
+            now = time.perf_counter()
+            if now - last_update[0] < 0.1 and done != total: # At most ten UI updates per second
+                return
+            last_update[0] = now
+            text = (f"Dry run: probed {done}/{total} headers..." if done != total
+                    else "Dry run: calibrating estimates on sample images...")
+            self.master.after(0, self.status_label.config, {"text": text, "foreground": "blue"})
+
+        plan, error = None, None
+        try:
+            plan = build_dry_run_plan(image_paths, settings, records, parallel_jobs, write_queue_size,
+                                      progress=report_progress)
+        except Exception as e:
+            error = e
+        self.master.after(0, self._finish_dry_run, plan, error)
+
+    def _finish_dry_run(self, plan, error):
+        """Keeps a finished dry-run plan for the next run and shows it, or reports why it failed."""
+        self.process_button.config(state=tk.NORMAL)
+        self.dry_run_button.config(state=tk.NORMAL)
+        if error is not None:
+            messagebox.showerror("Dry Run Error", f"Could not plan the batch: {error}")
+            self.status_label.config(text=f"Dry run failed: {error}", foreground="red")
+            return
+        self.last_plan = plan
+        self.status_label.config(text=f"Dry run finished: {plan['totals']['outputs']} outputs planned.", foreground="green")
+        self._show_dry_run_plan(plan)
+
+    def _show_dry_run_plan(self, plan):
+        """Shows a dry-run plan's summary in a window that can export the full plan as JSON."""
+        window = tk.Toplevel(self.master)
+        window.title("Dry Run")
+        window.configure(bg=self.pastel_bg_main)
+        window.transient(self.master)
+
+        text_frame = ttk.Frame(window, padding=(10, 10))
+        text_frame.pack(fill="both", expand=True)
+        summary = tk.Text(text_frame, width=100, height=30, wrap="none", font=("Courier", 9))
+        scrollbar = ttk.Scrollbar(text_frame, orient="vertical", command=summary.yview)
+        summary.config(yscrollcommand=scrollbar.set)
+        summary.insert("1.0", format_plan_summary(plan))
+        summary.config(state=tk.DISABLED)
+        summary.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="right", fill="y")
+
+        buttons_frame = ttk.Frame(window, padding=(10, 0, 10, 10))
+        buttons_frame.pack(fill="x")
+        ttk.Button(buttons_frame, text="Close", command=window.destroy).pack(side="right", padx=5)
+        ttk.Button(buttons_frame, text="Export JSON...", command=lambda: self._export_dry_run_plan(plan, window)).pack(side="right", padx=5)
+
+    def _export_dry_run_plan(self, plan, parent=None):
+        """Asks for a file name and saves a dry-run plan there as JSON."""
+        plan_path = filedialog.asksaveasfilename(parent=parent, title="Export Dry Run Plan", defaultextension=".json",
+                                                 initialdir=str(self.output_folder) if self.output_folder.exists() else None,
+                                                 initialfile="dry_run_plan.json",
+                                                 filetypes=[("JSON files", "*.json"), ("All files", "*.*")])
+        if not plan_path:
+            return
+        try:
+            save_plan(plan, plan_path)
+        except OSError as e:
+            messagebox.showerror("Export Error", f"Could not save the plan: {e}", parent=parent)
+            return
+        self.status_label.config(text=f"Dry run plan saved to '{Path(plan_path).name}'.", foreground="green")
+
     def _toggle_config_widgets_state(self, state):
         """Enables or disables configuration widgets."""
-        for frame in [self.config_frame, self.naming_frame, self.output_folder_frame]:
+        for frame in [self.config_frame, self.output_format_frame, self.naming_frame, self.output_folder_frame]:
             for child in frame.winfo_children():
                 if isinstance(child, (ttk.Entry, ttk.Button, ttk.Radiobutton, ttk.Scale, ttk.Label)):
                     child.config(state=state)
         self._toggle_quality_slider()
 
+    def _ask_overwrite(self, file_name):
+        """
+        Asks the user on the main thread whether an existing file should be overwritten.
+        Called from the worker thread. Returns True (overwrite), False (skip) or None (cancel).
+        """
+        response_container = []
+        response_var = tk.BooleanVar(value=False)
+
+        def show_dialog_and_set_response():
+            response_container.append(messagebox.askyesnocancel(
+                "File Exists",
+                f"The file '{file_name}' already exists.\n\nOverwrite it?",
+                icon="question"
+            ))
+            response_var.set(True)
+
+        self.master.after(0, show_dialog_and_set_response)
+        self.master.wait_variable(response_var)
+        return response_container[0]
+
+    def _create_output_writer(self, output_folder, overwrite_mode, options):
+        """
+        Creates the writer for the selected output target. For archive targets the
+        archive file name follows the same overwrite rules as individual images.
+        Returns None if the user cancelled.
+        """
+        if options['output_target'] not in ARCHIVE_FORMATS:
+            return AsyncOutputWriter(num_writers=options['writer_threads'],
+                                     max_queue_size=options['write_queue_size'],
+                                     durability=options['write_durability'],
+                                     link_files=options['passthrough_mode'] == "link")
+
+        archive_path = output_folder / f"{options['archive_name']}.{options['output_target']}"
+        if archive_path.exists():
+            if overwrite_mode == "ask":
+                if not self._ask_overwrite(archive_path.name):
+                    return None
+            elif overwrite_mode == "unique":
+                archive_path = generate_unique_filename(archive_path)
+        return ArchiveOutputWriter(archive_path, archive_format=options['output_target'],
+                                   max_queue_size=options['write_queue_size'],
+                                   durability=options['write_durability'])
+
+    def _get_batch_engine_sizes(self, image_paths, target_size, resize_mode, output_format, options):
+        """
+        Returns {path: (width, height)} for the images the NumPy batch engine should
+        handle, based on the catalog records. Images the passthrough path would copy
+        unchanged are left out. Empty when the engine is disabled or unavailable.
+        """
+        if (not self.batch_engine_var.get() or not batch_resize_engine.is_available()
+                or resize_mode == "smart_crop"): # Smart crop boxes depend on each image's content
+            return {}
+        batch_sizes = {}
+        for path in image_paths:
+            record = self.image_records.get(path)
+            if not batch_resize_engine.is_batch_candidate(record):
+                continue
+            if (options['passthrough_mode'] != "off" and not options['operations']
+                    and can_pass_through(record, target_size, resize_mode, output_format,
+                                         options['max_file_size'], options['never_upscale'])):
+                continue
+            batch_sizes[path] = (record['width'], record['height'])
+        return batch_sizes
+
+    def _get_target_size_setting(self):
+        """Returns the target size to save: a number, a "WxH" string, or 2048 if the entry is invalid."""
+        try:
+            target_size = parse_target_size(self.size_entry.get())
+        except ValueError:
+            return 2048
+        return target_size if isinstance(target_size, int) else "{}x{}".format(*target_size)
+
+    def _remember_autotuned_workers(self, output_key, workers):
+        """Stores the worker count chosen by the autotuner for an output folder (saved with the config)."""
+        self.autotuned_workers[output_key] = workers
+
+    def _write_batch_report(self, output_folder, report):
+        """Saves the batch report as JSON in the output folder."""
+        report_path = output_folder / "processing_report.json"
+        try:
+            with open(report_path, 'w') as f:
+                json.dump(report, f, indent=4)
+        except Exception as e:
+            print(f"Error saving batch report: {e}")
+
     def _process_images_thread(self, image_paths, target_size, resize_mode, output_format,
-                                 quality, prefix, suffix, overwrite_mode, output_folder):
+                                 quality, prefix, suffix, overwrite_mode, output_folder, options):
         """
         Worker thread function to process images.
+        Images are decoded, resized and encoded as jobs on a thread pool whose
+        parallelism is chosen by a WorkerAutotuner; each job names an output (collisions,
+        overwrite prompts) before encoding it and hands it straight to an output writer
+        (a folder or an archive) so slow output storage does not stall processing.
         Updates UI elements on the main thread via after().
         """
         processed_count = 0
         total_images = len(image_paths)
         errors_occurred = False
         user_cancelled = False
-
-        for i, input_path in enumerate(image_paths):
-            if user_cancelled:
-                break
+        reserved_paths = set() # Outputs assigned in this run, possibly not yet on disk
+        output_sources = {} # output path -> input path, to attribute write errors to images
+        report_entries = [] # Per-output details (e.g. chosen JPG quality) for the batch report
+        passthrough_count = 0 # Outputs copied or linked without decoding
+
+        writer = self._create_output_writer(output_folder, overwrite_mode, options)
+        if writer is None:
+            user_cancelled = True
+            self.master.after(0, self.status_label.config, {"text": "Processing cancelled by user.", "foreground": "red"})
+        batch_engine = None
+        if options['batch_sizes']:
+            batch_engine = BatchResizeEngine(options['batch_sizes'], target_size, resize_mode, options['never_upscale'])
+
+        memory_profiler = None
+        if options['memory_profiling']:
+            memory_profiler = MemoryProfiler()
+            memory_profiler.start()
+        cpu_profiler = CpuProfiler(options['cpu_profile_sample_every']) if options['cpu_profiling'] else None
+
+        if memory_profiler is not None: # Memory peaks are process-wide, so images are profiled one at a time
+            tuner = WorkerAutotuner(1, max_workers=1, adaptive=False)
+        elif options['worker_mode'] == "auto":
+            tuner = WorkerAutotuner(options['initial_workers'], memory_limit=options['worker_memory_limit'])
+        else:
+            tuner = WorkerAutotuner(options['processing_workers'], max_workers=options['processing_workers'], adaptive=False)
+        prefetcher = None
+        if options['read_ahead']:
+            # Files are read in submission order; batch engine inputs and in-memory archive members are loaded elsewhere
+            prefetcher = InputPrefetcher([path for path in image_paths
+                                          if path not in options['batch_sizes'] and not is_in_memory(path)],
+                                         max_bytes=options['read_ahead_memory'],
+                                         reader_threads=options['read_ahead_threads'],
+                                         initial_depth=2 * tuner.workers)
+        stage_observers = [tuner.stage] + ([memory_profiler.stage] if memory_profiler is not None else [])
+        monitor = ThroughputMonitor(total_images, sum(options['job_costs'].values()) or None,
+                                    update_interval=options['metrics_interval'],
+                                    log_path=output_folder / METRICS_LOG_NAME if options['metrics_log'] else None)
+
+        def observe_stage(name):
+            stage_contexts = contextlib.ExitStack()
+            for observer in stage_observers:
+                stage_contexts.enter_context(observer(name))
+            return stage_contexts
+
+        # Archive members are named relative to the archive root and only collide with each other
+        writing_to_archive = isinstance(writer, ArchiveOutputWriter)
+        output_root = Path() if writing_to_archive else output_folder
+        naming_lock = threading.Lock() # Guards output naming, overwrite prompts and the run's bookkeeping
+        cancel_event = threading.Event()
+
+        def name_output(input_path, name_suffix, extension):
+            """Returns the output path for one output of an image, or None to skip it (or on cancel)."""
+            output_filename = input_path.stem
+            if prefix:
+                output_filename = prefix + output_filename
+            if suffix:
+                output_filename = output_filename + suffix
+            output_filepath_base = output_root / f"{output_filename}{name_suffix}.{extension}"
+            output_filepath = output_filepath_base
+
+            already_exists = output_filepath_base in reserved_paths or (
+                not writing_to_archive and output_filepath_base.exists())
+            if already_exists:
+                if overwrite_mode == "ask":
+                    response = self._ask_overwrite(output_filepath_base.name)
+                    if response is None:
+                        cancel_event.set()
+                        self.master.after(0, self.status_label.config, {"text": "Processing cancelled by user.", "foreground": "red"})
+                        return None
+                    elif not response: 
+                        self.master.after(0, self.status_label.config, {"text": f"Skipped: {output_filepath_base.name}", "foreground": "orange"})
+                        return None
+
+                elif overwrite_mode == "overwrite":
+                    # Streamed archives cannot replace a member; the later duplicate wins on extraction
+                    pass
+                elif overwrite_mode == "unique":
+                    output_filepath = generate_unique_filename(output_filepath_base, reserved_paths,
+                                                               check_disk=not writing_to_archive)
+            reserved_paths.add(output_filepath)
+            return output_filepath
+
+        def process_image(i, input_path):
+            """
+            Runs on the job pool: names, encodes and hands to the writer each output of one
+            image in turn, so an image's outputs are never all held in memory and skipped
+            outputs are never encoded. Returns the number of outputs written, the job's
+            duration (without time spent naming or prompting), the input and the output size.
+            """
+            nonlocal passthrough_count
+            start = time.perf_counter()
+            naming_seconds = 0.0
+            outputs_written = 0
+            job_output_bytes = 0
+            set_stage_observer(observe_stage)
             try:
+                with contextlib.ExitStack() as profile_contexts:
+                    if memory_profiler is not None:
+                        profile_contexts.enter_context(memory_profiler.image(input_path))
+                    if cpu_profiler is not None:
+                        profile_contexts.enter_context(cpu_profiler.image(i))
+                    batched_frame = None
+                    if batch_engine is not None:
+                        try:
+                            batched_frame = batch_engine.take(input_path)
+                        except Exception as e:
+                            print(f"Batch resize failed for {input_path.name}, processing it individually: {e}")
+                    if batched_frame is not None:
+                        image_outputs = [("", output_format.lower(),
+                                          partial(encode_resized_frame, batched_frame, output_format, quality,
+                                                  options['max_file_size'], options['quality_probes'],
+                                                  options['encoder_options'], options['operations']))]
+                    else:
+                        source = prefetcher.take(input_path) if prefetcher is not None else None
+                        image_outputs = iter_image_outputs(input_path, target_size, resize_mode, output_format,
+                                                           quality, options['frame_mode'],
+                                                           options['max_file_size'], options['quality_probes'],
+                                                           options['encoder_options'], options['never_upscale'],
+                                                           options['passthrough_mode'] != "off", options['operations'],
+                                                           source)
+                    for name_suffix, extension, encode in image_outputs:
+                        if cancel_event.is_set(): # Outputs not yet named at cancellation are not encoded
+                            break
+                        naming_start = time.perf_counter()
+                        with naming_lock:
+                            output_filepath = None if cancel_event.is_set() else name_output(input_path, name_suffix, extension)
+                        naming_seconds += time.perf_counter() - naming_start
+                        if output_filepath is None:
+                            continue
+
+                        image_bytes, details = encode()
+                        output_bytes = image_bytes.stat().st_size if isinstance(image_bytes, Path) else len(image_bytes)
+                        job_output_bytes += output_bytes
+                        with naming_lock:
+                            if details.get('passthrough'):
+                                passthrough_count += 1
+                            if details:
+                                report_entries.append({"input": str(input_path), "output": output_filepath.as_posix(),
+                                                       "bytes": output_bytes, **details})
+                            output_sources[output_filepath] = input_path
+                        if 'quality' in details:
+                            self.master.after(0, self.status_label.config,
+                                              {"text": f"Processed: {output_filepath.name} (quality {details['quality']}"
+                                                       f"{'' if details.get('fits', True) else ', over size limit'})",
+                                               "foreground": "blue"})
+                        writer.submit(output_filepath, image_bytes)
+                        outputs_written += 1
+            finally:
+                set_stage_observer(None)
+            try:
+                input_bytes = input_stat(input_path).st_size
+            except OSError:
+                input_bytes = 0
+            return outputs_written, time.perf_counter() - start - naming_seconds, input_bytes, job_output_bytes
+
+        pool = ThreadPoolExecutor(max_workers=tuner.max_workers)
+        running = {} # future -> (index, input path)
+        next_index = 0
+        total_cost = sum(options['job_costs'].values()) or 1
+        completed_cost = 0
+        while True:
+            while not user_cancelled and next_index < total_images and len(running) < tuner.workers:
+                i, input_path = next_index, image_paths[next_index]
+                next_index += 1
                 self.master.after(0, self.status_label.config,
                                   {"text": f"Processing: {input_path.name} ({i+1}/{total_images})", "foreground": "blue"})
-                
-                output_filename = input_path.stem
-                if prefix:
-                    output_filename = prefix + output_filename
-                if suffix:
-                    output_filename = output_filename + suffix
-                
-                output_filepath_base = output_folder / f"{output_filename}.{output_format.lower()}"
-                output_filepath = output_filepath_base
-
-                if output_filepath_base.exists():
-                    if overwrite_mode == "ask":
-                        response_container = [None] 
-                        response_var = tk.BooleanVar(value=False)
-                        
-                        def show_dialog_and_set_response():
-                            nonlocal user_cancelled 
-                            response = messagebox.askyesnocancel(
-                                "File Exists",
-                                f"The file '{output_filepath_base.name}' already exists.\n\nOverwrite it?",
-                                icon="question"
-                            )
-                            if response is True:
-                                response_var.set(True)
-                            elif response is False:
-                                response_var.set(False)
-                            else: 
-                                user_cancelled = True 
-                                response_var.set(False) 
-
-                        self.master.after(0, show_dialog_and_set_response)
-                        self.master.wait_variable(response_var) 
-                        
-                        if user_cancelled: 
-                            self.master.after(0, self.status_label.config, {"text": "Processing cancelled by user.", "foreground": "red"})
-                            break 
-                        elif not response_var.get(): 
-                            self.master.after(0, self.status_label.config, {"text": f"Skipped: {input_path.name}", "foreground": "orange"})
-                            continue 
-
-                    elif overwrite_mode == "overwrite":
-                        pass
-                    elif overwrite_mode == "unique":
-                        output_filepath = generate_unique_filename(output_filepath_base)
-                
-                if not user_cancelled: 
-                    process_image_file(input_path, output_filepath, target_size, resize_mode, output_format, quality)
-                    processed_count += 1
+                running[pool.submit(process_image, i, input_path)] = (i, input_path)
+            if not running:
+                break
+
+            # The timeout keeps the live metrics (rates, active workers, ETA) updating during long jobs
+            done, _ = wait(running, timeout=options['metrics_interval'], return_when=FIRST_COMPLETED)
+            for future in done:
+                i, input_path = running.pop(future)
+                completed_cost += options['job_costs'].get(input_path, 0)
+                try:
+                    outputs_written, job_seconds, input_bytes, job_output_bytes = future.result()
+                    tuner.record_image(job_seconds, options['job_costs'].get(input_path, 1))
+                    if outputs_written:
+                        processed_count += 1
+                    monitor.record_image(job_seconds, input_bytes, job_output_bytes,
+                                         options['job_costs'].get(input_path, 1))
+                except Exception as e:
+                    errors_occurred = True
+                    print(f"Error processing {input_path.name}: {e}")
+                    self.master.after(0, self.status_label.config,
+                                      {"text": f"Error with {input_path.name}: {e}", "foreground": "red"})
+
+                progress_value = int(completed_cost / total_cost * 100)
+                self.master.after(0, self.progress_bar.config, {"value": progress_value})
+            user_cancelled = user_cancelled or cancel_event.is_set()
+            metrics = monitor.poll(len(running), total_images - next_index, writer.pending if writer is not None else 0)
+            if metrics is not None:
+                self.master.after(0, self.metrics_label.config, {"text": ThroughputMonitor.format_snapshot(metrics)})
+        pool.shutdown()
+        if prefetcher is not None:
+            prefetcher.close()
+
+        write_errors = []
+        if writer is not None:
+            self.master.after(0, self.status_label.config, {"text": "Finishing output writes...", "foreground": "blue"})
+            write_errors = writer.close()
+        self.master.after(0, self.metrics_label.config, {"text": ThroughputMonitor.format_snapshot(monitor.close())})
+        if write_errors:
+            errors_occurred = True
+            failed_inputs = {output_sources.get(Path(failed_path)) for failed_path, _ in write_errors}
+            if None in failed_inputs: # The output as a whole (e.g. the archive) could not be written
+                processed_count = 0
+            else:
+                processed_count -= len(failed_inputs)
+
+        report = {}
+        if report_entries:
+            report["outputs"] = report_entries
+        if memory_profiler is not None:
+            memory_profiler.stop()
+            report["memory_profile"] = memory_profiler.report()
+        if tuner.adaptive and tuner.history:
+            report["autotune"] = tuner.summary()
+            self.master.after(0, self._remember_autotuned_workers, options['output_key'], tuner.best_workers())
+        if prefetcher is not None and (prefetcher.hits or prefetcher.waits or prefetcher.misses):
+            # Read-ahead is on by default, so its stats alone do not put a report into the output folder
+            if report or options['cpu_profiling'] or options['metrics_log']:
+                report["read_ahead"] = prefetcher.summary()
+            else:
+                print(f"Read-ahead: {prefetcher.summary()}")
+        if report:
+            self._write_batch_report(output_folder, report)
+        if cpu_profiler is not None:
+            try:
+                cpu_profiler.save(output_folder)
             except Exception as e:
-                errors_occurred = True
-                print(f"Error processing {input_path.name}: {e}")
-                self.master.after(0, self.status_label.config,
-                                  {"text": f"Error with {input_path.name}: {e}", "foreground": "red"})
-            
-            progress_value = int((i + 1) / total_images * 100)
-            self.master.after(0, self.progress_bar.config, {"value": progress_value})
+                print(f"Error saving CPU profile: {e}")
 
         final_status_text = ""
         if user_cancelled:
@@ -791,10 +2076,13 @@ class ImageProcessorApp:
         else: 
             final_status_text = f"Processing interrupted. Processed {processed_count}/{total_images} images."
             final_foreground = "orange"
+        if passthrough_count:
+            final_status_text += f" {passthrough_count} copied unchanged."
 
 
         self.master.after(0, self.status_label.config, {"text": final_status_text, "foreground": final_foreground})
         self.master.after(0, self.process_button.config, {"state": tk.NORMAL})
+        self.master.after(0, self.dry_run_button.config, {"state": tk.NORMAL})
         self.master.after(0, self.btn_select_folder.config, {"state": tk.NORMAL})
         self.master.after(0, self.btn_select_files.config, {"state": tk.NORMAL})
         self.master.after(0, self.btn_load_zip.config, {"state": tk.NORMAL})
@@ -807,7 +2095,7 @@ class ImageProcessorApp:
 
 
 if __name__ == "__main__":
-    root = tk.Tk()
+    root = TkinterDnD.Tk() if TkinterDnD is not None else tk.Tk()
     
     app = ImageProcessorApp(root)
     root.protocol("WM_DELETE_WINDOW", app.on_closing)
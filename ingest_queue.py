@@ -0,0 +1,88 @@
+# ingest_queue.py
+import queue
+import threading
+from pathlib import Path
+
+class IngestQueue:
+    """
+    Background queue that turns dropped paths into batches of new image paths.
+
+    submit() hands raw paths (files, folders, archives) to a worker thread, which
+    expands them with expand(path) -> list of image paths, removes duplicates and
+    already loaded paths in bulk, and runs process_batch(paths) (e.g. a catalog
+    scan) on chunks of batch_size paths. The UI thread collects finished batches
+    with poll() on a timer, so it can add thousands of paths with one grid update.
+    """
+    def __init__(self, expand, process_batch=None, batch_size=1000):
+        self.expand = expand
+        self.process_batch = process_batch
+        self.batch_size = max(1, batch_size)
+        self.pending = 0 # Submitted drops not yet fully ingested
+
+        self._requests = queue.Queue()
+        self._results = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._worker_loop, daemon=True)
+        self._thread.start()
+
+    def submit(self, raw_paths, known_paths=()):
+        """Queues dropped paths; paths in known_paths (already loaded) are skipped."""
+        with self._lock:
+            self.pending += 1
+        self._requests.put(([Path(path) for path in raw_paths], set(known_paths)))
+
+    def poll(self):
+        """
+        Returns every batch finished since the last call as a list of
+        (paths, batch_result, errors) tuples, without blocking.
+        """
+        batches = []
+        while True:
+            try:
+                batches.append(self._results.get_nowait())
+            except queue.Empty:
+                return batches
+
+    def close(self):
+        """Stops the worker thread after the queued drops."""
+        self._requests.put(None)
+
+    def _worker_loop(self):
+        """Expands, deduplicates and processes dropped paths until a stop sentinel is received."""
+        while True:
+            request = self._requests.get()
+            if request is None:
+                break
+            raw_paths, seen = request
+            batch = []
+            errors = []
+            for raw_path in raw_paths:
+                try:
+                    candidates = self.expand(raw_path)
+                except Exception as e:
+                    print(f"Could not add '{raw_path}': {e}")
+                    errors.append((raw_path, e))
+                    continue
+                for path in candidates:
+                    if path in seen:
+                        continue
+                    seen.add(path)
+                    batch.append(path)
+                    if len(batch) >= self.batch_size:
+                        self._finish_batch(batch, errors)
+                        batch, errors = [], []
+            if batch or errors:
+                self._finish_batch(batch, errors)
+            with self._lock:
+                self.pending -= 1
+
+    def _finish_batch(self, batch, errors):
+        """Runs process_batch on a batch and hands the result to the UI thread."""
+        result = None
+        if batch and self.process_batch is not None:
+            try:
+                result = self.process_batch(batch)
+            except Exception as e:
+                print(f"Error processing dropped files: {e}")
+                errors.append((None, e))
+        self._results.put((batch, result, errors))
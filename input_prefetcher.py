@@ -0,0 +1,128 @@
+# input_prefetcher.py
+import os
+import threading
+
+# Memory the read-ahead buffer may use for files not yet taken by a worker
+DEFAULT_READ_AHEAD_MEMORY = 128 * 1024 * 1024
+# Files read concurrently; network shares and HDDs serve several outstanding reads better than one
+DEFAULT_READ_AHEAD_THREADS = 4
+
+class InputPrefetcher:
+    """
+    Reads input files ahead of the workers into a bounded memory buffer, so images
+    on slow storage (network shares, external HDDs) are decoded from memory instead
+    of blocking a worker on I/O while the CPU idles.
+
+    paths must be given in the order the workers will ask for them. reader_threads
+    background threads read the next files (at most depth files and max_bytes
+    bytes ahead); take(path) hands a file's content to a worker and frees its
+    share of the budget. The depth starts at initial_depth and grows by one
+    whenever a worker finds its file not read yet (up to max_depth), so the
+    read-ahead settles at the distance the storage needs to keep the workers fed.
+    Files larger than max_bytes are left to the worker.
+    """
+    def __init__(self, paths, max_bytes=DEFAULT_READ_AHEAD_MEMORY, reader_threads=DEFAULT_READ_AHEAD_THREADS,
+                 initial_depth=4, max_depth=256):
+        self.max_bytes = max_bytes
+        self.depth = max(1, initial_depth)
+        self.max_depth = max(self.depth, max_depth)
+        self.buffered_bytes = 0 # Read or being read, not yet taken
+        self.hits = 0 # Files that were in memory when a worker asked for them
+        self.waits = 0 # Files a worker had to wait for while they were being read
+        self.misses = 0 # Files a worker had to read itself
+        self.peak_bytes = 0
+
+        self._paths = list(paths)
+        self._planned = set(self._paths)
+        self._next = 0 # Index of the next path to read
+        self._buffers = {} # path -> content
+        self._reading = set()
+        self._taken = set()
+        self._closed = False
+        self._condition = threading.Condition()
+        self._threads = [threading.Thread(target=self._reader_loop, daemon=True)
+                         for _ in range(max(1, reader_threads))]
+        for thread in self._threads:
+            thread.start()
+
+    def take(self, path):
+        """
+        Returns the content of path, waiting if it is being read, or None if it was
+        not read ahead (the caller reads the file itself).
+        """
+        if path not in self._planned:
+            return None
+        with self._condition:
+            self._taken.add(path)
+            self._condition.notify_all() # A reader waiting for memory for this path must not keep the worker waiting
+            waited = path in self._reading
+            while path in self._reading:
+                self._condition.wait()
+            data = self._buffers.pop(path, None)
+            if data is not None:
+                self.buffered_bytes -= len(data)
+                if waited:
+                    self.waits += 1
+                else:
+                    self.hits += 1
+            else:
+                self.misses += 1
+            if (waited or data is None) and self.depth < self.max_depth:
+                self.depth += 1 # The workers caught up with the read-ahead: read further ahead
+            self._condition.notify_all()
+            return data
+
+    def close(self):
+        """Stops reading ahead and frees every buffered file."""
+        with self._condition:
+            self._closed = True
+            self._buffers.clear()
+            self.buffered_bytes = 0
+            self._condition.notify_all()
+
+    def summary(self) -> dict:
+        """Returns the read-ahead statistics for the batch report."""
+        return {"hits": self.hits, "waits": self.waits, "misses": self.misses,
+                "final_depth": self.depth, "peak_buffered_bytes": self.peak_bytes}
+
+    def _reader_loop(self):
+        while True:
+            with self._condition:
+                while (not self._closed and self._next < len(self._paths)
+                       and len(self._buffers) + len(self._reading) >= self.depth):
+                    self._condition.wait()
+                if self._closed or self._next >= len(self._paths):
+                    return
+                path = self._paths[self._next]
+                self._next += 1
+                if path in self._taken:
+                    continue
+                self._reading.add(path)
+
+            reserved = 0
+            data = None
+            try:
+                size = os.stat(path).st_size
+                if size <= self.max_bytes:
+                    with self._condition:
+                        while (not self._closed and path not in self._taken
+                               and self.buffered_bytes + size > self.max_bytes):
+                            self._condition.wait()
+                        # A worker already asking for the file gets it from this read if it fits now, else reads it itself
+                        if not self._closed and self.buffered_bytes + size <= self.max_bytes:
+                            reserved = size
+                            self.buffered_bytes += size
+                    if reserved:
+                        with open(path, "rb") as f:
+                            data = f.read()
+            except OSError as e:
+                print(f"Could not read ahead '{path}': {e}")
+
+            with self._condition:
+                self._reading.discard(path)
+                self.buffered_bytes -= reserved
+                if data is not None and not self._closed:
+                    self._buffers[path] = data
+                    self.buffered_bytes += len(data)
+                    self.peak_bytes = max(self.peak_bytes, self.buffered_bytes)
+                self._condition.notify_all()
@@ -0,0 +1,47 @@
+# job_scheduler.py
+
+# Rough decode cost per pixel of each source format, relative to JPEG.
+# Raw formats are cheap to decode; PNG pays for inflate and unfiltering.
+FORMAT_COST_FACTORS = {
+    "JPEG": 1.0,
+    "PNG": 1.6,
+    "WEBP": 1.4,
+    "TIFF": 1.2,
+    "GIF": 1.2,
+    "BMP": 0.5,
+    "TGA": 0.5,
+    "ICO": 0.5,
+}
+DEFAULT_COST_FACTOR = 1.0
+
+# Processing orders for a batch
+SCHEDULE_ORDERS = ("largest_first", "as_listed")
+
+def estimate_job_cost(record):
+    """
+    Estimates the relative processing cost of an image from its catalog record:
+    pixel count times a per-format factor. Returns None if the size is unknown.
+    """
+    if record is None or not record.get("width") or not record.get("height"):
+        return None
+    return record["width"] * record["height"] * FORMAT_COST_FACTORS.get(record.get("format"), DEFAULT_COST_FACTOR)
+
+def schedule_jobs(paths, records, order="largest_first", frame_counts=None):
+    """
+    Returns (ordered_paths, costs) for a batch. costs maps every path to its estimated
+    cost; images of unknown size get the average known cost. frame_counts optionally
+    maps paths to the number of frames that will be processed (e.g. pages of a TIFF,
+    as counted by the dry-run planner), which multiplies their cost. With "largest_first"
+    the most expensive images are started first, so a huge image near the end of
+    the list cannot leave the other workers idle while it finishes. Ties keep the
+    listed order.
+    """
+    costs = {path: estimate_job_cost(records.get(path)) for path in paths}
+    known = [cost for cost in costs.values() if cost is not None]
+    fallback = sum(known) / len(known) if known else 1.0
+    costs = {path: cost if cost is not None else fallback for path, cost in costs.items()}
+    if frame_counts:
+        costs = {path: cost * frame_counts.get(path, 1) for path, cost in costs.items()}
+    if order == "largest_first":
+        paths = sorted(paths, key=lambda path: costs[path], reverse=True)
+    return list(paths), costs
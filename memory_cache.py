@@ -0,0 +1,86 @@
+# memory_cache.py
+from collections import OrderedDict
+
+def pil_image_bytes(img) -> int:
+    """Approximate memory used by a PIL image's pixel data."""
+    return img.width * img.height * len(img.getbands())
+
+def photo_image_bytes(photo) -> int:
+    """Approximate memory used by a Tk photo image (Tk keeps 4 bytes per pixel)."""
+    return photo.width() * photo.height() * 4
+
+class LRUMemoryCache:
+    """
+    Least-recently-used cache bounded by a byte budget instead of an entry count.
+
+    size_of(value) gives the size of every stored value. When a put() exceeds
+    max_bytes, the least recently used entries are evicted (calling
+    on_evict(key, value) for each) until the cache fits again. Keys passed in keep
+    (e.g. what is currently on screen) are never evicted, so the budget can be
+    exceeded while they alone do not fit.
+    """
+    def __init__(self, max_bytes, size_of, on_evict=None):
+        self.max_bytes = max_bytes
+        self.size_of = size_of
+        self.on_evict = on_evict
+        self.total_bytes = 0
+        self.evicted_count = 0
+        self._entries = OrderedDict() # key -> (value, size), least recently used first
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        """Returns the value for key and marks it as recently used."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def touch(self, keys):
+        """Marks the given keys (if cached) as recently used."""
+        for key in keys:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+
+    def put(self, key, value, keep=()):
+        """Stores value under key, then evicts least recently used entries not in keep until the budget fits."""
+        self.pop(key)
+        size = self.size_of(value)
+        self._entries[key] = (value, size)
+        self.total_bytes += size
+        self.trim(keep)
+
+    def trim(self, keep=()):
+        """Evicts least recently used entries not in keep until the cache fits max_bytes."""
+        if self.total_bytes <= self.max_bytes:
+            return
+        keep = set(keep)
+        keep.add(next(reversed(self._entries))) # Never evict the newest entry
+        for key in list(self._entries):
+            if self.total_bytes <= self.max_bytes:
+                break
+            if key in keep:
+                continue
+            value, size = self._entries.pop(key)
+            self.total_bytes -= size
+            self.evicted_count += 1
+            if self.on_evict is not None:
+                self.on_evict(key, value)
+
+    def pop(self, key, default=None):
+        """Removes key without calling on_evict and returns its value."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return default
+        self.total_bytes -= entry[1]
+        return entry[0]
+
+    def clear(self):
+        """Removes every entry without calling on_evict."""
+        self._entries.clear()
+        self.total_bytes = 0
@@ -0,0 +1,105 @@
+# memory_profiling.py
+import contextlib
+import os
+import sys
+import tracemalloc
+
+try:
+    import psutil
+except ImportError: # psutil is optional; RSS is read from /proc on Linux without it
+    psutil = None
+
+def current_rss():
+    """Returns the resident set size of this process in bytes, or None if it cannot be read."""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    if sys.platform.startswith("linux"):
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError):
+            return None
+    return None
+
+class MemoryProfiler:
+    """
+    Records peak traced memory and RSS change per image and per processing stage.
+
+    tracemalloc sees allocations made through Python's allocator (e.g. encoded
+    output buffers), but not Pillow's pixel buffers, which are allocated in C; the
+    RSS delta covers those. Use image() around each image and pass stage to
+    image_processing_logic.set_stage_observer() to break images down by stage.
+    """
+    def __init__(self):
+        self.images = [] # One record per profiled image
+        self._current = None
+        self._image_peak = 0
+        self._started_tracing = False
+
+    def start(self):
+        """Starts tracing allocations (if not already traced)."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def stop(self):
+        """Stops tracing allocations if start() turned tracing on."""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    @contextlib.contextmanager
+    def image(self, input_path):
+        """Profiles everything done for one input image inside the with block."""
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        rss_before = current_rss()
+        record = {"input": str(input_path), "stages": {}}
+        self._current = record
+        self._image_peak = baseline
+        try:
+            yield record
+        finally:
+            self._image_peak = max(self._image_peak, tracemalloc.get_traced_memory()[1])
+            rss_after = current_rss()
+            record["peak_traced_bytes"] = self._image_peak - baseline
+            record["rss_delta_bytes"] = rss_after - rss_before if rss_before is not None and rss_after is not None else None
+            self._current = None
+            self.images.append(record)
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Profiles one processing stage of the current image. Repeated stages (e.g. frames) are combined."""
+        if self._current is None:
+            yield
+            return
+        self._image_peak = max(self._image_peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        rss_before = current_rss()
+        try:
+            yield
+        finally:
+            peak = tracemalloc.get_traced_memory()[1]
+            rss_after = current_rss()
+            self._image_peak = max(self._image_peak, peak)
+            stage = self._current["stages"].setdefault(name, {"peak_traced_bytes": 0, "rss_delta_bytes": None})
+            stage["peak_traced_bytes"] = max(stage["peak_traced_bytes"], peak - baseline)
+            if rss_before is not None and rss_after is not None:
+                stage["rss_delta_bytes"] = max(stage["rss_delta_bytes"] or 0, rss_after - rss_before)
+
+    def report(self, top=10):
+        """
+        Returns the profile as a dict for the batch report: every image record plus the
+        top offenders by peak traced memory and by RSS growth.
+        """
+        by_traced = sorted(self.images, key=lambda record: record["peak_traced_bytes"], reverse=True)
+        by_rss = sorted((record for record in self.images if record["rss_delta_bytes"] is not None),
+                        key=lambda record: record["rss_delta_bytes"], reverse=True)
+        return {
+            "images": self.images,
+            "top_peak_traced": [{"input": record["input"], "peak_traced_bytes": record["peak_traced_bytes"]}
+                                for record in by_traced[:top]],
+            "top_rss_delta": [{"input": record["input"], "rss_delta_bytes": record["rss_delta_bytes"]}
+                              for record in by_rss[:top]],
+        }
@@ -0,0 +1,307 @@
+# output_writer.py
+import io
+import os
+import queue
+import shutil
+import tarfile
+import threading
+import time
+import zipfile
+from pathlib import Path
+
+# Durability modes for written output files:
+#   "none"  - rely on the OS to flush files eventually (fastest)
+#   "batch" - fsync written files in groups of fsync_batch_size
+#   "file"  - fsync every file before it is renamed into place (safest)
+DURABILITY_MODES = ("none", "batch", "file")
+
+def write_file_atomic(output_path, data, fsync=False):
+    """
+    Writes data to a temporary file next to output_path and renames it into place,
+    so readers never see a partially written output file. With fsync=True the file
+    and then its directory (which holds the rename) are flushed to stable storage.
+    """
+    output_path = Path(output_path)
+    temp_path = output_path.with_name(f".{output_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(temp_path, "wb") as f:
+            f.write(data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(temp_path, output_path)
+        if fsync:
+            _fsync_directory(output_path.parent)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    return output_path
+
+def copy_file_atomic(source_path, output_path, link=False, fsync=False):
+    """
+    Copies (or, with link=True, hardlinks) source_path to output_path through a
+    temporary name and a rename. Hardlinks fall back to a copy when they are not
+    possible (e.g. across devices).
+    """
+    output_path = Path(output_path)
+    temp_path = output_path.with_name(f".{output_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        linked = False
+        if link:
+            try:
+                os.link(source_path, temp_path)
+                linked = True
+            except OSError:
+                pass
+        if not linked:
+            shutil.copyfile(source_path, temp_path)
+            if fsync:
+                with open(temp_path, "rb") as f:
+                    os.fsync(f.fileno())
+        os.replace(temp_path, output_path)
+        if fsync:
+            _fsync_directory(output_path.parent)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    return output_path
+
+def _fsync_paths(paths):
+    """Flushes already written files and their directories to stable storage."""
+    directories = set()
+    for path in paths:
+        try:
+            with open(path, "rb") as f:
+                os.fsync(f.fileno())
+            directories.add(path.parent)
+        except OSError as e:
+            print(f"Error syncing '{path}': {e}")
+    for directory in directories:
+        _fsync_directory(directory)
+
+def _fsync_directory(directory):
+    """Flushes a directory entry (e.g. a rename into it) to stable storage."""
+    if os.name == "nt":
+        return # Directories cannot be opened for fsync on Windows
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    except OSError as e:
+        print(f"Error syncing directory '{directory}': {e}")
+
+class AsyncOutputWriter:
+    """
+    Writes encoded image bytes to disk on a pool of background writer threads.
+
+    The queue between the processing workers and the writers is bounded, so
+    submit() blocks once max_queue_size outputs are waiting and memory use stays
+    capped when the output storage is slower than encoding.
+
+    Submitting a Path instead of bytes copies that file unchanged (or hardlinks
+    it when link_files is set), which is used for passthrough outputs.
+    """
+    def __init__(self, num_writers=2, max_queue_size=16, durability="batch", fsync_batch_size=32, link_files=False):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"Unknown durability mode: {durability}")
+        self.durability = durability
+        self.link_files = link_files
+        self.fsync_batch_size = max(1, fsync_batch_size)
+        self.errors = [] # (output_path, exception) for every failed write
+        self.written_count = 0
+
+        self._queue = queue.Queue(maxsize=max(1, max_queue_size))
+        self._lock = threading.Lock()
+        self._unsynced_paths = []
+        self._closed = False
+        self._threads = [threading.Thread(target=self._writer_loop, daemon=True)
+                         for _ in range(max(1, num_writers))]
+        for thread in self._threads:
+            thread.start()
+
+    @property
+    def pending(self) -> int:
+        """Number of outputs waiting in the write queue."""
+        return self._queue.qsize()
+
+    def submit(self, output_path, data):
+        """
+        Queues data (bytes, or a Path of a file to copy) to be written to output_path.
+        Blocks while the queue is full.
+        """
+        if self._closed:
+            raise RuntimeError("Cannot submit to a closed writer.")
+        self._queue.put((Path(output_path), data))
+
+    def close(self):
+        """
+        Waits for all queued outputs to be written, applies any pending batched
+        fsync and returns the list of write errors.
+        """
+        if not self._closed:
+            self._closed = True
+            for _ in self._threads:
+                self._queue.put(None)
+            for thread in self._threads:
+                thread.join()
+            with self._lock:
+                pending, self._unsynced_paths = self._unsynced_paths, []
+            if pending:
+                _fsync_paths(pending)
+        return self.errors
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _writer_loop(self):
+        """Writes queued outputs until a stop sentinel is received."""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            output_path, data = item
+            try:
+                if isinstance(data, Path):
+                    copy_file_atomic(data, output_path, link=self.link_files, fsync=self.durability == "file")
+                else:
+                    write_file_atomic(output_path, data, fsync=self.durability == "file")
+            except Exception as e:
+                print(f"Error writing '{output_path}': {e}")
+                with self._lock:
+                    self.errors.append((output_path, e))
+                continue
+
+            to_sync = None
+            with self._lock:
+                self.written_count += 1
+                if self.durability == "batch":
+                    self._unsynced_paths.append(output_path)
+                    if len(self._unsynced_paths) >= self.fsync_batch_size:
+                        to_sync, self._unsynced_paths = self._unsynced_paths, []
+            if to_sync:
+                _fsync_paths(to_sync)
+
+# Archive formats supported as an output target
+ARCHIVE_FORMATS = ("zip", "tar")
+
+# Outputs that are already compressed are stored in ZIP archives without recompression
+_ZIP_STORED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp"}
+
+class ArchiveOutputWriter:
+    """
+    Streams encoded image bytes straight into a ZIP or TAR archive.
+
+    A single writer thread owns the archive and is fed by a bounded queue, so it
+    can be used in place of AsyncOutputWriter. Members are submitted by name
+    (e.g. "photo.jpg"). The archive is built under a temporary name and renamed
+    into place by close().
+    """
+    def __init__(self, archive_path, archive_format="zip", max_queue_size=16, durability="batch"):
+        if archive_format not in ARCHIVE_FORMATS:
+            raise ValueError(f"Unknown archive format: {archive_format}")
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"Unknown durability mode: {durability}")
+        self.archive_path = Path(archive_path)
+        self.archive_format = archive_format
+        self.durability = durability
+        self.errors = [] # (member_name, exception) for every failed write
+        self.written_count = 0
+
+        self._temp_path = self.archive_path.with_name(f".{self.archive_path.name}.{os.getpid()}.tmp")
+        if archive_format == "zip":
+            self._archive = zipfile.ZipFile(self._temp_path, "w")
+        else:
+            self._archive = tarfile.open(self._temp_path, "w")
+        self._queue = queue.Queue(maxsize=max(1, max_queue_size))
+        self._closed = False
+        self._thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self._thread.start()
+
+    @property
+    def pending(self) -> int:
+        """Number of members waiting in the write queue."""
+        return self._queue.qsize()
+
+    def submit(self, member_name, data):
+        """
+        Queues data (bytes, or a Path of a file to store unchanged) to be added to the
+        archive as member_name. Blocks while the queue is full.
+        """
+        if self._closed:
+            raise RuntimeError("Cannot submit to a closed writer.")
+        self._queue.put((Path(member_name).as_posix(), data))
+
+    def close(self):
+        """
+        Waits for all queued members to be written, finalizes the archive and
+        moves it to archive_path. Returns the list of write errors.
+        """
+        if self._closed:
+            return self.errors
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+        try:
+            self._archive.close()
+            if self.durability != "none":
+                with open(self._temp_path, "rb") as f:
+                    os.fsync(f.fileno())
+            os.replace(self._temp_path, self.archive_path)
+            if self.durability != "none":
+                _fsync_directory(self.archive_path.parent)
+        except Exception as e:
+            print(f"Error finalizing archive '{self.archive_path}': {e}")
+            self.errors.append((self.archive_path.name, e))
+            try:
+                os.remove(self._temp_path)
+            except OSError:
+                pass
+        return self.errors
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _writer_loop(self):
+        """Adds queued members to the archive until a stop sentinel is received."""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            member_name, data = item
+            try:
+                if self.archive_format == "zip":
+                    if Path(member_name).suffix.lower() in _ZIP_STORED_EXTENSIONS:
+                        compress_type = zipfile.ZIP_STORED
+                    else:
+                        compress_type = zipfile.ZIP_DEFLATED
+                    if isinstance(data, Path):
+                        self._archive.write(data, member_name, compress_type=compress_type)
+                    else:
+                        info = zipfile.ZipInfo(member_name, date_time=time.localtime()[:6])
+                        info.compress_type = compress_type
+                        self._archive.writestr(info, data)
+                elif isinstance(data, Path):
+                    self._archive.add(data, arcname=member_name, recursive=False)
+                else:
+                    info = tarfile.TarInfo(member_name)
+                    info.size = len(data)
+                    info.mtime = int(time.time())
+                    self._archive.addfile(info, io.BytesIO(data))
+                self.written_count += 1
+            except Exception as e:
+                print(f"Error adding '{member_name}' to archive: {e}")
+                self.errors.append((member_name, e))
@@ -0,0 +1,115 @@
+# spooled_inputs.py
+import io
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+
+# Archive members up to this size are kept in memory instead of being written to the temp directory
+DEFAULT_MEMORY_THRESHOLD = 1024 * 1024
+# Total memory all in-memory members of a store may use; later members are spilled to disk
+DEFAULT_MEMORY_LIMIT = 256 * 1024 * 1024
+
+# In-memory inputs of every store: path -> (data, time added)
+_memory_inputs = {}
+_memory_lock = threading.Lock()
+
+def is_in_memory(path) -> bool:
+    """Returns True if an input path is held in memory rather than on disk."""
+    return Path(path) in _memory_inputs
+
+def input_source(path):
+    """
+    Returns what Image.open() should read for an input path: a buffer over the
+    data of an in-memory input, otherwise the path itself.
+    """
+    entry = _memory_inputs.get(Path(path))
+    return io.BytesIO(entry[0]) if entry is not None else path
+
+def open_input(path):
+    """Opens an input for binary reading, whether it is held in memory or on disk."""
+    entry = _memory_inputs.get(Path(path))
+    return io.BytesIO(entry[0]) if entry is not None else open(path, "rb")
+
+def read_input(path) -> bytes:
+    """Returns the full content of an input."""
+    with open_input(path) as f:
+        return f.read()
+
+def input_stat(path) -> os.stat_result:
+    """
+    Returns os.stat() of an input. In-memory inputs report their size and the
+    time they were added. Raises OSError like os.stat() for missing paths.
+    """
+    entry = _memory_inputs.get(Path(path))
+    if entry is None:
+        return os.stat(path)
+    data, added = entry
+    return os.stat_result((0o100644, 0, 0, 1, 0, 0, len(data), added, added, added))
+
+class SpooledInputStore:
+    """
+    Stores extracted archive members. Members up to memory_threshold bytes stay in
+    memory as long as all in-memory members of the store fit in memory_limit;
+    larger members (and everything once the limit is reached) are written to disk.
+
+    Every member is addressed by the path it would have on disk, so the rest of the
+    app keeps handling inputs as paths and reads them through input_source(),
+    open_input() or input_stat(). Archives full of small images therefore cost no
+    temp-file creates and deletes at all.
+    """
+    def __init__(self, memory_threshold=DEFAULT_MEMORY_THRESHOLD, memory_limit=DEFAULT_MEMORY_LIMIT):
+        self.memory_threshold = memory_threshold
+        self.memory_limit = memory_limit
+        self.memory_bytes = 0 # Size of this store's in-memory members
+        self.spilled_count = 0 # Members written to disk
+        self._lock = threading.Lock()
+        self._paths = set() # This store's in-memory members
+
+    def add(self, path, source, size) -> Path:
+        """
+        Stores a member of the given size, read from the binary file object source,
+        under path and returns the path. Replaces an earlier member with the same path.
+        """
+        path = Path(path)
+        with self._lock:
+            in_memory = size <= self.memory_threshold and self.memory_bytes + size <= self.memory_limit
+            if in_memory:
+                self.memory_bytes += size # Reserved before reading, so parallel adds respect the limit
+        if not in_memory:
+            os.makedirs(path.parent, exist_ok=True)
+            with open(path, "wb") as f:
+                shutil.copyfileobj(source, f)
+            self.discard([path])
+            with self._lock:
+                self.spilled_count += 1
+            return path
+
+        data = source.read()
+        with self._lock, _memory_lock:
+            self.memory_bytes += len(data) - size
+            previous = _memory_inputs.get(path)
+            if previous is not None and path in self._paths:
+                self.memory_bytes -= len(previous[0])
+            _memory_inputs[path] = (data, time.time())
+            self._paths.add(path)
+        return path
+
+    def discard(self, paths):
+        """Frees the in-memory members among paths (files on disk are left alone)."""
+        with self._lock, _memory_lock:
+            for path in paths:
+                path = Path(path)
+                if path in self._paths:
+                    self._paths.discard(path)
+                    self.memory_bytes -= len(_memory_inputs.pop(path)[0])
+
+    def clear(self):
+        """Frees all in-memory members of the store."""
+        with self._lock, _memory_lock:
+            for path in self._paths:
+                _memory_inputs.pop(path, None)
+            self._paths.clear()
+            self.memory_bytes = 0
+            self.spilled_count = 0
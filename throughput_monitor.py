@@ -0,0 +1,129 @@
+# throughput_monitor.py
+import json
+import time
+from collections import deque
+from datetime import datetime
+
+METRICS_LOG_NAME = "processing_metrics.jsonl"
+
+class ThroughputMonitor:
+    """
+    Live throughput metrics of a batch.
+
+    The processing loop reports every finished image with record_image() and calls
+    poll() after each one. poll() returns a snapshot (images/sec, input and output
+    MB/s, average and p95 latency, active workers, queue depths, ETA) at most once
+    per update_interval seconds, so the UI and the optional JSON-lines log are
+    updated at a fixed rate however fast images finish.
+
+    Rates are moving averages over the last window_seconds, latencies cover the
+    last latency_samples images. The ETA divides the remaining job cost (see
+    job_scheduler) by the recent cost rate, so it stays accurate when large images
+    are processed first.
+    """
+    def __init__(self, total_images, total_cost=None, update_interval=1.0, window_seconds=30.0,
+                 latency_samples=512, log_path=None):
+        self.total_images = total_images
+        self.total_cost = total_cost or total_images
+        self.update_interval = update_interval
+        self.window_seconds = window_seconds
+        self.completed = 0
+        self.completed_cost = 0.0
+        self.input_bytes = 0
+        self.output_bytes = 0
+
+        self._start = time.perf_counter()
+        self._last_update = None
+        self._window = deque() # (finish time, input bytes, output bytes, cost)
+        self._latencies = deque(maxlen=max(1, latency_samples))
+        self._log = None
+        if log_path is not None:
+            try:
+                self._log = open(log_path, "a")
+            except OSError as e:
+                print(f"Error opening metrics log: {e}")
+
+    def record_image(self, seconds, input_bytes=0, output_bytes=0, cost=1.0):
+        """Records one finished image: its job duration and the bytes it read and produced."""
+        now = time.perf_counter()
+        self.completed += 1
+        self.completed_cost += cost
+        self.input_bytes += input_bytes
+        self.output_bytes += output_bytes
+        self._latencies.append(seconds)
+        self._window.append((now, input_bytes, output_bytes, cost))
+        while self._window and now - self._window[0][0] > self.window_seconds:
+            self._window.popleft()
+
+    def poll(self, active_workers=0, queued_images=0, queued_writes=0):
+        """Returns a snapshot if update_interval has passed since the last one, else None."""
+        now = time.perf_counter()
+        if self._last_update is not None and now - self._last_update < self.update_interval:
+            return None
+        self._last_update = now
+        return self.snapshot(active_workers, queued_images, queued_writes)
+
+    def snapshot(self, active_workers=0, queued_images=0, queued_writes=0) -> dict:
+        """Returns the current metrics and appends them to the log, if there is one."""
+        now = time.perf_counter()
+        elapsed = now - self._start
+        # Rates cover the window, or the whole run while it is shorter than the window
+        span = min(elapsed, self.window_seconds) or 1e-9
+        window = [entry for entry in self._window if now - entry[0] <= span]
+        images_per_second = len(window) / span
+        cost_per_second = sum(entry[3] for entry in window) / span
+        remaining_cost = max(0.0, self.total_cost - self.completed_cost)
+        latencies = sorted(self._latencies)
+
+        metrics = {
+            "elapsed_seconds": round(elapsed, 1),
+            "completed": self.completed,
+            "total": self.total_images,
+            "images_per_second": round(images_per_second, 2),
+            "input_mb_per_second": round(sum(entry[1] for entry in window) / span / 1e6, 2),
+            "output_mb_per_second": round(sum(entry[2] for entry in window) / span / 1e6, 2),
+            "average_latency_ms": round(sum(latencies) / len(latencies) * 1000, 1) if latencies else None,
+            "p95_latency_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000, 1) if latencies else None,
+            "active_workers": active_workers,
+            "queued_images": queued_images,
+            "queued_writes": queued_writes,
+            "eta_seconds": round(remaining_cost / cost_per_second) if cost_per_second > 0 else None,
+        }
+        if self._log is not None:
+            try:
+                self._log.write(json.dumps({"time": datetime.now().isoformat(timespec="seconds"), **metrics}) + "\n")
+                self._log.flush()
+            except OSError as e:
+                print(f"Error writing metrics log: {e}")
+        return metrics
+
+    def close(self) -> dict:
+        """Returns a final snapshot, logs it with the totals of the run and closes the log."""
+        metrics = self.snapshot()
+        if self._log is not None:
+            try:
+                self._log.write(json.dumps({"time": datetime.now().isoformat(timespec="seconds"), "finished": True,
+                                            "completed": self.completed, "input_bytes": self.input_bytes,
+                                            "output_bytes": self.output_bytes,
+                                            "elapsed_seconds": round(time.perf_counter() - self._start, 1)}) + "\n")
+            except OSError as e:
+                print(f"Error writing metrics log: {e}")
+            self._log.close()
+            self._log = None
+        return metrics
+
+    @staticmethod
+    def format_snapshot(metrics) -> str:
+        """Formats a snapshot as one line for the UI."""
+        if metrics["eta_seconds"] is None:
+            eta = "--"
+        else:
+            minutes, seconds = divmod(metrics["eta_seconds"], 60)
+            hours, minutes = divmod(minutes, 60)
+            eta = f"{hours}:{minutes:02d}:{seconds:02d}"
+        latency = ("--" if metrics["average_latency_ms"] is None
+                   else f"{metrics['average_latency_ms']:.0f} ms avg, {metrics['p95_latency_ms']:.0f} ms p95")
+        return (f"{metrics['images_per_second']:.1f} img/s | in {metrics['input_mb_per_second']:.1f} MB/s, "
+                f"out {metrics['output_mb_per_second']:.1f} MB/s | {latency} | "
+                f"{metrics['active_workers']} workers | queued {metrics['queued_images']} images, "
+                f"{metrics['queued_writes']} writes | ETA {eta}")
@@ -0,0 +1,83 @@
+# thumbnail_atlas.py
+from PIL import Image, ImageDraw
+
+class ThumbnailAtlas:
+    """
+    Grid geometry for thumbnails rendered into shared atlas pages.
+
+    The grid is split into pages of rows_per_page rows. Each page is composed into
+    one image that already contains the tile backgrounds and thumbnails, so the
+    canvas needs one image item per page instead of one Tk image and a set of
+    widgets per tile. Only the text of each tile is drawn as separate canvas items.
+    """
+    def __init__(self, thumbnail_size, columns, text_height=54, padding=10, rows_per_page=6):
+        self.thumbnail_size = thumbnail_size
+        self.columns = max(1, columns)
+        self.padding = padding
+        self.rows_per_page = max(1, rows_per_page)
+        self.tile_width = thumbnail_size[0] + padding * 2
+        self.tile_height = thumbnail_size[1] + text_height + padding
+        self.page_width = self.columns * (self.tile_width + padding) + padding
+        self.page_height = self.rows_per_page * (self.tile_height + padding)
+
+    @staticmethod
+    def columns_for_width(width, thumbnail_size, padding=10) -> int:
+        """Returns how many tile columns fit into a canvas of the given width."""
+        return max(1, (width - padding) // (thumbnail_size[0] + padding * 3))
+
+    @property
+    def tiles_per_page(self) -> int:
+        return self.columns * self.rows_per_page
+
+    def page_count(self, tile_count) -> int:
+        return -(-tile_count // self.tiles_per_page)
+
+    def page_range(self, page_index, tile_count) -> range:
+        """Returns the tile indexes drawn on a page."""
+        start = page_index * self.tiles_per_page
+        return range(start, min(tile_count, start + self.tiles_per_page))
+
+    def page_origin(self, page_index):
+        """Returns the canvas (x, y) of a page's top-left corner."""
+        return (0, page_index * self.page_height)
+
+    def tile_box(self, tile_index):
+        """Returns the canvas (left, top, right, bottom) of a tile."""
+        row, column = divmod(tile_index, self.columns)
+        left = self.padding + column * (self.tile_width + self.padding)
+        top = self.padding + row * (self.tile_height + self.padding)
+        return (left, top, left + self.tile_width, top + self.tile_height)
+
+    def total_height(self, tile_count) -> int:
+        rows = -(-tile_count // self.columns)
+        return self.padding + rows * (self.tile_height + self.padding)
+
+    def visible_pages(self, top, bottom, tile_count) -> range:
+        """Returns the pages overlapping the canvas rows top..bottom."""
+        first = max(0, int(top // self.page_height))
+        last = min(self.page_count(tile_count) - 1, int(bottom // self.page_height))
+        return range(first, last + 1)
+
+    def compose_page(self, page_index, thumbnails, background, tile_color, outline_color):
+        """
+        Composes one page image. thumbnails holds the PIL thumbnail (or None for a
+        tile without one) of every tile on the page, in tile order.
+        """
+        page = Image.new("RGB", (self.page_width, self.page_height), background)
+        draw = ImageDraw.Draw(page)
+        _, page_top = self.page_origin(page_index)
+        first_tile = page_index * self.tiles_per_page
+        for offset, thumbnail in enumerate(thumbnails):
+            left, top, right, bottom = self.tile_box(first_tile + offset)
+            top -= page_top
+            bottom -= page_top
+            draw.rectangle((left, top, right - 1, bottom - 1), fill=tile_color, outline=outline_color)
+            if thumbnail is not None:
+                x = left + (self.tile_width - thumbnail.width) // 2
+                y = top + self.padding // 2 + (self.thumbnail_size[1] - thumbnail.height) // 2
+                if thumbnail.mode == "RGB":
+                    page.paste(thumbnail, (x, y))
+                else: # Blend transparent thumbnails onto the tile background
+                    thumbnail = thumbnail.convert("RGBA")
+                    page.paste(thumbnail, (x, y), thumbnail)
+        return page
@@ -22,10 +22,12 @@ def get_image_files_in_folder(folder_path: Path) -> list[Path]:
                 image_files.append(file_path)
     return image_files
 
-def generate_unique_filename(original_filepath: Path) -> Path:
+def generate_unique_filename(original_filepath: Path, reserved: set | None = None, check_disk: bool = True) -> Path:
     """
     Generates a unique filename by appending a number if the file already exists.
     e.g., image.jpg -> image_1.jpg -> image_2.jpg
+    Paths in `reserved` (e.g. outputs still queued for writing) are treated as taken.
+    With check_disk=False only `reserved` is consulted (e.g. for archive member names).
     """ # Translated comment
     base_name = original_filepath.stem
     extension = original_filepath.suffix
@@ -33,7 +35,8 @@ def generate_unique_filename(original_filepath: Path) -> Path:
 
     counter = 1
     new_filepath = original_filepath
-    while new_filepath.exists():
+    reserved = reserved or set()
+    while (check_disk and new_filepath.exists()) or new_filepath in reserved:
         new_filepath = directory / f"{base_name}_{counter}{extension}"
         counter += 1
     return new_filepath
\ No newline at end of file
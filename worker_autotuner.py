@@ -0,0 +1,137 @@
+# worker_autotuner.py
+import contextlib
+import os
+import threading
+import time
+
+from memory_profiling import current_rss
+
+# "auto" lets WorkerAutotuner pick the worker count, "fixed" uses the configured one
+WORKER_MODES = ("auto", "fixed")
+
+def default_max_workers() -> int:
+    """Upper bound for parallel image jobs (same rule as ThreadPoolExecutor's default)."""
+    return min(32, (os.cpu_count() or 1) + 4)
+
+class WorkerAutotuner:
+    """
+    Chooses how many images are processed in parallel.
+
+    The processing loop asks for `workers` before starting jobs and reports every
+    finished image and its estimated cost (see job_scheduler) with record_image().
+    Stage timings come in through stage(),
+    which is meant to be installed with image_processing_logic.set_stage_observer().
+
+    With adaptive=True the tuner hill-climbs: after each measurement window it
+    keeps moving the worker count in the same direction while the processed cost
+    per second improves (images/sec would rise on its own as a largest-first run
+    reaches its small images), turns around when it gets worse and settles on the best count once
+    it has turned around twice. Whenever the process's resident memory exceeds
+    memory_limit (bytes, 0 = no limit) the count is lowered and capped there.
+    With adaptive=False the worker count stays fixed and only the stats are kept.
+    """
+    # Relative improvement in cost/sec needed to keep moving in one direction
+    IMPROVEMENT_THRESHOLD = 0.05
+
+    def __init__(self, initial_workers=2, min_workers=1, max_workers=None, memory_limit=0,
+                 adaptive=True, window_seconds=2.0):
+        self.min_workers = max(1, min_workers)
+        self.max_workers = max(self.min_workers, max_workers or default_max_workers())
+        self.workers = min(self.max_workers, max(self.min_workers, initial_workers))
+        self.memory_limit = memory_limit
+        self.adaptive = adaptive
+        self.window_seconds = window_seconds
+        self.history = [] # One record per measurement window
+
+        self._lock = threading.Lock()
+        self._throughput = {} # worker count -> last measured cost/sec
+        self._previous = None # cost/sec of the previous window
+        self._direction = 1
+        self._reversals = 0
+        self._memory_cap = self.max_workers
+        self._start_window()
+
+    def _start_window(self):
+        self._window_start = time.perf_counter()
+        self._window_images = 0
+        self._window_cost = 0.0
+        self._window_image_seconds = 0.0
+        self._stage_seconds = {}
+        self._stage_counts = {}
+
+    @property
+    def settled(self) -> bool:
+        """True once the tuner has stopped exploring."""
+        return not self.adaptive or self._reversals >= 2
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Times one processing stage (decode, resize, encode) of the current image."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._stage_seconds[name] = self._stage_seconds.get(name, 0.0) + elapsed
+                self._stage_counts[name] = self._stage_counts.get(name, 0) + 1
+
+    def record_image(self, seconds, cost=1.0):
+        """
+        Records one finished image, how long its job took and its estimated cost.
+        Ends the measurement window (and possibly changes `workers`) once it is long enough.
+        """
+        with self._lock:
+            self._window_images += 1
+            self._window_cost += cost
+            self._window_image_seconds += seconds
+            elapsed = time.perf_counter() - self._window_start
+            if elapsed < self.window_seconds or self._window_images < self.workers:
+                return
+            self._end_window(elapsed)
+
+    def _end_window(self, elapsed):
+        """Stores the window's measurements and picks the worker count for the next one."""
+        throughput = self._window_cost / elapsed
+        rss = current_rss()
+        self.history.append({
+            "workers": self.workers,
+            "images": self._window_images,
+            "images_per_second": round(self._window_images / elapsed, 3),
+            "cost_per_second": round(throughput, 3),
+            "average_image_ms": round(self._window_image_seconds / self._window_images * 1000, 1),
+            "stage_ms": {name: round(seconds / self._stage_counts[name] * 1000, 1)
+                         for name, seconds in self._stage_seconds.items()},
+            "rss_bytes": rss,
+        })
+        self._throughput[self.workers] = throughput
+
+        if self.memory_limit and rss is not None and rss > self.memory_limit:
+            self._memory_cap = max(self.min_workers, self.workers - 1)
+            self.workers = self._memory_cap
+            self._direction = -1
+        elif not self.settled:
+            if self._previous is not None and throughput < self._previous * (1 + self.IMPROVEMENT_THRESHOLD):
+                self._direction = -self._direction
+                self._reversals += 1
+            if self.settled:
+                self.workers = self.best_workers()
+            else:
+                self.workers = min(self._memory_cap, self.max_workers,
+                                   max(self.min_workers, self.workers + self._direction))
+        self._previous = throughput
+        self._start_window()
+
+    def best_workers(self) -> int:
+        """Returns the measured worker count with the highest cost/sec (or the current one)."""
+        candidates = {workers: throughput for workers, throughput in self._throughput.items()
+                      if workers <= self._memory_cap}
+        if not candidates:
+            return min(self.workers, self._memory_cap)
+        return max(candidates, key=candidates.get)
+
+    def summary(self) -> dict:
+        """Returns the chosen worker count and the per-window measurements for the batch report."""
+        with self._lock:
+            return {"adaptive": self.adaptive, "best_workers": self.best_workers(),
+                    "memory_limit_bytes": self.memory_limit or None, "windows": list(self.history)}